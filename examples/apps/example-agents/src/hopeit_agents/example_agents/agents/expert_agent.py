@@ -7,34 +7,31 @@ from hopeit.app.context import EventContext
 from hopeit.app.logger import app_extra_logger
 from hopeit.dataobjects.payload import Payload
 
-from hopeit_agents.agent_toolkit.agents.agent_config import create_agent_config
-from hopeit_agents.agent_toolkit.agents.prompts import render_prompt
+from hopeit_agents.agent_toolkit.agents.blueprints import agent_blueprints
 from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
     AgentLoopConfig,
     AgentLoopPayload,
     AgentLoopResult,
+    AgentLoopStopReason,
     agent_with_tools_loop,
+    event_deadline,
 )
-from hopeit_agents.agent_toolkit.mcp.agent_tools import (
-    resolve_tools,
-    tool_descriptions,
-)
-from hopeit_agents.agent_toolkit.settings import AgentSettings
 from hopeit_agents.example_agents.models import (
     ExpertAgentRequest,
     ExpertAgentResponse,
     ExpertAgentResults,
 )
-from hopeit_agents.mcp_client.models import MCPClientConfig
 from hopeit_agents.mcp_server.tools.api import _datatype_schema, event_tool_api
-from hopeit_agents.model_client.conversation import build_conversation
-from hopeit_agents.model_client.models import (
-    CompletionConfig,
-    Role,
-)
+from hopeit_agents.model_client.models import Role
 
 logger, extra = app_extra_logger()
 
+SETTINGS_KEY = "expert_agent_llm"
+MCP_SETTINGS_KEY = "mcp_client_example_tools"
+PROMPT_VARIABLES = {
+    "expert_agent_result_schema": Payload.to_json(_datatype_schema("", ExpertAgentResults)),
+}
+
 __steps__ = ["init_conversation", agent_with_tools_loop.__name__, "result"]
 
 __api__ = event_api(
@@ -49,53 +46,32 @@ __mcp__ = event_tool_api(
 )
 
 
-async def init_conversation(payload: ExpertAgentRequest, context: EventContext) -> AgentLoopPayload:
-    """Prepare the expert agent conversation and tool configuration."""
-    agent_settings = context.settings(key="expert_agent_llm", datatype=AgentSettings)
-    mcp_settings = context.settings(key="mcp_client_example_tools", datatype=MCPClientConfig)
-
-    with open(agent_settings.system_prompt_template) as f:
-        system_prompt_template = f.read()
-    with open(agent_settings.tool_prompt_template) as f:
-        tool_prompt_template = f.read()
-
-    agent_config = create_agent_config(
-        name=agent_settings.agent_name,
-        prompt_template=system_prompt_template,
-        variables={},
-        enable_tools=True,
-        tools=agent_settings.allowed_tools,
-        tool_prompt_template=tool_prompt_template,
-    )
-    tools = await resolve_tools(
-        mcp_settings,
+async def __init_event__(context: EventContext) -> None:
+    """Prepare the expert agent blueprint: settings, tools and system prompt."""
+    await agent_blueprints.prepare(
         context,
-        agent_id=agent_config.key,
-        allowed_tools=agent_config.tools,
+        settings_key=SETTINGS_KEY,
+        mcp_settings_key=MCP_SETTINGS_KEY,
+        variables=PROMPT_VARIABLES,
     )
-    completion_config = CompletionConfig(available_tools=tools)
-    result_schema = _datatype_schema("", ExpertAgentResults)
-    conversation = build_conversation(
-        None,
-        message=payload.user_message,
-        system_prompt=render_prompt(
-            agent_config,
-            {
-                "expert_agent_result_schema": Payload.to_json(result_schema),
-                "tool_descriptions": tool_descriptions(
-                    tools, include_schemas=agent_settings.include_tool_schemas_in_prompt
-                ),
-            },
-            include_tools=agent_config.enable_tools,
-        ),
+
+
+async def init_conversation(payload: ExpertAgentRequest, context: EventContext) -> AgentLoopPayload:
+    """Start the expert agent conversation with the user message."""
+    blueprint = await agent_blueprints.get(
+        context,
+        settings_key=SETTINGS_KEY,
+        mcp_settings_key=MCP_SETTINGS_KEY,
+        variables=PROMPT_VARIABLES,
     )
     return AgentLoopPayload(
-        conversation=conversation,
+        conversation=blueprint.conversation(payload.user_message),
         user_context={},
-        completion_config=completion_config,
+        completion_config=blueprint.completion_config,
         loop_config=AgentLoopConfig(max_iterations=10),
-        agent_settings=agent_settings,
-        mcp_settings=mcp_settings,
+        agent_settings=blueprint.agent_settings,
+        mcp_settings=blueprint.mcp_settings,
+        deadline=event_deadline(context),
     )
 
 
@@ -112,6 +88,8 @@ async def result(payload: AgentLoopResult, context: EventContext) -> ExpertAgent
             tool_calls=payload.tool_call_log,
             error=str(last_message.content or "") if last_message.role == Role.SYSTEM else None,
         )
+        if response.results is None and payload.stop_reason == AgentLoopStopReason.DEADLINE:
+            response.error = "Deadline exceeded before the agent completed the task"
 
     except Exception as e:
         response = ExpertAgentResponse(
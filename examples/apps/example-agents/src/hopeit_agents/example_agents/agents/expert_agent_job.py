@@ -0,0 +1,36 @@
+"""Return status and result of an expert agent job, optionally waiting for it to finish."""
+
+from hopeit.app.api import event_api
+from hopeit.app.context import EventContext, PostprocessHook
+
+from hopeit_agents.agent_toolkit.app.steps.agent_jobs import AgentJob, get_agent_job
+
+__steps__ = ["get_job"]
+
+__api__ = event_api(
+    summary="example-agents: get expert agent job status and result",
+    query_args=[
+        ("job_id", str, "Job id returned when the task was submitted"),
+        ("wait_seconds", float | None, "Seconds to wait for the job to finish (long-poll)"),
+    ],
+    responses={
+        200: (AgentJob, "Agent job status, including the result when finished"),
+        404: (str, "Job not found"),
+    },
+)
+
+
+async def get_job(
+    payload: None, context: EventContext, job_id: str, wait_seconds: float | None = None
+) -> AgentJob | None:
+    """Load the job, long-polling up to `wait_seconds` until it finishes."""
+    return await get_agent_job(job_id, context, wait_seconds=float(wait_seconds or 0.0))
+
+
+async def __postprocess__(
+    payload: AgentJob | None, context: EventContext, response: PostprocessHook
+) -> AgentJob | str:
+    if payload is None:
+        response.status = 404
+        return "Job not found"
+    return payload
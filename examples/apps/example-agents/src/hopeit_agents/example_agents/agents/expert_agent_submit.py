@@ -0,0 +1,30 @@
+"""Submit an expert agent task to run asynchronously as a job.
+
+The task is prepared as in `agents.expert_agent` and published to the expert agent jobs
+stream, consumed by `agents.expert_agent_worker`. Use `agents.expert_agent_job` to check
+the job status and get its result.
+"""
+
+from dataclasses import replace
+
+from hopeit.app.api import event_api
+from hopeit.app.context import EventContext, PostprocessHook
+
+from hopeit_agents.agent_toolkit.app.steps.agent_jobs import AgentJob, submit_agent_job
+from hopeit_agents.example_agents.agents.expert_agent import init_conversation
+from hopeit_agents.example_agents.models import ExpertAgentRequest
+
+__steps__ = [init_conversation.__name__, submit_agent_job.__name__]
+
+__api__ = event_api(
+    summary="example-agents: submit expert agent task as a job",
+    payload=(ExpertAgentRequest, "Agent task request"),
+    responses={202: (AgentJob, "Queued agent job")},
+)
+
+
+async def __postprocess__(
+    payload: AgentJob, context: EventContext, response: PostprocessHook
+) -> AgentJob:
+    response.status = 202
+    return replace(payload, payload=None)
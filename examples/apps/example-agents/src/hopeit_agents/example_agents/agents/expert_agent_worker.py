@@ -0,0 +1,5 @@
+"""Run expert agent jobs consumed from the expert agent jobs stream."""
+
+from hopeit_agents.agent_toolkit.app.steps.agent_jobs import run_agent_job
+
+__steps__ = [run_agent_job.__name__]
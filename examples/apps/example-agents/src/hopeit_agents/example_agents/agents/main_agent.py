@@ -4,26 +4,24 @@ from hopeit.app.api import event_api
 from hopeit.app.context import EventContext
 from hopeit.app.logger import app_extra_logger
 
-from hopeit_agents.agent_toolkit.agents.agent_config import create_agent_config
-from hopeit_agents.agent_toolkit.agents.prompts import render_prompt
+from hopeit_agents.agent_toolkit.agents.blueprints import agent_blueprints
 from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
     AgentLoopConfig,
     AgentLoopPayload,
     AgentLoopResult,
     agent_with_tools_loop,
+    event_deadline,
 )
-from hopeit_agents.agent_toolkit.mcp.agent_tools import (
-    resolve_tools,
-    tool_descriptions,
-)
-from hopeit_agents.agent_toolkit.settings import AgentSettings
 from hopeit_agents.example_agents.models import AgentRequest, AgentResponse
-from hopeit_agents.mcp_client.models import MCPClientConfig
-from hopeit_agents.model_client.conversation import build_conversation
-from hopeit_agents.model_client.models import CompletionConfig
+from hopeit_agents.model_client.conversation_store import conversation_store
+from hopeit_agents.model_client.models import Conversation
+from hopeit_agents.model_client.settings import ConversationStoreSettings
 
 logger, extra = app_extra_logger()
 
+STORED_MESSAGES_KEY = "stored_messages"
+SETTINGS_KEY = "main_agent_llm"
+MCP_SETTINGS_KEY = "sub_agents_mcp_client"
 
 __steps__ = ["init_conversation", agent_with_tools_loop.__name__, "result"]
 
@@ -35,61 +33,37 @@ __api__ = event_api(
 )
 
 
-async def init_conversation(payload: AgentRequest, context: EventContext) -> AgentLoopPayload:
-    """Build the initial conversation and tool prompt for the main agent."""
-    agent_settings: AgentSettings = context.settings(key="main_agent_llm", datatype=AgentSettings)
-    mcp_settings: MCPClientConfig = context.settings(
-        key="sub_agents_mcp_client", datatype=MCPClientConfig
+async def __init_event__(context: EventContext) -> None:
+    """Prepare the main agent blueprint: settings, tools and system prompt."""
+    await agent_blueprints.prepare(
+        context, settings_key=SETTINGS_KEY, mcp_settings_key=MCP_SETTINGS_KEY
     )
 
-    assert agent_settings.system_prompt_template, "missing system_prompt_template"
-    assert agent_settings.tool_prompt_template, "missing tool_prompt_template"
-
-    with open(agent_settings.system_prompt_template) as f:
-        system_prompt_template = f.read()
-    with open(agent_settings.tool_prompt_template) as f:
-        tool_prompt_template = f.read()
 
-    agent_config = create_agent_config(
-        name=agent_settings.agent_name,
-        prompt_template=system_prompt_template,
-        variables={},
-        enable_tools=True,
-        tools=agent_settings.allowed_tools,
-        tool_prompt_template=tool_prompt_template,
-    )
-    tools = await resolve_tools(
-        mcp_settings,
-        context,
-        agent_id=agent_config.key,
-        allowed_tools=agent_config.tools,
-    )
-    completion_config = CompletionConfig(available_tools=tools)
-    conversation = build_conversation(
-        existing=None,
-        message=payload.user_message,
-        system_prompt=render_prompt(
-            agent_config,
-            {
-                "tool_descriptions": tool_descriptions(
-                    tools, include_schemas=agent_settings.include_tool_schemas_in_prompt
-                )
-            },
-            include_tools=agent_config.enable_tools,
-        ),
+async def init_conversation(payload: AgentRequest, context: EventContext) -> AgentLoopPayload:
+    """Continue or start the conversation with the user message for the main agent."""
+    blueprint = await agent_blueprints.get(
+        context, settings_key=SETTINGS_KEY, mcp_settings_key=MCP_SETTINGS_KEY
     )
+    existing = await _load_conversation(payload, context)
     return AgentLoopPayload(
-        conversation=conversation,
+        conversation=blueprint.conversation(payload.user_message, existing),
         user_context={},
-        completion_config=completion_config,
+        completion_config=blueprint.completion_config,
         loop_config=AgentLoopConfig(max_iterations=3),
-        agent_settings=agent_settings,
-        mcp_settings=mcp_settings,
+        agent_settings=blueprint.agent_settings,
+        mcp_settings=blueprint.mcp_settings,
+        metadata={STORED_MESSAGES_KEY: str(len(existing.messages) if existing else 0)},
+        deadline=event_deadline(context),
     )
 
 
 async def result(payload: AgentLoopResult, context: EventContext) -> AgentResponse:
     """Wrap the final loop message and tool call log into a response object."""
+    store_settings = context.settings(key="conversation_store", datatype=ConversationStoreSettings)
+    await conversation_store(store_settings).save(
+        payload.conversation, stored_count=int(payload.metadata.get(STORED_MESSAGES_KEY, 0))
+    )
     last_message = payload.conversation.messages[-1]
     response = AgentResponse(
         conversation=payload.conversation,
@@ -97,3 +71,14 @@ async def result(payload: AgentLoopResult, context: EventContext) -> AgentRespon
         tool_calls=payload.tool_call_log,
     )
     return response
+
+
+async def _load_conversation(payload: AgentRequest, context: EventContext) -> Conversation | None:
+    """Return the stored conversation to continue, or a new one for a new `conversation_id`."""
+    if payload.conversation_id is None:
+        return None
+    store_settings = context.settings(key="conversation_store", datatype=ConversationStoreSettings)
+    existing = await conversation_store(store_settings).load(
+        payload.conversation_id, max_messages=store_settings.max_loaded_messages
+    )
+    return existing or Conversation(conversation_id=payload.conversation_id, messages=[])
@@ -16,10 +16,15 @@ logger, extra = app_extra_logger()
 @dataobject
 @dataclass
 class AgentRequest:
-    """Incoming agent instruction."""
+    """Incoming agent instruction.
+
+    To continue a conversation, set `conversation_id` from a previous response and send
+    only the new `user_message`; the history is kept by the agent.
+    """
 
     user_message: str
     metadata: dict[str, Any] = field(default_factory=dict)
+    conversation_id: str | None = None
 
 
 @dataobject
@@ -0,0 +1,172 @@
+"""Agent blueprints: per-agent artifacts prepared once and reused across requests.
+
+A blueprint holds what an agent event needs to start the loop that does not depend on
+the request: its settings, the resolved tool inventory, the completion config with its
+tool index and the rendered system prompt. Blueprints are prepared when the event is
+initialized, i.e. from `__init_event__`, and refreshed only when the prompt templates
+change or the tool inventory, checked every `MCPClientConfig.tool_cache_seconds`, is
+different.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from time import monotonic
+
+from hopeit.app.context import EventContext
+from hopeit.app.logger import app_extra_logger
+
+from hopeit_agents.agent_toolkit.agents.agent_config import AgentConfig
+from hopeit_agents.agent_toolkit.agents.prompts import render_prompt
+from hopeit_agents.agent_toolkit.agents.templates import TemplateRegistry, prompt_templates
+from hopeit_agents.agent_toolkit.mcp.agent_tools import resolve_tools, tool_descriptions
+from hopeit_agents.agent_toolkit.settings import AgentSettings
+from hopeit_agents.mcp_client.models import MCPClientConfig, ToolDescriptor
+from hopeit_agents.model_client.conversation import build_conversation
+from hopeit_agents.model_client.models import CompletionConfig, Conversation
+
+logger, extra = app_extra_logger()
+
+__all__ = ["AgentBlueprint", "AgentBlueprints", "agent_blueprints"]
+
+
+@dataclass(frozen=True)
+class AgentBlueprint:
+    """Request-independent artifacts needed to run an agent."""
+
+    agent_config: AgentConfig
+    agent_settings: AgentSettings
+    mcp_settings: MCPClientConfig
+    tools: list[ToolDescriptor]
+    completion_config: CompletionConfig
+    system_prompt: str
+
+    def conversation(self, message: str, existing: Conversation | None = None) -> Conversation:
+        """Return a conversation with the blueprint system prompt and the user `message`."""
+        return build_conversation(existing, message=message, system_prompt=self.system_prompt)
+
+
+@dataclass
+class _Entry:
+    blueprint: AgentBlueprint
+    variables: Mapping[str, str]
+    tools_checked_at: float
+
+
+class AgentBlueprints:
+    """Blueprints by app and agent settings key.
+
+    `variables` are extra prompt template values that do not change between requests.
+    Tool descriptions are always available to templates as `tool_descriptions`.
+    """
+
+    def __init__(self, templates: TemplateRegistry = prompt_templates) -> None:
+        self.templates = templates
+        self._entries: dict[tuple[str, str, str], _Entry] = {}
+
+    async def prepare(
+        self,
+        context: EventContext,
+        *,
+        settings_key: str,
+        mcp_settings_key: str,
+        variables: Mapping[str, str] | None = None,
+    ) -> AgentBlueprint:
+        """Build the blueprint for the agent, resolving its tools."""
+        agent_settings = context.settings(key=settings_key, datatype=AgentSettings)
+        mcp_settings = context.settings(key=mcp_settings_key, datatype=MCPClientConfig)
+        agent_config = self.templates.agent_config(agent_settings)
+        tools = await resolve_tools(
+            mcp_settings, context, agent_id=agent_config.key, allowed_tools=agent_config.tools
+        )
+        entry = _Entry(
+            blueprint=self._build(agent_config, agent_settings, mcp_settings, tools, variables),
+            variables=dict(variables or {}),
+            tools_checked_at=monotonic(),
+        )
+        self._entries[(context.app_key, settings_key, mcp_settings_key)] = entry
+        logger.info(
+            context,
+            "Agent blueprint prepared",
+            extra=extra(agent_id=agent_config.key, tools=len(tools)),
+        )
+        return entry.blueprint
+
+    async def get(
+        self,
+        context: EventContext,
+        *,
+        settings_key: str,
+        mcp_settings_key: str,
+        variables: Mapping[str, str] | None = None,
+    ) -> AgentBlueprint:
+        """Return the prepared blueprint, rebuilding it when prompts or tools changed.
+
+        Blueprints not prepared yet are prepared on first use. Without tools, i.e. when
+        the MCP server was not available, tools are resolved again on every call.
+        """
+        entry = self._entries.get((context.app_key, settings_key, mcp_settings_key))
+        if entry is None:
+            return await self.prepare(
+                context,
+                settings_key=settings_key,
+                mcp_settings_key=mcp_settings_key,
+                variables=variables,
+            )
+        blueprint = entry.blueprint
+        agent_config = self.templates.agent_config(blueprint.agent_settings)
+        tools = blueprint.tools
+        now = monotonic()
+        if not tools or now - entry.tools_checked_at >= blueprint.mcp_settings.tool_cache_seconds:
+            tools = await resolve_tools(
+                blueprint.mcp_settings,
+                context,
+                agent_id=agent_config.key,
+                allowed_tools=agent_config.tools,
+            )
+            entry.tools_checked_at = now
+        if variables is not None and variables != entry.variables:
+            entry.variables = dict(variables)
+        elif agent_config is blueprint.agent_config and tools == blueprint.tools:
+            return blueprint
+
+        entry.blueprint = self._build(
+            agent_config, blueprint.agent_settings, blueprint.mcp_settings, tools, entry.variables
+        )
+        logger.info(
+            context,
+            "Agent blueprint refreshed",
+            extra=extra(agent_id=agent_config.key, tools=len(tools)),
+        )
+        return entry.blueprint
+
+    @staticmethod
+    def _build(
+        agent_config: AgentConfig,
+        agent_settings: AgentSettings,
+        mcp_settings: MCPClientConfig,
+        tools: list[ToolDescriptor],
+        variables: Mapping[str, str] | None,
+    ) -> AgentBlueprint:
+        system_prompt = render_prompt(
+            agent_config,
+            {
+                **(variables or {}),
+                "tool_descriptions": tool_descriptions(
+                    tools, include_schemas=agent_settings.include_tool_schemas_in_prompt
+                ),
+            },
+            include_tools=agent_config.enable_tools,
+        )
+        completion_config = CompletionConfig(available_tools=tools)
+        completion_config.tool_index()
+        return AgentBlueprint(
+            agent_config=agent_config,
+            agent_settings=agent_settings,
+            mcp_settings=mcp_settings,
+            tools=tools,
+            completion_config=completion_config,
+            system_prompt=system_prompt,
+        )
+
+
+agent_blueprints = AgentBlueprints()
@@ -1,27 +1,27 @@
 """Agent prompt configuration utilities."""
 
-import re
-
 from hopeit_agents.agent_toolkit.agents.agent_config import AgentConfig
-
-_PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+from hopeit_agents.agent_toolkit.agents.templates import compile_template, shared_prompt
 
 
 def render_prompt(
     agent_config: AgentConfig, extra_variables: dict[str, str], *, include_tools: bool = False
 ) -> str:
-    rendered = agent_config.prompt_template
+    """Render the agent prompt, appending the tool prompt when `include_tools` is set.
+
+    Templates are compiled once and rendered in a single pass using the agent config
+    variables overridden by `extra_variables`. The result is shared with equal prompts
+    rendered before, see `shared_prompt`.
+    """
+    templates = [compile_template(agent_config.prompt_template)]
     if include_tools:
         if agent_config.tool_prompt_template is None:
             raise ValueError("Missing tool_prompt_template")
-        rendered += "\n" + agent_config.tool_prompt_template
+        templates.append(compile_template(agent_config.tool_prompt_template))
     all_variables = {**agent_config.variables, **extra_variables}
-    for key, value in all_variables.items():
-        rendered = rendered.replace("{{" + key + "}}", value)
 
-    unresolved = set(_PLACEHOLDER_PATTERN.findall(rendered))
-    if unresolved:
-        missing = ", ".join(sorted(unresolved))
-        raise ValueError(f"Missing values for placeholders: {missing}")
+    missing = set().union(*(template.missing(all_variables) for template in templates))
+    if missing:
+        raise ValueError(f"Missing values for placeholders: {', '.join(sorted(missing))}")
 
-    return rendered
+    return shared_prompt("\n".join(template.render(all_variables) for template in templates))
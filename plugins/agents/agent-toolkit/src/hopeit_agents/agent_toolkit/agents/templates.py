@@ -0,0 +1,158 @@
+"""Compiled prompt templates and a registry loading them from files.
+
+Templates are compiled once into literal segments and placeholder names, so rendering
+is a single join. `TemplateRegistry` keeps templates read from files, reloading them
+when their modification time changes, and the `AgentConfig` built from them, so
+preparing prompts for a request does no file reads nor hashing. Rendered prompts are
+shared with `shared_prompt`, so conversations with the same system prompt keep it once.
+"""
+
+import os
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from time import monotonic
+
+from hopeit_agents.agent_toolkit.agents.agent_config import AgentConfig, create_agent_config
+from hopeit_agents.agent_toolkit.settings import AgentSettings
+
+__all__ = [
+    "PromptTemplate",
+    "TemplateRegistry",
+    "compile_template",
+    "prompt_templates",
+    "shared_prompt",
+]
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+_PROMPTS_MAX_SIZE = 256
+_prompts: dict[str, str] = {}
+
+
+class PromptTemplate:
+    """Template text split into literal segments and `{{name}}` placeholders."""
+
+    __slots__ = ("source", "_literals", "_names", "placeholders")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts = _PLACEHOLDER_PATTERN.split(source)
+        self._literals = parts[0::2]
+        self._names = parts[1::2]
+        self.placeholders = frozenset(self._names)
+
+    def render(self, variables: Mapping[str, str]) -> str:
+        """Return the template with placeholders replaced by `variables` values.
+
+        Values are inserted as is: placeholders contained in values are not expanded.
+        """
+        try:
+            values = [variables[name] for name in self._names]
+        except KeyError:
+            missing = ", ".join(sorted(self.missing(variables)))
+            raise ValueError(f"Missing values for placeholders: {missing}") from None
+        literals = self._literals
+        out = [literals[0]]
+        for value, literal in zip(values, literals[1:], strict=True):
+            out.append(value)
+            out.append(literal)
+        return "".join(out)
+
+    def missing(self, variables: Mapping[str, str]) -> set[str]:
+        """Return placeholder names without a value in `variables`."""
+        return {name for name in self.placeholders if name not in variables}
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> PromptTemplate:
+    """Return the compiled template for `source`, cached by its text."""
+    return PromptTemplate(source)
+
+
+def shared_prompt(prompt: str) -> str:
+    """Return a shared string equal to the rendered `prompt`, so it is kept once.
+
+    The cache is bounded, and cleared when full, so prompts no longer rendered are
+    released.
+    """
+    shared = _prompts.get(prompt)
+    if shared is None:
+        if len(_prompts) >= _PROMPTS_MAX_SIZE:
+            _prompts.clear()
+        shared = _prompts[prompt] = prompt
+    return shared
+
+
+@dataclass
+class _TemplateFile:
+    template: PromptTemplate
+    mtime_ns: int
+    checked_at: float
+
+
+class TemplateRegistry:
+    """Prompt templates loaded from files, and agent configurations built from them.
+
+    Files are checked for changes at most once every `check_interval_seconds`, and
+    reloaded when their modification time changes.
+    """
+
+    def __init__(self, *, check_interval_seconds: float = 2.0) -> None:
+        self.check_interval_seconds = check_interval_seconds
+        self._files: dict[str, _TemplateFile] = {}
+        self._agent_configs: dict[
+            tuple[str, str, str | None, bool, tuple[str, ...]],
+            tuple[PromptTemplate, PromptTemplate | None, AgentConfig],
+        ] = {}
+
+    def template(self, path: str) -> PromptTemplate:
+        """Return the compiled template in the file at `path`."""
+        now = monotonic()
+        entry = self._files.get(path)
+        if entry is not None and now - entry.checked_at < self.check_interval_seconds:
+            return entry.template
+        mtime_ns = os.stat(path).st_mtime_ns
+        if entry is None or entry.mtime_ns != mtime_ns:
+            with open(path, encoding="utf-8") as f:
+                entry = _TemplateFile(compile_template(f.read()), mtime_ns, now)
+            self._files[path] = entry
+        else:
+            entry.checked_at = now
+        return entry.template
+
+    def agent_config(self, agent_settings: AgentSettings) -> AgentConfig:
+        """Return the `AgentConfig` for the prompt templates configured in `agent_settings`.
+
+        The configuration, including its version hash, is computed again only when the
+        template files change.
+        """
+        key = (
+            agent_settings.agent_name,
+            agent_settings.system_prompt_template,
+            agent_settings.tool_prompt_template,
+            agent_settings.enable_tools,
+            tuple(agent_settings.allowed_tools),
+        )
+        prompt = self.template(agent_settings.system_prompt_template)
+        tool_prompt = (
+            self.template(agent_settings.tool_prompt_template)
+            if agent_settings.tool_prompt_template
+            else None
+        )
+        cached = self._agent_configs.get(key)
+        if cached is not None and cached[0] is prompt and cached[1] is tool_prompt:
+            return cached[2]
+        agent_config = create_agent_config(
+            name=agent_settings.agent_name,
+            prompt_template=prompt.source,
+            variables={},
+            enable_tools=agent_settings.enable_tools,
+            tools=agent_settings.allowed_tools,
+            tool_prompt_template=None if tool_prompt is None else tool_prompt.source,
+        )
+        self._agent_configs[key] = (prompt, tool_prompt, agent_config)
+        return agent_config
+
+
+prompt_templates = TemplateRegistry()
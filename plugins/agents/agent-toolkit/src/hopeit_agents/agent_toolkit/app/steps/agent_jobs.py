@@ -0,0 +1,231 @@
+"""Hopeit event steps to run the agent loop as jobs consumed from a stream.
+
+A submit event prepares an `AgentLoopPayload` and uses `submit_agent_job` to record a
+queued job and publish it to a stream. A STREAM event consuming that stream runs the
+loop using `run_agent_job`, and a GET event uses `get_agent_job` to return the job
+status and result, optionally waiting until the job finishes.
+
+Job state is kept in files under `AgentJobSettings.store_path`, one per job, so it can
+be shared between the API and worker processes. Files are read and written in worker
+threads.
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+import uuid
+from dataclasses import replace
+from datetime import UTC, datetime
+from enum import Enum
+from pathlib import Path
+from time import monotonic
+
+from hopeit.app.context import EventContext
+from hopeit.app.logger import app_extra_logger
+from hopeit.dataobjects import dataclass, dataobject
+from hopeit.dataobjects.payload import Payload
+
+from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
+    AgentLoopPayload,
+    AgentLoopResult,
+    agent_with_tools_loop,
+    event_deadline,
+)
+from hopeit_agents.agent_toolkit.settings import AgentJobSettings
+
+logger, extra = app_extra_logger()
+
+__all__ = [
+    "AgentJob",
+    "AgentJobStatus",
+    "AgentJobStore",
+    "get_agent_job",
+    "run_agent_job",
+    "submit_agent_job",
+]
+
+_JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class AgentJobStatus(str, Enum):
+    """Lifecycle status of an agent job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    @property
+    def finished(self) -> bool:
+        """True when the job will not change status anymore."""
+        return self in (AgentJobStatus.COMPLETED, AgentJobStatus.FAILED)
+
+
+@dataobject(event_id="job_id", event_ts="submitted_at")
+@dataclass
+class AgentJob:
+    """Agent loop execution requested to run asynchronously.
+
+    `payload` is only set on the job published to the stream; stored jobs and
+    status responses carry the status, timestamps and, once finished, the loop
+    `result` or `error`.
+    """
+
+    job_id: str
+    status: AgentJobStatus
+    submitted_at: datetime
+    payload: AgentLoopPayload | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    attempts: int = 0
+    result: AgentLoopResult | None = None
+    error: str | None = None
+
+
+class AgentJobStore:
+    """Keeps agent job state as JSON files in a directory."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    async def save(self, job: AgentJob) -> None:
+        """Store job state, without the loop payload.
+
+        The file is replaced atomically so readers never observe a partial write.
+        """
+        await asyncio.to_thread(self._save, job)
+
+    async def load(self, job_id: str) -> AgentJob | None:
+        """Return stored job state, or None if the job is unknown."""
+        if not _JOB_ID_PATTERN.match(job_id):
+            return None
+        return await asyncio.to_thread(self._load, job_id)
+
+    async def wait(self, job_id: str, *, timeout: float, poll_interval: float) -> AgentJob | None:
+        """Return job state as soon as it is finished, or when `timeout` seconds elapse."""
+        end = monotonic() + timeout
+        job = await self.load(job_id)
+        while job is not None and not job.status.finished:
+            remaining = end - monotonic()
+            if remaining <= 0.0:
+                break
+            await asyncio.sleep(min(poll_interval, remaining))
+            job = await self.load(job_id)
+        return job
+
+    def _save(self, job: AgentJob) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        data = Payload.to_json(replace(job, payload=None))
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, prefix=f".{job.job_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_name, self._job_file(job.job_id))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _load(self, job_id: str) -> AgentJob | None:
+        try:
+            with open(self._job_file(job_id)) as f:
+                return Payload.from_json(f.read(), datatype=AgentJob)
+        except FileNotFoundError:
+            return None
+
+    def _job_file(self, job_id: str) -> Path:
+        return self.path / f"{job_id}.json"
+
+
+def _job_store(context: EventContext) -> tuple[AgentJobStore, AgentJobSettings]:
+    settings = context.settings(key="agent_jobs", datatype=AgentJobSettings)
+    return AgentJobStore(settings.store_path), settings
+
+
+async def submit_agent_job(payload: AgentLoopPayload, context: EventContext) -> AgentJob:
+    """Register a queued job for the given loop payload.
+
+    Returns the job including the payload, to be published to the stream consumed by
+    workers running `run_agent_job`.
+    """
+    store, _ = _job_store(context)
+    job = AgentJob(
+        job_id=uuid.uuid4().hex,
+        status=AgentJobStatus.QUEUED,
+        submitted_at=datetime.now(UTC),
+        payload=payload,
+    )
+    await store.save(job)
+    logger.info(context, "Agent job submitted", extra=extra(job_id=job.job_id))
+    return job
+
+
+async def run_agent_job(payload: AgentJob, context: EventContext) -> AgentJob:
+    """Run the agent loop for a job consumed from the stream and store its outcome.
+
+    The loop deadline is recomputed from the worker event timeout, since time spent
+    queued should not count against the run. Jobs already finished, i.e. when a message
+    is delivered again, are not executed twice. Errors are recorded as a FAILED job.
+
+    The job id is used as the loop `run_id`, so when loop checkpoints are configured a
+    job delivered again after a worker failure resumes from its last checkpoint.
+    """
+    store, _ = _job_store(context)
+    job = await store.load(payload.job_id) or replace(payload, payload=None)
+    if job.status.finished:
+        logger.info(context, "Agent job already finished", extra=extra(job_id=job.job_id))
+        return job
+    if payload.payload is None:
+        job = replace(
+            job,
+            status=AgentJobStatus.FAILED,
+            finished_at=datetime.now(UTC),
+            error="Agent job received without payload",
+        )
+        await store.save(job)
+        return job
+
+    job = replace(
+        job,
+        status=AgentJobStatus.RUNNING,
+        started_at=datetime.now(UTC),
+        attempts=job.attempts + 1,
+    )
+    await store.save(job)
+
+    loop_payload = replace(
+        payload.payload,
+        deadline=event_deadline(context),
+        run_id=payload.payload.run_id or job.job_id,
+    )
+    try:
+        result = await agent_with_tools_loop(loop_payload, context)
+        job = replace(
+            job, status=AgentJobStatus.COMPLETED, finished_at=datetime.now(UTC), result=result
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error(context, "Agent job failed", extra=extra(job_id=job.job_id, error=str(e)))
+        job = replace(
+            job, status=AgentJobStatus.FAILED, finished_at=datetime.now(UTC), error=str(e)
+        )
+    await store.save(job)
+    return job
+
+
+async def get_agent_job(
+    job_id: str, context: EventContext, *, wait_seconds: float = 0.0
+) -> AgentJob | None:
+    """Return the job status and result, or None if the job is unknown.
+
+    With `wait_seconds`, long-polls until the job finishes or the time elapses. The wait
+    is limited by `AgentJobSettings.max_wait_seconds` and the event response timeout.
+    """
+    store, settings = _job_store(context)
+    timeout = min(
+        wait_seconds,
+        settings.max_wait_seconds,
+        (event_deadline(context) - datetime.now(UTC)).total_seconds(),
+    )
+    if timeout <= 0.0:
+        return await store.load(job_id)
+    return await store.wait(job_id, timeout=timeout, poll_interval=settings.poll_interval_seconds)
@@ -1,39 +1,113 @@
 """Hopeit event step that runs an agent loop capable of executing MCP tools."""
 
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from time import monotonic
 from typing import Any
 
+from hopeit.app.config import EventType
 from hopeit.app.context import EventContext
+from hopeit.app.logger import app_extra_logger
 from hopeit.dataobjects import dataclass, dataobject, field
 from hopeit.dataobjects.payload import Payload
 
+from hopeit_agents.agent_toolkit.checkpoints import CheckpointStore, create_checkpoint_store
 from hopeit_agents.agent_toolkit.mcp.agent_tools import (
     execute_tool_calls,
+    load_tool_results,
 )
-from hopeit_agents.agent_toolkit.settings import AgentSettings
+from hopeit_agents.agent_toolkit.mcp.tool_results import render_tool_result, tool_result_rendering
+from hopeit_agents.agent_toolkit.scheduler import SchedulerTimeoutError, scheduled
+from hopeit_agents.agent_toolkit.settings import (
+    AgentCheckpointSettings,
+    AgentSchedulingSettings,
+    AgentSettings,
+    AgentTracingSettings,
+    ModelEscalationTrigger,
+    ModelRoutingPolicy,
+    SchedulerSettings,
+    ToolResultRendering,
+)
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.client import MCPClientError
 from hopeit_agents.mcp_client.models import (
     MCPClientConfig,
+    ToolCallLogRetention,
     ToolCallRecord,
     ToolExecutionResult,
     ToolInvocation,
+    retained_tool_calls,
 )
+from hopeit_agents.mcp_client.tracing import Span, jsonl_span_exporter, span
 from hopeit_agents.model_client.api import generate as model_generate
 from hopeit_agents.model_client.client import ModelClientError
 from hopeit_agents.model_client.models import (
     CompletionConfig,
     CompletionRequest,
+    CompletionResponse,
     Conversation,
     Message,
     Role,
+    ToolFunctionCall,
 )
 
+logger, extra = app_extra_logger()
+
+
+class AgentLoopStopReason(str, Enum):
+    """Reason why the agent loop stopped."""
+
+    COMPLETED = "completed"
+    MAX_ITERATIONS = "max_iterations"
+    DEADLINE = "deadline"
+    TOKEN_BUDGET = "token_budget"
+    PROMPT_BUDGET = "prompt_budget"
+    TIME_BUDGET = "time_budget"
+    TOOL_CALL_BUDGET = "tool_call_budget"
+
 
 @dataobject
 @dataclass
 class AgentLoopConfig:
-    """Configuration on how the loop can run."""
+    """Configuration on how the loop can run.
+
+    `min_iteration_seconds` is the minimum time that must remain before the deadline
+    to start another iteration. The average duration of the iterations already run is
+    used instead when it is larger.
+
+    With `checkpoints`, runs with a `run_id` save their state after each iteration and
+    tool call, and resume from the last checkpoint when executed again.
+
+    Budgets, checked before each model and tool call, stop the loop when exceeded:
+    - `max_total_tokens`: tokens reported by the model for all completions,
+    - `max_prompt_tokens`: estimated size of the next prompt, i.e. the tokens of the
+      last completion plus the messages added after it,
+    - `max_seconds`: wall-clock time since the loop started, also limiting the timeout
+      of model and tool calls in flight,
+    - `max_tool_calls`: number of tool calls executed. Calls requested together that
+      exceed it are executed up to the budget.
+
+    With `tracing`, each run records spans for its iterations, model calls and tool
+    calls to a local file.
+
+    With `scheduling`, model and tool calls wait for capacity in process-wide fair
+    schedulers, queued by the tenant or priority class found in the payload metadata.
+
+    `tool_call_log` sets what is kept of each tool call in the result `tool_call_log`
+    and checkpoints. Tool results are added to the conversation in full regardless.
+    """
 
     max_iterations: int
     append_last_assistant_message: bool = False
+    min_iteration_seconds: float = 0.0
+    checkpoints: AgentCheckpointSettings | None = None
+    max_total_tokens: int | None = None
+    max_prompt_tokens: int | None = None
+    max_seconds: float | None = None
+    max_tool_calls: int | None = None
+    tracing: AgentTracingSettings | None = None
+    scheduling: AgentSchedulingSettings | None = None
+    tool_call_log: ToolCallLogRetention = ToolCallLogRetention.FULL
 
 
 @dataobject
@@ -48,6 +122,8 @@ class AgentLoopPayload:
     agent_settings: AgentSettings
     mcp_settings: MCPClientConfig
     metadata: dict[str, str] = field(default_factory=dict)
+    deadline: datetime | None = None
+    run_id: str | None = None
 
 
 @dataobject
@@ -59,10 +135,60 @@ class AgentLoopResult:
     user_context: dict[str, Any]
     tool_call_log: list[ToolCallRecord]
     metadata: dict[str, str] = field(default_factory=dict)
+    stop_reason: AgentLoopStopReason = AgentLoopStopReason.COMPLETED
+    total_tokens: int = 0
+
+
+@dataobject
+@dataclass
+class AgentLoopCheckpoint:
+    """Agent loop state saved to resume an interrupted run.
+
+    `iteration` is the number of iterations completed. `pending_tool_calls` are the tool
+    calls requested by the model in the current iteration; the ones already executed
+    have their result in `tool_call_log`. `stop_reason` is set once the loop stopped.
+    `total_tokens` and `prompt_tokens` track token budgets.
+    """
+
+    run_id: str
+    iteration: int
+    conversation: Conversation
+    tool_call_log: list[ToolCallRecord] = field(default_factory=list)
+    pending_tool_calls: list[ToolInvocation] = field(default_factory=list)
+    model_level: int = 0
+    stop_reason: AgentLoopStopReason | None = None
+    total_tokens: int = 0
+    prompt_tokens: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """True when the run completed and should not be executed again.
+
+        Runs stopped by a deadline can be resumed.
+        """
+        return self.stop_reason not in (None, AgentLoopStopReason.DEADLINE)
+
+
+def event_deadline(context: EventContext) -> datetime:
+    """Return the time at which the current event execution times out.
+
+    Computed from the event start time and its configured `response_timeout`, or the
+    stream `timeout` for STREAM events.
+    """
+    settings = context.settings
+    timeout = (
+        settings.stream.timeout
+        if context.event_info.type == EventType.STREAM
+        else settings.response_timeout
+    )
+    return context.creation_ts + timedelta(seconds=timeout)
 
 
 async def agent_with_tools_loop(
-    payload: AgentLoopPayload, context: EventContext
+    payload: AgentLoopPayload,
+    context: EventContext,
+    *,
+    checkpoint_store: CheckpointStore | None = None,
 ) -> AgentLoopResult:
     """Execute the agent reasoning loop using an LLM with optional tool calls.
 
@@ -76,84 +202,565 @@ async def agent_with_tools_loop(
     Args:
         payload: Aggregated configuration, conversation state, and MCP settings.
         context: Hopeit event context used to execute the model and tools.
+        checkpoint_store: store used to checkpoint runs, instead of the one configured
+            in `loop_config.checkpoints`.
 
     Returns:
         AgentLoopResult containing the updated conversation and executed tool log.
+
+    When `payload.deadline` is set, model and tool calls are limited to the remaining
+    time and the loop stops early, returning the conversation so far, once the remaining
+    time cannot cover another iteration.
+
+    When `agent_settings.model_routing` is set, each turn runs with the routing policy
+    first model and is retried with larger models when its output triggers escalation.
+
+    When `payload.run_id` is set and a checkpoint store is available, the run state is
+    saved after each iteration and tool call. Executing a run again resumes from its
+    last checkpoint: completed iterations and tool calls with recorded results are not
+    executed again, and finished runs return the saved result.
+
+    Budgets configured in `loop_config` are checked before each model and tool call,
+    stopping the loop with the corresponding `stop_reason` when exceeded.
+
+    The run is recorded as an `agent_loop` span, exported to `loop_config.tracing` when
+    set, or to the process-wide span exporter.
     """
+    tracing = payload.loop_config.tracing
+    with span(
+        "agent_loop",
+        exporter=jsonl_span_exporter(tracing.path) if tracing else None,
+        run_id=payload.run_id,
+        conversation_id=payload.conversation.conversation_id,
+        max_iterations=payload.loop_config.max_iterations,
+    ) as loop_span:
+        result = await _run_loop(payload, context, checkpoint_store)
+        loop_span.set_attributes(
+            stop_reason=result.stop_reason.value,
+            total_tokens=result.total_tokens,
+            tool_calls=len(result.tool_call_log),
+            messages=len(result.conversation.messages),
+        )
+        return result
+
 
-    conversation = payload.conversation
+async def _run_loop(
+    payload: AgentLoopPayload,
+    context: EventContext,
+    checkpoint_store: CheckpointStore | None,
+) -> AgentLoopResult:
     completion_config = payload.completion_config
     loop_config = payload.loop_config
     agent_settings = payload.agent_settings
-    mcp_settings = payload.mcp_settings
+    deadline = payload.deadline
 
-    tool_call_log: list[ToolCallRecord] = []
+    store = checkpoint_store
+    if store is None and loop_config.checkpoints is not None:
+        store = create_checkpoint_store(loop_config.checkpoints)
+    state = await _load_checkpoint(store, payload.run_id) if store and payload.run_id else None
+    if state is None:
+        state = AgentLoopCheckpoint(
+            run_id=payload.run_id or "", iteration=0, conversation=payload.conversation
+        )
+    elif not state.finished:
+        state.stop_reason = None
+        logger.info(
+            context,
+            "Resuming agent loop from checkpoint",
+            extra=extra(run_id=state.run_id, iteration=state.iteration),
+        )
+    if not payload.run_id:
+        store = None
 
-    for _ in range(0, loop_config.max_iterations):
-        model_request = CompletionRequest(conversation=conversation, config=completion_config)
+    sticky_routing = (
+        agent_settings.model_routing is not None and agent_settings.model_routing.sticky
+    )
+    first_iteration = state.iteration
+    started = monotonic()
+    budget_deadline = (
+        None
+        if loop_config.max_seconds is None
+        else datetime.now(UTC) + timedelta(seconds=loop_config.max_seconds)
+    )
+    # Calls in flight are limited by the time budget too, not only checked before them
+    call_deadline = _earliest(deadline, budget_deadline)
 
+    if state.pending_tool_calls and not state.finished:
+        # Interrupted while executing tool calls: complete them before the next turn
         try:
-            completion = await model_generate.generate(model_request, context)
-            conversation = completion.conversation
+            await _execute_pending_tool_calls(
+                state, payload, context, store, started, call_deadline, budget_deadline
+            )
+            state.iteration += 1
+            await _save_checkpoint(store, state)
+        except MCPClientError:
+            if deadline is None or _remaining_seconds(deadline) > 0.0:
+                raise
+            state.stop_reason = AgentLoopStopReason.DEADLINE
+        except SchedulerTimeoutError:
+            state.stop_reason = _timed_out_reason(deadline, budget_deadline)
+
+    for iteration in range(state.iteration, loop_config.max_iterations):
+        if state.stop_reason is not None:
+            break
+        if deadline is not None and not _can_run_iteration(
+            deadline, loop_config, iteration - first_iteration, monotonic() - started
+        ):
+            state.stop_reason = AgentLoopStopReason.DEADLINE
+            break
+        state.stop_reason = _model_budget_exceeded(loop_config, state, monotonic() - started)
+        if state.stop_reason is not None:
+            break
 
-            if agent_settings.enable_tools and completion.tool_calls:
-                tool_call_records = await execute_tool_calls(
-                    mcp_settings,
+        with span("agent_loop.iteration", iteration=iteration) as iteration_span:
+            try:
+                completion, state.model_level, tokens = await _generate(
+                    state.conversation,
+                    completion_config,
+                    agent_settings.model_routing,
+                    state.model_level if sticky_routing else 0,
+                    call_deadline,
                     context,
-                    tool_calls=[
+                    loop_config.scheduling.model if loop_config.scheduling else None,
+                    _scheduling_queue(payload),
+                )
+                state.conversation = completion.conversation
+                iteration_span.set_attributes(
+                    model=completion.model,
+                    model_level=state.model_level,
+                    tool_calls=len(completion.tool_calls),
+                )
+                state.total_tokens += tokens
+                state.prompt_tokens = (
+                    completion.usage.total_tokens
+                    if completion.usage
+                    else _estimate_tokens(state.conversation.messages)
+                )
+
+                if agent_settings.enable_tools and completion.tool_calls:
+                    state.pending_tool_calls = [
                         ToolInvocation(
                             tool_name=tc.function.name,
-                            payload=Payload.from_json(
-                                tc.function.arguments, datatype=dict[str, Any]
-                            ),
+                            payload=tc.function.arguments_dict(),
                             call_id=tc.id,
-                            session_id=conversation.conversation_id,  # TODO: session_id?
+                            session_id=state.conversation.conversation_id,  # TODO: session_id?
                         )
                         for tc in completion.tool_calls
-                    ],
-                    session_id=conversation.conversation_id,  # TODO: session_id?
-                )
-
-                for record in tool_call_records:
-                    conversation = conversation.with_message(
-                        Message(
-                            role=Role.TOOL,
-                            content=_format_tool_result(record.response),
-                            tool_call_id=record.request.tool_call_id,
-                            name=record.request.tool_name,
-                        ),
+                    ]
+                    await _save_checkpoint(store, state)
+                    await _execute_pending_tool_calls(
+                        state, payload, context, store, started, call_deadline, budget_deadline
                     )
 
-                tool_call_log.extend(tool_call_records)
+                elif not completion.message.content:
+                    # Keep going if last assistant message is empty
+                    pass
+                else:
+                    if loop_config.append_last_assistant_message:
+                        # Finish tool call loop an return assistant response
+                        state.conversation = state.conversation.with_message(
+                            Message(role=Role.ASSISTANT, content=completion.message.content or "")
+                        )
+                    state.stop_reason = AgentLoopStopReason.COMPLETED
 
-            elif not completion.message.content:
-                # Keep going if last assistant message is empty
-                continue
-            else:
-                if payload.loop_config.append_last_assistant_message:
-                    # Finish tool call loop an return assistant response
-                    conversation = conversation.with_message(
-                        Message(role=Role.ASSISTANT, content=completion.message.content or "")
-                    )
+            # In case of error, usually parsing LLM response, keep looping to fix it
+            except ModelClientError as e:
+                # Timed out on the deadline or time budget: stop without adding the error
+                reason = _deadline_stop_reason(deadline, budget_deadline)
+                if reason is not None:
+                    state.stop_reason = reason
+                    break
+                error_message = Message(role=Role.SYSTEM, content=f"Error parsing response: {e}")
+                state.conversation = state.conversation.with_message(error_message)
+                state.prompt_tokens += _estimate_tokens([error_message])
+            except MCPClientError:
+                if deadline is None or _remaining_seconds(deadline) > 0.0:
+                    raise
+                state.stop_reason = AgentLoopStopReason.DEADLINE
+                break
+            except SchedulerTimeoutError:
+                state.stop_reason = _timed_out_reason(deadline, budget_deadline)
                 break
 
-        # In case of error, usually parsing LLM response, keep looping to fix it
-        except ModelClientError as e:
-            conversation = conversation.with_message(
-                Message(role=Role.SYSTEM, content=f"Error parsing response: {e}")
-            )
+        state.iteration = iteration + 1
+        await _save_checkpoint(store, state)
     # end loop
+
+    if state.stop_reason is None:
+        state.stop_reason = AgentLoopStopReason.MAX_ITERATIONS
+    await _save_checkpoint(store, state)
     return AgentLoopResult(
-        conversation=conversation,
+        conversation=state.conversation,
         user_context=payload.user_context,
-        tool_call_log=tool_call_log,
+        tool_call_log=(
+            [] if loop_config.tool_call_log is ToolCallLogRetention.NONE else state.tool_call_log
+        ),
         metadata=payload.metadata,
+        stop_reason=state.stop_reason,
+        total_tokens=state.total_tokens,
     )
 
 
-def _format_tool_result(result: ToolExecutionResult) -> str:
-    """Return a JSON-formatted string for tool execution results."""
+async def _execute_pending_tool_calls(
+    state: AgentLoopCheckpoint,
+    payload: AgentLoopPayload,
+    context: EventContext,
+    store: CheckpointStore | None,
+    started: float,
+    deadline: datetime | None,
+    budget_deadline: datetime | None,
+) -> None:
+    """Execute pending tool calls without a recorded result, appending results to state.
+
+    When checkpointing or with a time budget, calls are executed one at a time, and
+    the state saved after each. Calls are limited to `deadline`, and a call timing out
+    when `budget_deadline` is reached stops the loop on its time budget. When the tool
+    calls budget does not allow the whole batch, the calls that fit are executed. Calls
+    not executed because a budget is exceeded get a tool message reporting it, and the
+    loop `stop_reason` is set.
+
+    Each batch of calls holds one slot of the `tools` scheduler while executing, waiting
+    for it until `deadline`.
+    """
+    loop_config = payload.loop_config
+    recorded = {record.request.tool_call_id for record in state.tool_call_log}
+    remaining = [tc for tc in state.pending_tool_calls if tc.call_id not in recorded]
+    one_at_a_time = store is not None or loop_config.max_seconds is not None
+    batches = [[tc] for tc in remaining] if one_at_a_time else [remaining]
+    tools_scheduler = loop_config.scheduling.tools if loop_config.scheduling else None
+    queue = _scheduling_queue(payload)
+    executed = 0
+    for batch in batches:
+        if not batch:
+            continue
+        state.stop_reason = _tool_budget_exceeded(loop_config, state, monotonic() - started)
+        if state.stop_reason is not None:
+            break
+        batch = batch[: _tool_calls_left(loop_config, state)]
+        try:
+            with span("agent_loop.tool_calls", tool_calls=len(batch)):
+                async with scheduled("tools", tools_scheduler, queue, deadline):
+                    tool_call_records = await execute_tool_calls(
+                        payload.mcp_settings,
+                        context,
+                        tool_calls=batch,
+                        session_id=state.conversation.conversation_id,  # TODO: session_id?
+                        deadline=deadline,
+                    )
+        except MCPClientError:
+            if _deadline_stop_reason(payload.deadline, budget_deadline) is not (
+                AgentLoopStopReason.TIME_BUDGET
+            ):
+                raise
+            state.stop_reason = AgentLoopStopReason.TIME_BUDGET
+            break
+        except SchedulerTimeoutError:
+            if _timed_out_reason(payload.deadline, budget_deadline) is not (
+                AgentLoopStopReason.TIME_BUDGET
+            ):
+                raise
+            state.stop_reason = AgentLoopStopReason.TIME_BUDGET
+            break
+        executed += len(batch)
+        with span("agent_loop.append_tool_results") as append_span:
+            renderings = [
+                tool_result_rendering(payload.agent_settings, r.request.tool_name)
+                for r in tool_call_records
+            ]
+            # Results returned as blobs are loaded, or previewed when over the rendering
+            # size cap, to render them. Logs keep their handles
+            results = await load_tool_results(
+                payload.mcp_settings,
+                context,
+                [r.response for r in tool_call_records],
+                renderings,
+            )
+            _append_tool_results(
+                state, payload, tool_call_records, results, renderings, append_span
+            )
+        state.tool_call_log.extend(_logged_tool_calls(tool_call_records, loop_config))
+        await _save_checkpoint(store, state)
+    if executed < len(remaining):
+        state.stop_reason = state.stop_reason or AgentLoopStopReason.TOOL_CALL_BUDGET
+        _skip_tool_calls(state, remaining[executed:], state.stop_reason)
+    state.pending_tool_calls = []
+
+
+def _append_tool_results(
+    state: AgentLoopCheckpoint,
+    payload: AgentLoopPayload,
+    tool_call_records: list[ToolCallRecord],
+    results: list[ToolExecutionResult],
+    renderings: list[ToolResultRendering],
+    append_span: Span,
+) -> None:
+    chars = 0
+    for record, result, rendering in zip(tool_call_records, results, renderings, strict=True):
+        content = _format_tool_result(
+            result, rendering, _output_schema(payload.completion_config, record.request.tool_name)
+        )
+        chars += len(content)
+        state.conversation = state.conversation.with_message(
+            Message(
+                role=Role.TOOL,
+                content=content,
+                tool_call_id=record.request.tool_call_id,
+                name=record.request.tool_name,
+            ),
+        )
+        state.prompt_tokens += _estimate_tokens(state.conversation.messages[-1:])
+    append_span.set_attributes(messages=len(tool_call_records), chars=chars)
+
+
+def _logged_tool_calls(
+    records: list[ToolCallRecord], loop_config: AgentLoopConfig
+) -> list[ToolCallRecord]:
+    """Records kept in the loop state, as summaries when the result does not keep them.
+
+    Summaries are still needed to resume runs and to count tool calls for budgets.
+    """
+    retention = loop_config.tool_call_log
+    if retention is ToolCallLogRetention.NONE:
+        retention = ToolCallLogRetention.SUMMARY
+    return retained_tool_calls(records, retention)
+
+
+def _skip_tool_calls(
+    state: AgentLoopCheckpoint, tool_calls: list[ToolInvocation], reason: AgentLoopStopReason
+) -> None:
+    """Answer tool calls that will not be executed, keeping the conversation consistent."""
+    for tool_call in tool_calls:
+        state.conversation = state.conversation.with_message(
+            Message(
+                role=Role.TOOL,
+                content=f"Tool call not executed: {reason.value}",
+                tool_call_id=tool_call.call_id,
+                name=tool_call.tool_name,
+            )
+        )
+
+
+def _model_budget_exceeded(
+    loop_config: AgentLoopConfig, state: AgentLoopCheckpoint, elapsed: float
+) -> AgentLoopStopReason | None:
+    """Return the stop reason of the first budget that does not allow another model call."""
+    if loop_config.max_total_tokens is not None and (
+        state.total_tokens >= loop_config.max_total_tokens
+    ):
+        return AgentLoopStopReason.TOKEN_BUDGET
+    if loop_config.max_prompt_tokens is not None and (
+        state.prompt_tokens > loop_config.max_prompt_tokens
+    ):
+        return AgentLoopStopReason.PROMPT_BUDGET
+    if loop_config.max_seconds is not None and elapsed >= loop_config.max_seconds:
+        return AgentLoopStopReason.TIME_BUDGET
+    return None
+
+
+def _tool_budget_exceeded(
+    loop_config: AgentLoopConfig, state: AgentLoopCheckpoint, elapsed: float
+) -> AgentLoopStopReason | None:
+    """Return the stop reason of the first budget that does not allow another tool call."""
+    if loop_config.max_tool_calls is not None and (
+        len(state.tool_call_log) >= loop_config.max_tool_calls
+    ):
+        return AgentLoopStopReason.TOOL_CALL_BUDGET
+    if loop_config.max_seconds is not None and elapsed >= loop_config.max_seconds:
+        return AgentLoopStopReason.TIME_BUDGET
+    return None
+
+
+def _tool_calls_left(loop_config: AgentLoopConfig, state: AgentLoopCheckpoint) -> int | None:
+    """Return the number of tool calls the tool calls budget allows, None if unlimited."""
+    if loop_config.max_tool_calls is None:
+        return None
+    return max(0, loop_config.max_tool_calls - len(state.tool_call_log))
+
+
+def _scheduling_queue(payload: AgentLoopPayload) -> str:
+    """Return the scheduler queue of the run: its tenant or priority class."""
+    scheduling = payload.loop_config.scheduling
+    if scheduling is None:
+        return ""
+    return payload.metadata.get(scheduling.queue_key, scheduling.default_queue)
+
+
+def _estimate_tokens(messages: list[Message]) -> int:
+    """Rough token count of messages content, at about 4 characters per token."""
+    return sum(len(message.content or "") for message in messages) // 4 + len(messages)
+
+
+async def _load_checkpoint(store: CheckpointStore, run_id: str) -> AgentLoopCheckpoint | None:
+    data = await store.load(run_id)
+    if data is None:
+        return None
+    return Payload.from_json(data, datatype=AgentLoopCheckpoint)
+
+
+async def _save_checkpoint(store: CheckpointStore | None, state: AgentLoopCheckpoint) -> None:
+    if store is not None:
+        await store.save(state.run_id, Payload.to_json(state))
+
+
+async def _generate(
+    conversation: Conversation,
+    completion_config: CompletionConfig,
+    routing: ModelRoutingPolicy | None,
+    model_level: int,
+    deadline: datetime | None,
+    context: EventContext,
+    scheduler: SchedulerSettings | None = None,
+    queue: str = "",
+) -> tuple[CompletionResponse, int, int]:
+    """Request a completion, escalating to larger models as configured in `routing`.
+
+    Returns the completion, the position of the model that produced it in the
+    routing models list, and the total tokens used including escalated attempts.
+    Without routing, or once the last model is reached, the completion is returned,
+    or the model error raised, as is.
+
+    Each model call holds a slot of the `model` scheduler in `queue`, when configured,
+    waiting for it until `deadline`.
+    """
+    if routing is None:
+        model_request = CompletionRequest(
+            conversation=conversation, config=completion_config, deadline=deadline
+        )
+        async with scheduled("model", scheduler, queue, deadline):
+            completion = await model_generate.generate(model_request, context)
+        return completion, 0, _usage_tokens(completion)
+
+    models = routing.models(completion_config.model)
+    tokens = 0
+    while True:
+        config = completion_config.with_model(models[model_level])
+        model_request = CompletionRequest(
+            conversation=conversation, config=config, deadline=deadline
+        )
+        can_escalate = model_level + 1 < len(models)
+        trigger: ModelEscalationTrigger | None
+        try:
+            async with scheduled("model", scheduler, queue, deadline):
+                completion = await model_generate.generate(model_request, context)
+            tokens += _usage_tokens(completion)
+        except ModelClientError as e:
+            if not (can_escalate and ModelEscalationTrigger.MODEL_ERROR in routing.escalate_on):
+                raise
+            trigger, detail = ModelEscalationTrigger.MODEL_ERROR, str(e)
+        else:
+            if not can_escalate:
+                return completion, model_level, tokens
+            trigger, detail = _escalation_trigger(completion, config, routing)
+            if trigger is None:
+                return completion, model_level, tokens
+        logger.info(
+            context,
+            "Escalating model",
+            extra=extra(
+                from_model=models[model_level],
+                to_model=models[model_level + 1],
+                trigger=trigger,
+                detail=detail,
+            ),
+        )
+        model_level += 1
+
+
+def _usage_tokens(completion: CompletionResponse) -> int:
+    return completion.usage.total_tokens if completion.usage else 0
+
+
+def _escalation_trigger(
+    completion: CompletionResponse, config: CompletionConfig, routing: ModelRoutingPolicy
+) -> tuple[ModelEscalationTrigger | None, str]:
+    """Return the first configured escalation trigger matched by the completion."""
+    escalate_on = routing.escalate_on
+    tool_index = config.tool_index()
+    for tool_call in completion.tool_calls:
+        if ModelEscalationTrigger.TOOL_RESOLUTION in escalate_on and (
+            tool_call.function.name not in tool_index
+        ):
+            return ModelEscalationTrigger.TOOL_RESOLUTION, tool_call.function.name
+        if ModelEscalationTrigger.JSON_PARSE in escalate_on and _unparsed_arguments(
+            tool_call.function
+        ):
+            return ModelEscalationTrigger.JSON_PARSE, tool_call.function.name
+    if (
+        not completion.tool_calls
+        and completion.message.content
+        and routing.require_json_output
+        and ModelEscalationTrigger.VALIDATION in escalate_on
+    ):
+        try:
+            codec.loads(completion.message.content)
+        except ValueError as e:
+            return ModelEscalationTrigger.VALIDATION, str(e)
+    return None, ""
+
+
+def _unparsed_arguments(function: ToolFunctionCall) -> bool:
+    """True when tool call arguments could not be parsed as JSON by the model client.
+
+    The model client keeps unparseable arguments as `{"raw": <arguments>}`.
+    """
+    try:
+        parsed = function.arguments_dict()
+    except ValueError:
+        return True
+    return parsed.keys() == {"raw"}
+
+
+def _remaining_seconds(deadline: datetime) -> float:
+    return (deadline - datetime.now(UTC)).total_seconds()
+
+
+def _earliest(*deadlines: datetime | None) -> datetime | None:
+    """Return the earliest of the deadlines set, None if none is."""
+    return min((d for d in deadlines if d is not None), default=None)
+
+
+def _deadline_stop_reason(
+    deadline: datetime | None, budget_deadline: datetime | None
+) -> AgentLoopStopReason | None:
+    """Return why the loop must stop when a call timed out, None if no time limit passed.
+
+    Runs past their `deadline` stop as resumable, before checking the time budget.
+    """
+    if deadline is not None and _remaining_seconds(deadline) <= 0.0:
+        return AgentLoopStopReason.DEADLINE
+    if budget_deadline is not None and _remaining_seconds(budget_deadline) <= 0.0:
+        return AgentLoopStopReason.TIME_BUDGET
+    return None
+
+
+def _timed_out_reason(
+    deadline: datetime | None, budget_deadline: datetime | None
+) -> AgentLoopStopReason:
+    """Return the stop reason of a wait limited to the earliest of both deadlines."""
+    if budget_deadline is not None and (deadline is None or budget_deadline < deadline):
+        return AgentLoopStopReason.TIME_BUDGET
+    return AgentLoopStopReason.DEADLINE
+
+
+def _can_run_iteration(
+    deadline: datetime, loop_config: AgentLoopConfig, iterations_done: int, elapsed: float
+) -> bool:
+    """Return True if the time left until `deadline` is enough for one more iteration."""
+    estimate = loop_config.min_iteration_seconds
+    if iterations_done:
+        estimate = max(estimate, elapsed / iterations_done)
+    return _remaining_seconds(deadline) > estimate
+
+
+def _format_tool_result(
+    result: ToolExecutionResult,
+    rendering: ToolResultRendering | None = None,
+    output_schema: dict[str, Any] | None = None,
+) -> str:
+    """Return tool result content for the conversation, pretty-printed JSON by default."""
+    return render_tool_result(result, rendering, output_schema)
+
 
-    if result.structured_content is not None:
-        return Payload.to_json(result.structured_content, indent=2)
-    return Payload.to_json(result.content, indent=2)
+def _output_schema(completion_config: CompletionConfig, tool_name: str) -> dict[str, Any] | None:
+    tool = completion_config.tool_index().get(tool_name)
+    return tool.output_schema if tool is not None else None
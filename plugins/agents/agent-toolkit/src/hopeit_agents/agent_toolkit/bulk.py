@@ -0,0 +1,328 @@
+"""Run an agent event in-process over a JSONL dataset of requests.
+
+Each input line is the JSON payload of one case. Cases are executed with bounded
+concurrency and a result line is appended to the output file as each case finishes,
+including its status, elapsed time and model usage collected from tracing spans.
+
+Running again with the same output file resumes the run: cases with a successful result
+are skipped, and failed cases are executed again, the last line for a case superseding
+previous ones. Datasets can be split across processes with `shard_index` and
+`shard_count`, each writing its own output file.
+"""
+
+import asyncio
+import os
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from datetime import UTC, datetime
+from enum import Enum
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+from hopeit.app.config import AppConfig, parse_app_config_json
+from hopeit.app.context import EventContext
+from hopeit.dataobjects import dataclass, dataobject, field
+from hopeit.dataobjects.payload import Payload
+from hopeit.server import runtime
+from hopeit.server.config import AuthType, parse_server_config_json
+from hopeit.server.engine import AppEngine
+from hopeit.server.events import get_event_settings
+from hopeit.server.steps import find_datatype_handler
+
+from hopeit_agents.mcp_client.tracing import SpanRecord, span
+
+__all__ = [
+    "BulkCaseResult",
+    "BulkCaseStatus",
+    "BulkCaseUsage",
+    "BulkRunStats",
+    "InProcessEvent",
+    "completed_cases",
+    "read_cases",
+    "run_bulk",
+    "run_cases",
+]
+
+CaseExecutor = Callable[[str], Awaitable[Any]]
+
+
+class BulkCaseStatus(str, Enum):
+    """Outcome of a case."""
+
+    OK = "ok"
+    ERROR = "error"
+
+
+@dataobject
+@dataclass
+class BulkCaseUsage:
+    """Model and tool usage of a case, collected from its tracing spans."""
+
+    model_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    tool_calls: int = 0
+
+
+@dataobject(event_id="case_id", event_ts="started_at")
+@dataclass
+class BulkCaseResult:
+    """Result line written for each executed case."""
+
+    case_id: str
+    status: BulkCaseStatus
+    started_at: datetime
+    elapsed_seconds: float
+    usage: BulkCaseUsage = field(default_factory=BulkCaseUsage)
+    result: Any = None
+    error: str | None = None
+
+
+@dataobject
+@dataclass
+class BulkRunStats:
+    """Counts and duration of a bulk run."""
+
+    executed: int = 0
+    skipped: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class _UsageCollector:
+    """Span exporter adding up usage attributes of the spans of one case."""
+
+    def __init__(self) -> None:
+        self.usage = BulkCaseUsage()
+
+    def export(self, record: SpanRecord) -> None:
+        if record.name == "model.complete":
+            attributes = record.attributes
+            self.usage.model_calls += 1
+            self.usage.prompt_tokens += int(attributes.get("prompt_tokens", 0))
+            self.usage.completion_tokens += int(attributes.get("completion_tokens", 0))
+            self.usage.total_tokens += int(attributes.get("total_tokens", 0))
+        elif record.name == "mcp.call_tool":
+            self.usage.tool_calls += 1
+
+
+def completed_cases(output_path: str | Path) -> set[str]:
+    """Return ids of cases with a successful result in an existing output file."""
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+    status: dict[str, BulkCaseStatus] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Partial line left by an interrupted run
+            case = Payload.from_json(line, datatype=BulkCaseResult)
+            status[case.case_id] = case.status
+    return {case_id for case_id, case_status in status.items() if case_status is BulkCaseStatus.OK}
+
+
+def read_cases(
+    input_path: str | Path,
+    *,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    id_field: str | None = None,
+) -> Iterator[tuple[str, str]]:
+    """Yield `(case_id, payload_json)` for the cases of this shard, reading lazily.
+
+    Case ids are the line number in the file, starting at 0, or the value of `id_field`
+    in the payload. Cases are assigned to shards by line number.
+    """
+    with open(input_path, encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if index % shard_count != shard_index or not line.strip():
+                continue
+            case_id = str(index)
+            if id_field is not None:
+                case_id = str(Payload.from_json(line, datatype=dict[str, Any])[id_field])
+            yield case_id, line
+
+
+async def run_cases(
+    cases: Iterable[tuple[str, str]],
+    execute: CaseExecutor,
+    output_path: str | Path,
+    *,
+    concurrency: int,
+    skip: set[str] | None = None,
+) -> BulkRunStats:
+    """Execute cases with at most `concurrency` running at once, appending results.
+
+    Cases are read from `cases` only as running ones finish, so large datasets are not
+    loaded in memory. Errors are recorded in the case result and do not stop the run.
+    """
+    stats = BulkRunStats()
+    started = monotonic()
+    skip = skip or set()
+    running: set[asyncio.Task[BulkCaseResult]] = set()
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _drop_partial_line(path)
+
+    with open(path, "a", encoding="utf-8") as output:
+
+        def write(done: set[asyncio.Task[BulkCaseResult]]) -> None:
+            for task in done:
+                case = task.result()
+                stats.executed += 1
+                if case.status is BulkCaseStatus.ERROR:
+                    stats.errors += 1
+                output.write(Payload.to_json(case) + "\n")
+            output.flush()
+
+        for case_id, payload in cases:
+            if case_id in skip:
+                stats.skipped += 1
+                continue
+            if len(running) >= concurrency:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                write(done)
+            running.add(asyncio.create_task(_run_case(case_id, payload, execute)))
+        if running:
+            done, _ = await asyncio.wait(running)
+            write(done)
+
+    stats.elapsed_seconds = monotonic() - started
+    return stats
+
+
+def _drop_partial_line(path: Path) -> None:
+    """Truncate a partial last line left by an interrupted run, before appending."""
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = end
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos += newline + 1
+                break
+        f.truncate(pos)
+
+
+async def _run_case(case_id: str, payload: str, execute: CaseExecutor) -> BulkCaseResult:
+    collector = _UsageCollector()
+    started_at = datetime.now(UTC)
+    started = monotonic()
+    try:
+        with span("bulk.case", exporter=collector, case_id=case_id):
+            result = await execute(payload)
+        status, error = BulkCaseStatus.OK, None
+    except Exception as e:  # pylint: disable=broad-except
+        result, status, error = None, BulkCaseStatus.ERROR, f"{type(e).__name__}: {e}"
+    return BulkCaseResult(
+        case_id=case_id,
+        status=status,
+        started_at=started_at,
+        elapsed_seconds=monotonic() - started,
+        usage=collector.usage,
+        result=None if result is None else Payload.to_obj(result),
+        error=error,
+    )
+
+
+class InProcessEvent:
+    """Executes an app event in a hopeit engine started in this process."""
+
+    def __init__(self, app_engine: AppEngine, event_name: str) -> None:
+        self.app_engine = app_engine
+        self.event_name = event_name
+        app_config = app_engine.app_config
+        self.event_settings = get_event_settings(app_engine.settings, event_name)
+        self.datatype = find_datatype_handler(
+            app_config=app_config,
+            event_name=event_name,
+            event_info=app_config.events[event_name],
+        )
+
+    @classmethod
+    async def start(
+        cls, config_files: list[str], event_name: str, *, enabled_groups: list[str] | None = None
+    ) -> "InProcessEvent":
+        """Start the engine with the server config file, then plugins and apps config files.
+
+        `event_name` is an event of the last app.
+        """
+        with open(config_files[0], encoding="utf-8") as f:
+            server_config = parse_server_config_json(f.read())
+        await runtime.server.start(config=server_config)
+        app_config: AppConfig | None = None
+        for config_file in config_files[1:]:
+            with open(config_file, encoding="utf-8") as f:
+                app_config = parse_app_config_json(f.read())
+            app_config.server = server_config
+            await runtime.server.start_app(
+                app_config=app_config, enabled_groups=enabled_groups or []
+            )
+        if app_config is None:
+            raise ValueError("Missing app config file after server config file")
+        return cls(runtime.server.app_engine(app_key=app_config.app_key()), event_name)
+
+    async def stop(self) -> None:
+        """Stop the engine."""
+        await runtime.server.stop()
+
+    async def __call__(self, payload: str) -> Any:
+        """Execute the event with the JSON `payload`, within its configured response timeout."""
+        app_config = self.app_engine.app_config
+        context = EventContext(
+            app_config=app_config,
+            plugin_config=app_config,
+            event_name=self.event_name,
+            settings=self.event_settings,
+            track_ids={
+                "track.operation_id": str(uuid.uuid4()),
+                "track.request_id": str(uuid.uuid4()),
+                "track.request_ts": datetime.now(tz=UTC).isoformat(),
+            },
+            auth_info={"auth_type": AuthType.UNSECURED, "allowed": "true"},
+        )
+        return await self.app_engine.execute(
+            context=context,
+            query_args=None,
+            payload=Payload.from_json(payload, datatype=self.datatype),
+        )
+
+
+async def run_bulk(
+    config_files: list[str],
+    event_name: str,
+    input_path: str,
+    output_path: str,
+    *,
+    concurrency: int = 8,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    id_field: str | None = None,
+    enabled_groups: list[str] | None = None,
+) -> BulkRunStats:
+    """Run `event_name` for each case of this shard of `input_path`, resuming `output_path`."""
+    event = await InProcessEvent.start(config_files, event_name, enabled_groups=enabled_groups)
+    try:
+        return await run_cases(
+            read_cases(
+                input_path, shard_index=shard_index, shard_count=shard_count, id_field=id_field
+            ),
+            event,
+            output_path,
+            concurrency=concurrency,
+            skip=completed_cases(output_path),
+        )
+    finally:
+        await event.stop()
@@ -0,0 +1,146 @@
+"""Stores keeping agent loop checkpoints, used to resume interrupted runs.
+
+Checkpoints are saved as serialized documents keyed by run id. Any object implementing
+`CheckpointStore` can be passed to `agent_with_tools_loop`; `create_checkpoint_store`
+returns one of the local backends for `AgentCheckpointSettings`, shared by all runs with
+the same settings. Local backends read and write in worker threads, so saving
+checkpoints does not block the event loop.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Any, Protocol
+
+from hopeit_agents.agent_toolkit.settings import AgentCheckpointSettings, CheckpointBackend
+
+__all__ = [
+    "CheckpointStore",
+    "FileCheckpointStore",
+    "SqliteCheckpointStore",
+    "create_checkpoint_store",
+]
+
+
+class CheckpointStore(Protocol):
+    """Storage for serialized agent loop checkpoints."""
+
+    async def load(self, run_id: str) -> str | None:
+        """Return the last checkpoint saved for `run_id`, or None."""
+        ...
+
+    async def save(self, run_id: str, data: str) -> None:
+        """Replace the checkpoint for `run_id`."""
+        ...
+
+    async def delete(self, run_id: str) -> None:
+        """Remove the checkpoint for `run_id`, if any."""
+        ...
+
+
+class FileCheckpointStore:
+    """Keeps one JSON file per run in a directory, replaced atomically on save."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    async def load(self, run_id: str) -> str | None:
+        return await asyncio.to_thread(self._load, run_id)
+
+    async def save(self, run_id: str, data: str) -> None:
+        await asyncio.to_thread(self._save, run_id, data)
+
+    async def delete(self, run_id: str) -> None:
+        await asyncio.to_thread(self._delete, run_id)
+
+    def _load(self, run_id: str) -> str | None:
+        try:
+            with open(self._run_file(run_id)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _save(self, run_id: str, data: str) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, prefix=".checkpoint.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_name, self._run_file(run_id))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _delete(self, run_id: str) -> None:
+        self._run_file(run_id).unlink(missing_ok=True)
+
+    def _run_file(self, run_id: str) -> Path:
+        if not run_id or os.sep in run_id or run_id.startswith("."):
+            raise ValueError(f"Invalid checkpoint run_id: {run_id!r}")
+        return self.path / f"{run_id}.json"
+
+
+class SqliteCheckpointStore:
+    """Keeps checkpoints in a table of a local sqlite database file.
+
+    The table is created on first use. Statements run in worker threads, so waiting for
+    a locked database does not block the event loop.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._created = False
+
+    async def load(self, run_id: str) -> str | None:
+        rows = await self._execute(
+            "SELECT data FROM agent_loop_checkpoints WHERE run_id = ?", run_id
+        )
+        return str(rows[0][0]) if rows else None
+
+    async def save(self, run_id: str, data: str) -> None:
+        await self._execute(
+            "INSERT OR REPLACE INTO agent_loop_checkpoints (run_id, data) VALUES (?, ?)",
+            run_id,
+            data,
+        )
+
+    async def delete(self, run_id: str) -> None:
+        await self._execute("DELETE FROM agent_loop_checkpoints WHERE run_id = ?", run_id)
+
+    async def _execute(self, sql: str, *params: str) -> list[tuple[Any, ...]]:
+        return await asyncio.to_thread(self._execute_sync, sql, params)
+
+    def _execute_sync(self, sql: str, params: tuple[str, ...]) -> list[tuple[Any, ...]]:
+        """Run a statement in its own transaction and connection."""
+        if not self._created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                if not self._created:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS agent_loop_checkpoints "
+                        "(run_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                    )
+                    self._created = True
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+
+_stores: dict[tuple[CheckpointBackend, str], CheckpointStore] = {}
+
+
+def create_checkpoint_store(settings: AgentCheckpointSettings) -> CheckpointStore:
+    """Return the checkpoint store configured by `settings`, created once per settings."""
+    key = (settings.backend, settings.path)
+    store = _stores.get(key)
+    if store is None:
+        if settings.backend == CheckpointBackend.SQLITE:
+            store = SqliteCheckpointStore(settings.path)
+        else:
+            store = FileCheckpointStore(settings.path)
+        _stores[key] = store
+    return store
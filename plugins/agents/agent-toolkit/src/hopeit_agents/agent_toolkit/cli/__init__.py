@@ -0,0 +1 @@
+"""Command line tools provided by the agent toolkit."""
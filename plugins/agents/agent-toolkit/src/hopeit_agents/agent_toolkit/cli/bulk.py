@@ -0,0 +1,92 @@
+"""
+CLI bulk runner commands
+"""
+
+import asyncio
+
+import click
+
+from hopeit_agents.agent_toolkit.bulk import run_bulk
+
+
+@click.group()
+def bulk() -> None:
+    """CLI entry point for bulk agent runs."""
+
+
+@bulk.command()
+@click.option(
+    "--config-files",
+    required=True,
+    help="Comma-separated config file paths, starting with server config, then plugins, then apps."
+    " The event is looked up in the last app.",
+)
+@click.option("--event", "event_name", required=True, help="Event name, i.e. agents.expert_agent.")
+@click.option("--input", "input_path", required=True, help="JSONL file with one payload per line.")
+@click.option(
+    "--output",
+    "output_path",
+    required=True,
+    help="JSONL file where results are appended. Existing successful cases are skipped.",
+)
+@click.option("--concurrency", default=8, show_default=True, help="Cases running at once.")
+@click.option(
+    "--shard",
+    default="0/1",
+    show_default=True,
+    help="Part of the dataset to run, as `index/count`, to split a run across processes.",
+)
+@click.option(
+    "--id-field",
+    default=None,
+    help="Payload field used as case id. Defaults to the line number in the input file.",
+)
+@click.option(
+    "--enabled-groups",
+    default="",
+    help="Optional comma-separated group labels to start.",
+)
+def run(
+    config_files: str,
+    event_name: str,
+    input_path: str,
+    output_path: str,
+    concurrency: int,
+    shard: str,
+    id_field: str | None,
+    enabled_groups: str,
+) -> None:
+    """
+    Runs an app event in-process for each payload in a JSONL file.
+    """
+    try:
+        shard_index, shard_count = (int(part) for part in shard.split("/"))
+    except ValueError as e:
+        raise click.BadParameter("expected `index/count`", param_hint="--shard") from e
+    if not 0 <= shard_index < shard_count:
+        raise click.BadParameter("index must be lower than count", param_hint="--shard")
+    groups: list[str] = [] if enabled_groups == "" else enabled_groups.split(",")
+
+    stats = asyncio.run(
+        run_bulk(
+            config_files.split(","),
+            event_name,
+            input_path,
+            output_path,
+            concurrency=concurrency,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            id_field=id_field,
+            enabled_groups=groups,
+        )
+    )
+    click.echo(
+        f"executed={stats.executed} skipped={stats.skipped} errors={stats.errors}"
+        f" elapsed={stats.elapsed_seconds:.1f}s"
+    )
+
+
+cli = click.CommandCollection(sources=[bulk])
+
+if __name__ == "__main__":
+    cli()
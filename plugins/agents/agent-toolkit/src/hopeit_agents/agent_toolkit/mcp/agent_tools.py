@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import dataclasses
 import json
 import uuid
+from datetime import datetime
 from typing import Any
 
 from hopeit.app.context import EventContext
 from hopeit.app.logger import app_extra_logger
 
+from hopeit_agents.agent_toolkit.mcp.tool_results import blob_preview
+from hopeit_agents.agent_toolkit.settings import ToolResultRendering
 from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
 from hopeit_agents.mcp_client.models import (
     MCPClientConfig,
@@ -16,6 +20,7 @@ from hopeit_agents.mcp_client.models import (
     ToolCallRequestLog,
     ToolDescriptor,
     ToolExecutionResult,
+    ToolExecutionStatus,
     ToolInvocation,
 )
 from hopeit_agents.mcp_client.settings import build_environment
@@ -27,6 +32,7 @@ __all__ = [
     "tool_descriptions",
     "call_tool",
     "execute_tool_calls",
+    "load_tool_results",
     "ToolCallRecord",
 ]
 
@@ -88,6 +94,7 @@ async def call_tool(
     tool_name: str,
     payload: dict[str, Any],
     session_id: str | None = None,
+    deadline: datetime | None = None,
 ) -> ToolExecutionResult:
     """Execute an MCP tool through the client using the provided payload."""
     env = build_environment(config, context.env)
@@ -97,10 +104,15 @@ async def call_tool(
         tool_name=tool_name,
         payload=payload,
         session_id=session_id,
+        deadline=deadline,
     )
     try:
         return await client.call_tool(
-            args.tool_name, args.payload, call_id=args.call_id, session_id=args.session_id
+            args.tool_name,
+            args.payload,
+            call_id=args.call_id,
+            session_id=args.session_id,
+            deadline=args.deadline,
         )
     except MCPClientError as exc:
         logger.error(
@@ -117,6 +129,7 @@ async def execute_tool_calls(
     *,
     tool_calls: list[ToolInvocation],
     session_id: str | None = None,
+    deadline: datetime | None = None,
 ) -> list[ToolCallRecord]:
     """Execute multiple tool calls capturing request and response data."""
     records: list[ToolCallRecord] = []
@@ -128,6 +141,7 @@ async def execute_tool_calls(
             tool_name=tool_call.tool_name,
             payload=tool_call.payload,
             session_id=session_id,
+            deadline=tool_call.deadline or deadline,
         )
         request_log = ToolCallRequestLog(
             tool_call_id=result.call_id,
@@ -136,3 +150,66 @@ async def execute_tool_calls(
         )
         records.append(ToolCallRecord(request=request_log, response=result))
     return records
+
+
+async def load_tool_results(
+    config: MCPClientConfig,
+    context: EventContext,
+    results: list[ToolExecutionResult],
+    renderings: list[ToolResultRendering] | None = None,
+) -> list[ToolExecutionResult]:
+    """Return `results` with the structured content of results returned as blobs loaded.
+
+    With `renderings` for each result, blobs larger than the rendering `max_chars` are
+    not loaded: their content is replaced by a `blob_preview` of their head and tail.
+
+    Blobs that cannot be read, e.g. pruned by the server or failing to be read in time,
+    are returned as ERROR results with the failure as content, since the tool call
+    itself succeeded.
+    """
+    if all(result.blob is None for result in results):
+        return results
+    client = MCPClient(config=config, env=build_environment(config, context.env))
+    loaded = []
+    for i, result in enumerate(results):
+        try:
+            loaded.append(
+                await _load_tool_result(
+                    client, result, None if renderings is None else renderings[i]
+                )
+            )
+        except (MCPClientError, ValueError) as exc:
+            reason = exc.message if isinstance(exc, MCPClientError) else str(exc)
+            message = f"Failed to load tool result: {reason}"
+            logger.warning(
+                context,
+                "mcp_load_tool_result_error",
+                extra=extra(tool_name=result.tool_name, details=reason),
+            )
+            loaded.append(
+                dataclasses.replace(
+                    result,
+                    status=ToolExecutionStatus.ERROR,
+                    content=[{"type": "text", "text": message}],
+                    error_message=message,
+                )
+            )
+    return loaded
+
+
+async def _load_tool_result(
+    client: MCPClient, result: ToolExecutionResult, rendering: ToolResultRendering | None
+) -> ToolExecutionResult:
+    """Load the blob of `result`, or preview it when larger than `rendering` allows."""
+    blob = result.blob
+    if (
+        blob is None
+        or result.structured_content is not None
+        or rendering is None
+        or rendering.max_chars is None
+        or blob.size <= rendering.max_chars
+    ):
+        return await client.load_blob(result)
+    async with client.open_blob(blob) as data:
+        preview = blob_preview(data, rendering)
+    return dataclasses.replace(result, content=[{"type": "text", "text": preview}])
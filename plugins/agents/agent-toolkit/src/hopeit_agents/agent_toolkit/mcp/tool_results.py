@@ -0,0 +1,152 @@
+"""Rendering of MCP tool results as conversation messages content."""
+
+import mmap
+from typing import Any
+
+from hopeit_agents.agent_toolkit.settings import (
+    AgentSettings,
+    ToolResultFormat,
+    ToolResultRendering,
+)
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.models import ToolExecutionResult
+
+__all__ = [
+    "blob_preview",
+    "project_to_schema",
+    "render_tool_result",
+    "tool_result_rendering",
+]
+
+_DEFAULT_RENDERING = ToolResultRendering()
+
+
+def tool_result_rendering(agent_settings: AgentSettings, tool_name: str) -> ToolResultRendering:
+    """Return the rendering configured for `tool_name`, or the agent default."""
+    return agent_settings.tool_results_by_tool.get(tool_name, agent_settings.tool_results)
+
+
+def render_tool_result(
+    result: ToolExecutionResult,
+    rendering: ToolResultRendering | None = None,
+    output_schema: dict[str, Any] | None = None,
+) -> str:
+    """Return tool result content to be added to the conversation.
+
+    Structured content is preferred over raw content. With `project_output_schema`,
+    structured content is reduced to the fields described in the tool `output_schema`.
+    The JSON text is pretty-printed or compact according to `format`, and when longer
+    than `max_chars`, the middle is replaced by a truncation marker keeping its head and
+    tail. The full result is kept in the tool call log.
+
+    Results returned as blobs that were not loaded are rendered as their text content,
+    a preview of the blob made with `blob_preview`.
+    """
+    rendering = rendering or _DEFAULT_RENDERING
+    if result.blob is not None and result.structured_content is None:
+        texts = [item["text"] for item in result.content if item.get("type") == "text"]
+        if texts:
+            return "".join(texts)
+    value: Any = result.content
+    if result.structured_content is not None:
+        value = result.structured_content
+        if rendering.project_output_schema and output_schema:
+            value = project_to_schema(value, output_schema)
+    text = codec.dumps(value, indent=rendering.format != ToolResultFormat.COMPACT)
+    if rendering.max_chars is not None:
+        text = _truncate(text, rendering.max_chars, rendering.tail_fraction)
+    return text
+
+
+def blob_preview(data: bytes | mmap.mmap, rendering: ToolResultRendering) -> str:
+    """Return the head and tail of blob content longer than the rendering `max_chars`.
+
+    Only the previewed bytes are read, so memory-mapped blobs are not loaded. Content is
+    not parsed, projected or reformatted: the preview is the stored JSON text.
+    """
+    max_chars = rendering.max_chars if rendering.max_chars is not None else len(data)
+    if len(data) <= max_chars:
+        return bytes(data[:]).decode(errors="ignore")
+    tail = int(max_chars * rendering.tail_fraction)
+    head = max_chars - tail
+    return _with_marker(
+        bytes(data[:head]).decode(errors="ignore"),
+        bytes(data[len(data) - tail :]).decode(errors="ignore") if tail else "",
+        len(data) - head - tail,
+    )
+
+
+def project_to_schema(value: Any, schema: dict[str, Any]) -> Any:
+    """Keep only the fields of `value` described by the JSON `schema`.
+
+    Objects are reduced to the keys listed in `properties`, recursively. Objects without
+    `properties` in the schema, and values the schema does not describe or describes
+    with a boolean schema, are kept as is.
+    Local `$ref` references to `$defs` are followed.
+    """
+    return _project(value, schema, schema.get("$defs", {}))
+
+
+def _project(value: Any, schema: Any, defs: dict[str, Any]) -> Any:
+    if not isinstance(schema, dict):
+        return value
+    schema = _resolve_ref(schema, defs)
+    if isinstance(value, dict):
+        properties = _object_properties(schema, defs)
+        if properties is None:
+            return value
+        return {k: _project(v, properties[k], defs) for k, v in value.items() if k in properties}
+    if isinstance(value, list):
+        items = _array_items(schema, defs)
+        if items is None:
+            return value
+        return [_project(item, items, defs) for item in value]
+    return value
+
+
+def _resolve_ref(schema: dict[str, Any], defs: dict[str, Any]) -> dict[str, Any]:
+    ref = schema.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/$defs/"):
+        resolved = defs.get(ref.removeprefix("#/$defs/"))
+        return resolved if isinstance(resolved, dict) else {}
+    return schema
+
+
+def _variants(schema: dict[str, Any], defs: dict[str, Any]) -> list[dict[str, Any]]:
+    variants = [schema]
+    for key in ("anyOf", "oneOf", "allOf"):
+        variants.extend(_resolve_ref(v, defs) for v in schema.get(key, ()) if isinstance(v, dict))
+    return variants
+
+
+def _object_properties(schema: dict[str, Any], defs: dict[str, Any]) -> dict[str, Any] | None:
+    properties: dict[str, Any] | None = None
+    for variant in _variants(schema, defs):
+        if isinstance(variant.get("properties"), dict):
+            properties = {**(properties or {}), **variant["properties"]}
+    return properties
+
+
+def _array_items(schema: dict[str, Any], defs: dict[str, Any]) -> dict[str, Any] | None:
+    for variant in _variants(schema, defs):
+        if isinstance(variant.get("items"), dict):
+            return _resolve_ref(variant["items"], defs)
+    return None
+
+
+def _truncate(text: str, max_chars: int, tail_fraction: float) -> str:
+    if len(text) <= max_chars:
+        return text
+    tail = int(max_chars * tail_fraction)
+    head = max_chars - tail
+    return _with_marker(
+        text[:head], text[len(text) - tail :] if tail else "", len(text) - head - tail
+    )
+
+
+def _with_marker(head: str, tail: str, omitted: int) -> str:
+    return (
+        f"{head}\n... [{omitted} characters omitted] ...\n{tail}"
+        if tail
+        else f"{head}\n... [{omitted} characters omitted]"
+    )
@@ -0,0 +1,258 @@
+"""Weighted fair scheduling of calls that share a limited capacity in the process.
+
+Calls wait in one queue per tenant or priority class. When capacity is available,
+the next call is taken from the queue with the lowest virtual finish time: queues are
+served in proportion to their weights, so a queue with many waiting calls does not
+delay calls from other queues more than its share.
+
+Queues are removed once they have no calls waiting nor running, keeping the stats of a
+bounded number of idle queues.
+"""
+
+import asyncio
+import copy
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from datetime import UTC, datetime
+from time import monotonic
+
+from hopeit.dataobjects import dataclass, dataobject
+
+from hopeit_agents.agent_toolkit.settings import SchedulerSettings
+from hopeit_agents.mcp_client.tracing import span
+
+__all__ = [
+    "FairScheduler",
+    "SchedulerQueueStats",
+    "SchedulerTimeoutError",
+    "fair_scheduler",
+    "scheduled",
+    "scheduler_stats",
+]
+
+
+_IDLE_STATS_MAX_SIZE = 1024
+
+
+class SchedulerTimeoutError(TimeoutError):
+    """Raised when the deadline of a call passes while it waits for a slot."""
+
+
+@dataobject
+@dataclass
+class SchedulerQueueStats:
+    """Counters and queue-wait times of a scheduler queue.
+
+    `starved` counts calls dispatched ahead of fair order after waiting longer than
+    `max_wait_seconds`.
+    """
+
+    queue: str
+    queued: int = 0
+    in_flight: int = 0
+    dispatched: int = 0
+    starved: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.dispatched if self.dispatched else 0.0
+
+
+class _Waiter:
+    __slots__ = ("enqueued", "finish", "future")
+
+    def __init__(self, future: "asyncio.Future[None]", finish: float) -> None:
+        self.future = future
+        self.finish = finish
+        self.enqueued = monotonic()
+
+
+class _Queue:
+    __slots__ = ("in_flight", "last_finish", "stats", "waiters")
+
+    def __init__(self, stats: SchedulerQueueStats) -> None:
+        self.waiters: deque[_Waiter] = deque()
+        self.in_flight = 0
+        self.last_finish = 0.0
+        self.stats = stats
+
+    def head(self) -> _Waiter | None:
+        """Return the first waiter, dropping the ones cancelled while queued."""
+        while self.waiters and self.waiters[0].future.cancelled():
+            self.waiters.popleft()
+            self.stats.queued -= 1
+        return self.waiters[0] if self.waiters else None
+
+
+class FairScheduler:
+    """Dispatches calls from per-queue FIFOs with weighted fair queuing."""
+
+    def __init__(self, settings: SchedulerSettings) -> None:
+        self.settings = settings
+        self._queues: dict[str, _Queue] = {}
+        self._idle_stats: dict[str, SchedulerQueueStats] = {}
+        self._in_flight = 0
+        self._virtual_time = 0.0
+
+    def configure(self, settings: SchedulerSettings) -> None:
+        """Apply new settings, dispatching waiting calls if capacity increased."""
+        self.settings = settings
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, queue: str, cost: float = 1.0, timeout: float | None = None
+    ) -> AsyncIterator[float]:
+        """Wait for a slot in `queue`, yielding the seconds waited, and release it on exit.
+
+        Raises `SchedulerTimeoutError` when no slot is available within `timeout` seconds.
+        The wait is recorded as a `scheduler.wait` span.
+        """
+        with span("scheduler.wait", queue=queue) as wait_span:
+            try:
+                async with asyncio.timeout(timeout):
+                    wait = await self.acquire(queue, cost)
+            except TimeoutError as exc:
+                raise SchedulerTimeoutError(
+                    f"Timed out waiting for a slot in queue '{queue}'"
+                ) from exc
+            wait_span.set_attribute("wait_seconds", wait)
+        try:
+            yield wait
+        finally:
+            self.release(queue)
+
+    async def acquire(self, queue: str, cost: float = 1.0) -> float:
+        """Wait until a call in `queue` can run, returning the seconds waited.
+
+        `cost` is the share of the queue capacity used by the call.
+        """
+        q = self._queues.get(queue)
+        if q is None:
+            stats = self._idle_stats.pop(queue, None) or SchedulerQueueStats(queue=queue)
+            q = self._queues[queue] = _Queue(stats)
+        weight = self.settings.weights.get(queue, self.settings.default_weight)
+        waiter = _Waiter(
+            asyncio.get_running_loop().create_future(),
+            max(self._virtual_time, q.last_finish) + cost / weight,
+        )
+        q.last_finish = waiter.finish
+        q.waiters.append(waiter)
+        q.stats.queued += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if not waiter.future.cancelled():
+                self.release(queue)  # Dispatched while being cancelled
+            else:
+                if waiter in q.waiters:
+                    q.waiters.remove(waiter)
+                    q.stats.queued -= 1
+                self._discard_if_idle(queue, q)
+            raise
+        wait = monotonic() - waiter.enqueued
+        q.stats.wait_seconds_total += wait
+        q.stats.wait_seconds_max = max(q.stats.wait_seconds_max, wait)
+        return wait
+
+    def release(self, queue: str) -> None:
+        """Release a slot acquired in `queue`."""
+        q = self._queues[queue]
+        q.in_flight -= 1
+        q.stats.in_flight = q.in_flight
+        self._in_flight -= 1
+        self._dispatch()
+        self._discard_if_idle(queue, q)
+
+    def stats(self) -> list[SchedulerQueueStats]:
+        """Return a copy of the stats of each queue, including recently idle ones."""
+        stats = {**self._idle_stats, **{name: q.stats for name, q in self._queues.items()}}
+        return [copy.copy(s) for s in stats.values()]
+
+    def _discard_if_idle(self, name: str, q: _Queue) -> None:
+        """Remove queue `q` when it has no calls waiting nor running, keeping its stats."""
+        if q.in_flight or q.head() is not None or self._queues.get(name) is not q:
+            return
+        del self._queues[name]
+        self._idle_stats[name] = q.stats
+        if len(self._idle_stats) > _IDLE_STATS_MAX_SIZE:
+            del self._idle_stats[next(iter(self._idle_stats))]
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.settings.max_in_flight:
+            q = self._next_queue()
+            if q is None:
+                return
+            waiter = q.waiters.popleft()
+            self._virtual_time = max(self._virtual_time, waiter.finish)
+            q.in_flight += 1
+            self._in_flight += 1
+            q.stats.queued -= 1
+            q.stats.in_flight = q.in_flight
+            q.stats.dispatched += 1
+            waiter.future.set_result(None)
+
+    def _next_queue(self) -> _Queue | None:
+        """Return the queue of the next call to dispatch.
+
+        A call waiting longer than `max_wait_seconds` goes first, oldest first, otherwise
+        the call with the lowest virtual finish time.
+        """
+        limit = self.settings.max_in_flight_per_queue
+        max_wait = self.settings.max_wait_seconds
+        starved_before = monotonic() - max_wait if max_wait is not None else None
+        fair: tuple[float, _Queue] | None = None
+        starved: tuple[float, _Queue] | None = None
+        for q in self._queues.values():
+            head = q.head()
+            if head is None or (limit is not None and q.in_flight >= limit):
+                continue
+            if fair is None or head.finish < fair[0]:
+                fair = (head.finish, q)
+            if starved_before is not None and head.enqueued <= starved_before:
+                if starved is None or head.enqueued < starved[0]:
+                    starved = (head.enqueued, q)
+        if starved is not None:
+            if fair is None or starved[1] is not fair[1]:
+                starved[1].stats.starved += 1
+            return starved[1]
+        return None if fair is None else fair[1]
+
+
+_schedulers: dict[str, FairScheduler] = {}
+
+
+def fair_scheduler(name: str, settings: SchedulerSettings) -> FairScheduler:
+    """Return the process-wide scheduler `name`, applying `settings` if they changed."""
+    scheduler = _schedulers.get(name)
+    if scheduler is None:
+        scheduler = _schedulers[name] = FairScheduler(settings)
+    elif scheduler.settings != settings:
+        scheduler.configure(settings)
+    return scheduler
+
+
+def scheduled(
+    name: str,
+    settings: SchedulerSettings | None,
+    queue: str,
+    deadline: datetime | None = None,
+) -> AbstractAsyncContextManager[float]:
+    """Context holding a slot of the process-wide scheduler `name` for `queue`.
+
+    Without `settings`, calls are not scheduled and run without waiting. Raises
+    `SchedulerTimeoutError` when `deadline` passes while waiting for a slot.
+    """
+    if settings is None:
+        return nullcontext(0.0)
+    timeout = None if deadline is None else max(0.0, (deadline - datetime.now(UTC)).total_seconds())
+    return fair_scheduler(name, settings).slot(queue, timeout=timeout)
+
+
+def scheduler_stats() -> dict[str, list[SchedulerQueueStats]]:
+    """Return queue stats of process-wide schedulers, by scheduler name."""
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
@@ -1,8 +1,73 @@
 """Dataclasses that configure the example agent behaviour."""
 
+from enum import Enum
+from typing import Annotated
+
 from hopeit.dataobjects import dataclass, dataobject, field
 
 
+class ModelEscalationTrigger(str, Enum):
+    """Model outputs that make the agent loop retry a turn with a larger model."""
+
+    MODEL_ERROR = "model_error"
+    JSON_PARSE = "json_parse"
+    TOOL_RESOLUTION = "tool_resolution"
+    VALIDATION = "validation"
+
+
+@dataobject
+@dataclass
+class ModelRoutingPolicy:
+    """Selects the model used on each turn of the agent loop.
+
+    Turns run first with `tool_turn_model`, usually a small and fast model, or the
+    completion config model when not set. When the turn output matches one of
+    `escalate_on`, the turn is retried with the next model in `escalation_models`:
+    - `model_error`: the model call failed or its response could not be parsed,
+    - `json_parse`: tool call arguments are not valid JSON,
+    - `tool_resolution`: a tool call does not resolve to an available tool,
+    - `validation`: the final answer is not valid JSON and `require_json_output` is set.
+
+    With `sticky`, once escalated the following turns keep using the larger model.
+    """
+
+    tool_turn_model: str | None = None
+    escalation_models: list[str] = field(default_factory=list)
+    escalate_on: list[ModelEscalationTrigger] = field(
+        default_factory=lambda: list(ModelEscalationTrigger)
+    )
+    require_json_output: bool = False
+    sticky: bool = True
+
+    def models(self, default_model: str | None) -> list[str | None]:
+        """Models to try on each turn, from the first choice to the last escalation."""
+        return [self.tool_turn_model or default_model, *self.escalation_models]
+
+
+class ToolResultFormat(str, Enum):
+    """JSON layout of tool results added to the conversation."""
+
+    PRETTY = "pretty"
+    COMPACT = "compact"
+
+
+@dataobject
+@dataclass
+class ToolResultRendering:
+    """How tool results are written into the conversation sent to the model.
+
+    `max_chars` caps the rendered text keeping its head and, according to
+    `tail_fraction` (between 0 and 1), its tail. With `project_output_schema`, structured results keep
+    only the fields described in the tool output schema. Full results are always kept
+    in the tool call log.
+    """
+
+    format: ToolResultFormat = ToolResultFormat.PRETTY
+    max_chars: int | None = None
+    tail_fraction: float = field(default=0.25, ge=0.0, le=1.0)
+    project_output_schema: bool = False
+
+
 @dataobject
 @dataclass
 class AgentSettings:
@@ -15,3 +80,84 @@ class AgentSettings:
     enable_tools: bool = False
     allowed_tools: list[str] = field(default_factory=list)
     include_tool_schemas_in_prompt: bool = True
+    model_routing: ModelRoutingPolicy | None = None
+    tool_results: ToolResultRendering = field(default_factory=ToolResultRendering)
+    tool_results_by_tool: dict[str, ToolResultRendering] = field(default_factory=dict)
+
+
+@dataobject
+@dataclass
+class AgentJobSettings:
+    """Storage and polling configuration for agents running as jobs."""
+
+    store_path: str
+    poll_interval_seconds: float = 0.5
+    max_wait_seconds: float = 30.0
+
+
+class CheckpointBackend(str, Enum):
+    """Local storage backends for agent loop checkpoints."""
+
+    FILE = "file"
+    SQLITE = "sqlite"
+
+
+@dataobject
+@dataclass
+class AgentCheckpointSettings:
+    """Where to keep agent loop checkpoints.
+
+    `path` is a directory for the `file` backend, and a database file for `sqlite`.
+    """
+
+    path: str
+    backend: CheckpointBackend = CheckpointBackend.FILE
+
+
+@dataobject
+@dataclass
+class AgentTracingSettings:
+    """Local export of agent loop tracing spans.
+
+    Spans of each run, including model and MCP client calls, are appended as JSON lines
+    to the file at `path`.
+    """
+
+    path: str
+
+
+@dataobject
+@dataclass
+class SchedulerSettings:
+    """Capacity shared by all agent loops in the process for a kind of call.
+
+    Calls are queued by tenant or priority class, and dispatched with weighted fair
+    queuing: each queue gets a share of `max_in_flight` proportional to its weight in
+    `weights`, or `default_weight`, while it has calls waiting. A queue never has more
+    than `max_in_flight_per_queue` calls running. A call waiting longer than
+    `max_wait_seconds` is dispatched before any fair-order call, oldest first.
+
+    Capacities and weights must be positive.
+    """
+
+    max_in_flight: int = field(gt=0)
+    max_in_flight_per_queue: int | None = field(default=None, gt=0)
+    weights: dict[str, Annotated[float, field(gt=0)]] = field(default_factory=dict)
+    default_weight: float = field(default=1.0, gt=0)
+    max_wait_seconds: float | None = field(default=None, ge=0)
+
+
+@dataobject
+@dataclass
+class AgentSchedulingSettings:
+    """Scheduling of model and tool calls of agent loops by tenant or priority class.
+
+    The queue of a run is the value of `queue_key` in the agent loop payload metadata,
+    or `default_queue` when not present. Calls are scheduled in the process-wide
+    `model` and `tools` schedulers when set, and run without waiting otherwise.
+    """
+
+    model: SchedulerSettings | None = None
+    tools: SchedulerSettings | None = None
+    queue_key: str = "tenant"
+    default_queue: str = "default"
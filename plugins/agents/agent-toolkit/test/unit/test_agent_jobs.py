@@ -0,0 +1,144 @@
+"""Unit tests for agent job steps and job store."""
+
+import asyncio
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from hopeit.app.config import EventType
+from hopeit.dataobjects.payload import Payload
+from pytest import MonkeyPatch
+
+from hopeit_agents.agent_toolkit.app.steps import agent_jobs
+from hopeit_agents.agent_toolkit.app.steps.agent_jobs import (
+    AgentJob,
+    AgentJobStatus,
+    AgentJobStore,
+)
+from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
+    AgentLoopConfig,
+    AgentLoopPayload,
+    AgentLoopResult,
+)
+from hopeit_agents.agent_toolkit.settings import AgentJobSettings, AgentSettings
+from hopeit_agents.mcp_client.models import MCPClientConfig
+from hopeit_agents.model_client.models import (
+    CompletionConfig,
+    Conversation,
+    Message,
+    Role,
+)
+
+
+def _context(tmp_path: Path, event_type: EventType = EventType.STREAM) -> MagicMock:
+    context = MagicMock()
+    context.settings.side_effect = lambda key, datatype: AgentJobSettings(
+        store_path=str(tmp_path), poll_interval_seconds=0.01, max_wait_seconds=1.0
+    )
+    context.settings.stream.timeout = 60
+    context.settings.response_timeout = 60
+    context.event_info.type = event_type
+    context.creation_ts = datetime.now(UTC)
+    return context
+
+
+@pytest.fixture(autouse=True)
+def mock_logger(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(agent_jobs, "logger", MagicMock())
+
+
+def _payload() -> AgentLoopPayload:
+    return AgentLoopPayload(
+        conversation=Conversation(
+            conversation_id="conv-1", messages=[Message(role=Role.USER, content="help")]
+        ),
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=1),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(command="demo"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_and_run_agent_job(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """A submitted job is published with its payload, run by the worker and stored."""
+    context = _context(tmp_path)
+    payload = _payload()
+    job = await agent_jobs.submit_agent_job(payload, context)
+
+    assert job.status is AgentJobStatus.QUEUED
+    assert job.payload == payload
+    stored = await AgentJobStore(tmp_path).load(job.job_id)
+    assert stored is not None
+    assert stored.status is AgentJobStatus.QUEUED
+    assert stored.payload is None
+
+    # Job travels through the stream serialized
+    published = Payload.from_json(Payload.to_json(job), datatype=AgentJob)
+    loop_result = AgentLoopResult(
+        conversation=payload.conversation, user_context={}, tool_call_log=[]
+    )
+    loop_mock = AsyncMock(return_value=loop_result)
+    monkeypatch.setattr(agent_jobs, "agent_with_tools_loop", loop_mock)
+
+    finished = await agent_jobs.run_agent_job(published, context)
+
+    assert finished.status is AgentJobStatus.COMPLETED
+    assert finished.attempts == 1
+    assert finished.result == loop_result
+    loop_payload = loop_mock.await_args_list[0].args[0]
+    assert loop_payload.deadline is not None
+    assert await AgentJobStore(tmp_path).load(job.job_id) == finished
+
+    # Redelivered messages do not run the loop again
+    again = await agent_jobs.run_agent_job(published, context)
+    assert again == finished
+    loop_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_agent_job_records_failure(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Errors running the loop are stored in a FAILED job."""
+    context = _context(tmp_path)
+    job = await agent_jobs.submit_agent_job(_payload(), context)
+    monkeypatch.setattr(
+        agent_jobs, "agent_with_tools_loop", AsyncMock(side_effect=RuntimeError("boom"))
+    )
+
+    failed = await agent_jobs.run_agent_job(job, context)
+
+    assert failed.status is AgentJobStatus.FAILED
+    assert failed.error == "boom"
+    assert failed.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_get_agent_job_long_polls(tmp_path: Path) -> None:
+    """Status requests wait for the job to finish, up to the requested time."""
+    context = _context(tmp_path, EventType.GET)
+    store = AgentJobStore(tmp_path)
+    job = AgentJob(job_id="a" * 32, status=AgentJobStatus.RUNNING, submitted_at=datetime.now(UTC))
+    await store.save(job)
+
+    pending = await agent_jobs.get_agent_job(job.job_id, context, wait_seconds=0.05)
+    assert pending is not None
+    assert pending.status is AgentJobStatus.RUNNING
+
+    async def finish() -> None:
+        await asyncio.sleep(0.05)
+        await store.save(
+            AgentJob(
+                job_id=job.job_id, status=AgentJobStatus.COMPLETED, submitted_at=job.submitted_at
+            )
+        )
+
+    task = asyncio.create_task(finish())
+    finished = await agent_jobs.get_agent_job(job.job_id, context, wait_seconds=10.0)
+    await task
+    assert finished is not None
+    assert finished.status is AgentJobStatus.COMPLETED
+
+    assert await agent_jobs.get_agent_job("b" * 32, context) is None
+    assert await agent_jobs.get_agent_job("../etc/passwd", context) is None
@@ -1,7 +1,9 @@
 """Unit tests for the agent loop step."""
 
+import asyncio
 from collections.abc import Mapping
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
@@ -10,15 +12,31 @@ from hopeit.dataobjects.payload import Payload
 from pytest import MonkeyPatch
 
 from hopeit_agents.agent_toolkit.app.steps import agent_loop
-from hopeit_agents.agent_toolkit.app.steps.agent_loop import AgentLoopConfig, AgentLoopPayload
-from hopeit_agents.agent_toolkit.settings import AgentSettings
+from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
+    AgentLoopConfig,
+    AgentLoopPayload,
+    AgentLoopStopReason,
+)
+from hopeit_agents.agent_toolkit.scheduler import fair_scheduler, scheduler_stats
+from hopeit_agents.agent_toolkit.settings import (
+    AgentSchedulingSettings,
+    AgentSettings,
+    AgentTracingSettings,
+    ModelRoutingPolicy,
+    SchedulerSettings,
+)
+from hopeit_agents.mcp_client.client import MCPClientError
 from hopeit_agents.mcp_client.models import (
     MCPClientConfig,
+    ToolCallLogRetention,
     ToolCallRecord,
     ToolCallRequestLog,
+    ToolDescriptor,
     ToolExecutionResult,
     ToolExecutionStatus,
 )
+from hopeit_agents.mcp_client.tracing import jsonl_span_exporter
+from hopeit_agents.model_client.client import ModelClientError
 from hopeit_agents.model_client.models import (
     CompletionConfig,
     CompletionRequest,
@@ -28,6 +46,7 @@ from hopeit_agents.model_client.models import (
     Role,
     ToolCall,
     ToolFunctionCall,
+    Usage,
 )
 
 
@@ -115,6 +134,7 @@ async def test_agent_loop_executes_tool_calls(monkeypatch: MonkeyPatch) -> None:
     assert final_messages[-1].tool_call_id == "call-1"
     assert result.tool_call_log == [record]
     assert result.user_context == payload.user_context
+    assert result.stop_reason is AgentLoopStopReason.MAX_ITERATIONS
 
 
 @pytest.mark.asyncio
@@ -170,6 +190,679 @@ async def test_agent_loop_returns_assistant_message(monkeypatch: MonkeyPatch) ->
     assert final_messages[-1].content == "Sure!"
     assert result.tool_call_log == []
     assert result.user_context == payload.user_context
+    assert result.stop_reason is AgentLoopStopReason.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_propagates_deadline(monkeypatch: MonkeyPatch) -> None:
+    """The deadline is forwarded to model and tool calls."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-deadline",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    tool_call = ToolCall(
+        id="call-1",
+        type="function",
+        function=ToolFunctionCall(name="demo_tool", arguments="{}"),
+    )
+    assistant_message = Message(role=Role.ASSISTANT, content="", tool_calls=[tool_call])
+    generate_mock = AsyncMock(
+        return_value=CompletionResponse(
+            response_id="resp-1",
+            model="test-model",
+            created_at=datetime.now(UTC),
+            message=assistant_message,
+            tool_calls=[tool_call],
+            conversation=initial_conversation.with_message(assistant_message),
+        )
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    execute_mock = AsyncMock(return_value=[])
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute_mock)
+
+    deadline = datetime.now(UTC) + timedelta(seconds=60)
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(),
+        loop_config=AgentLoopConfig(max_iterations=1),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="test-template.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+        deadline=deadline,
+    )
+
+    await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    awaited_request = generate_mock.await_args_list[0].args[0]
+    assert awaited_request.deadline == deadline
+    assert execute_mock.await_args_list[0].kwargs["deadline"] == deadline
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_stops_when_deadline_cannot_cover_iteration(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """The loop returns the partial conversation when no time is left for another turn."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-late",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    generate_mock = AsyncMock()
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(),
+        loop_config=AgentLoopConfig(max_iterations=3, min_iteration_seconds=30.0),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(),
+        deadline=datetime.now(UTC) + timedelta(seconds=10),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    generate_mock.assert_not_called()
+    assert result.conversation == initial_conversation
+    assert result.stop_reason is AgentLoopStopReason.DEADLINE
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_stops_when_model_call_times_out_on_deadline(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """A model call timing out on the deadline stops the loop without adding the error."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-model-deadline",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+
+    async def generate(request: CompletionRequest, context: Any) -> CompletionResponse:
+        assert request.deadline is not None
+        await asyncio.sleep((request.deadline - datetime.now(UTC)).total_seconds())
+        raise ModelClientError(status=504, message="Timed out waiting for model")
+
+    generate_mock = AsyncMock(side_effect=generate)
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(),
+        loop_config=AgentLoopConfig(max_iterations=3),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(),
+        deadline=datetime.now(UTC) + timedelta(seconds=0.2),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    generate_mock.assert_awaited_once()
+    assert result.conversation == initial_conversation
+    assert result.stop_reason is AgentLoopStopReason.DEADLINE
+
+
+def _completion(conversation: Conversation, message: Message) -> CompletionResponse:
+    return CompletionResponse(
+        response_id="resp",
+        model="test-model",
+        created_at=datetime.now(UTC),
+        message=message,
+        tool_calls=message.tool_calls or [],
+        conversation=conversation.with_message(message),
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_escalates_model_on_unresolved_tool(monkeypatch: MonkeyPatch) -> None:
+    """Turns run with the small model, escalating when a tool call cannot be resolved."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-routing",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    bad_call = Message(
+        role=Role.ASSISTANT,
+        content="",
+        tool_calls=[
+            ToolCall(
+                id="call-1",
+                type="function",
+                function=ToolFunctionCall(name="unknown-tool", arguments="{}"),
+            )
+        ],
+    )
+    good_call = Message(
+        role=Role.ASSISTANT,
+        content="",
+        tool_calls=[
+            ToolCall(
+                id="call-2",
+                type="function",
+                function=ToolFunctionCall(name="demo-tool", arguments='{"foo": "bar"}'),
+            )
+        ],
+    )
+    answer = Message(role=Role.ASSISTANT, content='{"result": 1}')
+    generate_mock = AsyncMock(
+        side_effect=[
+            _completion(initial_conversation, bad_call),
+            _completion(initial_conversation, good_call),
+            _completion(initial_conversation, answer),
+        ]
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    execute_mock = AsyncMock(return_value=[])
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute_mock)
+    monkeypatch.setattr(agent_loop, "logger", MagicMock())
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(
+            model="large",
+            available_tools=[
+                ToolDescriptor(
+                    name="demo-tool",
+                    title=None,
+                    description=None,
+                    input_schema={"type": "object", "properties": {"foo": {"type": "string"}}},
+                    output_schema=None,
+                )
+            ],
+        ),
+        loop_config=AgentLoopConfig(max_iterations=3),
+        agent_settings=AgentSettings(
+            agent_name="test-agent",
+            system_prompt_template="t.md",
+            enable_tools=True,
+            model_routing=ModelRoutingPolicy(
+                tool_turn_model="small", escalation_models=["large"], require_json_output=True
+            ),
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    models = [call.args[0].config.model for call in generate_mock.await_args_list]
+    # Sticky routing keeps the escalated model for the following turns
+    assert models == ["small", "large", "large"]
+    assert result.stop_reason is AgentLoopStopReason.COMPLETED
+    assert execute_mock.await_args_list[0].kwargs["tool_calls"][0].tool_name == "demo-tool"
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_escalates_model_on_error_and_invalid_output(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Model errors and invalid final answers are retried with the next model."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-routing",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    generate_mock = AsyncMock(
+        side_effect=[
+            ModelClientError(status=500, message="Invalid JSON response"),
+            _completion(initial_conversation, Message(role=Role.ASSISTANT, content="not json")),
+            _completion(initial_conversation, Message(role=Role.ASSISTANT, content="[1]")),
+        ]
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    monkeypatch.setattr(agent_loop, "logger", MagicMock())
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="medium"),
+        loop_config=AgentLoopConfig(max_iterations=1),
+        agent_settings=AgentSettings(
+            agent_name="test-agent",
+            system_prompt_template="t.md",
+            model_routing=ModelRoutingPolicy(
+                escalation_models=["large", "largest"], require_json_output=True
+            ),
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    models = [call.args[0].config.model for call in generate_mock.await_args_list]
+    assert models == ["medium", "large", "largest"]
+    assert result.conversation.messages[-1].content == "[1]"
+    assert result.stop_reason is AgentLoopStopReason.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_stops_on_token_budget(monkeypatch: MonkeyPatch) -> None:
+    """No model call is made once reported tokens reach the total tokens budget."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-budget",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    empty = _completion(initial_conversation, Message(role=Role.ASSISTANT, content=""))
+    empty.usage = Usage(prompt_tokens=60, completion_tokens=10, total_tokens=70)
+    generate_mock = AsyncMock(return_value=empty)
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=5, max_total_tokens=100),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert generate_mock.await_count == 2
+    assert result.total_tokens == 140
+    assert result.stop_reason is AgentLoopStopReason.TOKEN_BUDGET
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_schedules_model_calls_by_tenant(monkeypatch: MonkeyPatch) -> None:
+    """Model calls hold a slot of the model scheduler in the queue of the run tenant."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-scheduled",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    empty = _completion(initial_conversation, Message(role=Role.ASSISTANT, content=""))
+    generate_mock = AsyncMock(return_value=empty)
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(
+            max_iterations=2,
+            scheduling=AgentSchedulingSettings(model=SchedulerSettings(max_in_flight=2)),
+        ),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(),
+        metadata={"tenant": "tenant-scheduled"},
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert result.stop_reason is AgentLoopStopReason.MAX_ITERATIONS
+    stats = {s.queue: s for s in scheduler_stats()["model"]}
+    assert stats["tenant-scheduled"].dispatched == 2
+    assert stats["tenant-scheduled"].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_stops_when_deadline_passes_waiting_for_model(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Waiting for model capacity is limited by the deadline."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-scheduled-deadline",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    generate_mock = AsyncMock()
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    settings = SchedulerSettings(max_in_flight=1)
+    scheduler = fair_scheduler("model", settings)
+    await scheduler.acquire("busy-tenant")
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(
+            max_iterations=2, scheduling=AgentSchedulingSettings(model=settings)
+        ),
+        agent_settings=AgentSettings(agent_name="test-agent", system_prompt_template="t.md"),
+        mcp_settings=MCPClientConfig(),
+        deadline=datetime.now(UTC) + timedelta(seconds=0.1),
+    )
+
+    try:
+        result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+    finally:
+        scheduler.release("busy-tenant")
+
+    generate_mock.assert_not_called()
+    assert result.conversation == initial_conversation
+    assert result.stop_reason is AgentLoopStopReason.DEADLINE
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("retention", [ToolCallLogRetention.SUMMARY, ToolCallLogRetention.NONE])
+async def test_agent_loop_tool_call_log_retention(
+    monkeypatch: MonkeyPatch, retention: ToolCallLogRetention
+) -> None:
+    """Tool call log keeps summaries or no records, while the model sees full results."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-retention",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    tool_call = ToolCall(
+        id="call-0", type="function", function=ToolFunctionCall(name="demo-tool", arguments="{}")
+    )
+    message = Message(role=Role.ASSISTANT, content="", tool_calls=[tool_call])
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        AsyncMock(return_value=_completion(initial_conversation, message)),
+    )
+    record = ToolCallRecord(
+        request=ToolCallRequestLog(tool_call_id="call-0", tool_name="demo-tool", payload={}),
+        response=ToolExecutionResult(
+            call_id="call-0",
+            tool_name="demo-tool",
+            status=ToolExecutionStatus.SUCCESS,
+            structured_content={"answer": 42},
+        ),
+    )
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", AsyncMock(return_value=[record]))
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=1, tool_call_log=retention),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert '"answer": 42' in (result.conversation.messages[-1].content or "")
+    if retention is ToolCallLogRetention.NONE:
+        assert result.tool_call_log == []
+    else:
+        (logged,) = result.tool_call_log
+        assert logged.request == record.request
+        assert logged.response.status is ToolExecutionStatus.SUCCESS
+        assert logged.response.structured_content is None
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_skips_tool_calls_over_budget(monkeypatch: MonkeyPatch) -> None:
+    """Tool calls over the tool calls budget are answered without being executed."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-budget",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    tool_calls = [
+        ToolCall(
+            id=f"call-{i}",
+            type="function",
+            function=ToolFunctionCall(name="demo-tool", arguments="{}"),
+        )
+        for i in range(3)
+    ]
+    message = Message(role=Role.ASSISTANT, content="", tool_calls=tool_calls)
+    generate_mock = AsyncMock(return_value=_completion(initial_conversation, message))
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+
+    async def execute(*args: Any, tool_calls: list[Any], **kwargs: Any) -> list[ToolCallRecord]:
+        return [
+            ToolCallRecord(
+                request=ToolCallRequestLog(
+                    tool_call_id=tc.call_id, tool_name=tc.tool_name, payload={}
+                ),
+                response=ToolExecutionResult(
+                    call_id=tc.call_id,
+                    tool_name=tc.tool_name,
+                    status=ToolExecutionStatus.SUCCESS,
+                    content=[],
+                ),
+            )
+            for tc in tool_calls
+        ]
+
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute)
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=5, max_tool_calls=2, max_seconds=60.0),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    generate_mock.assert_awaited_once()
+    assert [r.request.tool_call_id for r in result.tool_call_log] == ["call-0", "call-1"]
+    last = result.conversation.messages[-1]
+    assert last.role is Role.TOOL
+    assert last.tool_call_id == "call-2"
+    assert last.content == "Tool call not executed: tool_call_budget"
+    assert result.stop_reason is AgentLoopStopReason.TOOL_CALL_BUDGET
+
+
+def _success_records(tool_calls: list[Any]) -> list[ToolCallRecord]:
+    return [
+        ToolCallRecord(
+            request=ToolCallRequestLog(tool_call_id=tc.call_id, tool_name=tc.tool_name, payload={}),
+            response=ToolExecutionResult(
+                call_id=tc.call_id,
+                tool_name=tc.tool_name,
+                status=ToolExecutionStatus.SUCCESS,
+                content=[],
+            ),
+        )
+        for tc in tool_calls
+    ]
+
+
+def _tool_calls_completion(conversation: Conversation, calls: int) -> CompletionResponse:
+    tool_calls = [
+        ToolCall(
+            id=f"call-{i}",
+            type="function",
+            function=ToolFunctionCall(name="demo-tool", arguments="{}"),
+        )
+        for i in range(calls)
+    ]
+    message = Message(role=Role.ASSISTANT, content="", tool_calls=tool_calls)
+    return _completion(conversation, message)
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_executes_tool_calls_batch_within_budget(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Tool calls in a batch that fit in the tool calls budget are executed."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-batch-budget",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        AsyncMock(return_value=_tool_calls_completion(initial_conversation, 3)),
+    )
+    batches: list[list[str]] = []
+
+    async def execute(*args: Any, tool_calls: list[Any], **kwargs: Any) -> list[ToolCallRecord]:
+        batches.append([tc.call_id for tc in tool_calls])
+        return _success_records(tool_calls)
+
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute)
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=5, max_tool_calls=2),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert batches == [["call-0", "call-1"]]
+    assert [r.request.tool_call_id for r in result.tool_call_log] == ["call-0", "call-1"]
+    last = result.conversation.messages[-1]
+    assert last.tool_call_id == "call-2"
+    assert last.content == "Tool call not executed: tool_call_budget"
+    assert result.stop_reason is AgentLoopStopReason.TOOL_CALL_BUDGET
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_time_budget_limits_calls_in_flight(monkeypatch: MonkeyPatch) -> None:
+    """Calls in flight time out with the time budget, stopping the loop on it."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-time-budget",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    generate_mock = AsyncMock(return_value=_tool_calls_completion(initial_conversation, 2))
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    deadlines: list[datetime] = []
+
+    async def execute(*args: Any, deadline: datetime, **kwargs: Any) -> list[ToolCallRecord]:
+        deadlines.append(deadline)
+        await asyncio.sleep((deadline - datetime.now(UTC)).total_seconds())
+        raise MCPClientError("Tool call timed out")
+
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute)
+
+    started = datetime.now(UTC)
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(max_iterations=5, max_seconds=0.2),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+        deadline=started + timedelta(seconds=60),
+    )
+
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert generate_mock.await_args_list[0].args[0].deadline <= started + timedelta(seconds=1)
+    assert len(deadlines) == 1
+    assert deadlines[0] <= started + timedelta(seconds=1)
+    assert result.tool_call_log == []
+    assert [m.content for m in result.conversation.messages[-2:]] == [
+        "Tool call not executed: time_budget"
+    ] * 2
+    assert result.stop_reason is AgentLoopStopReason.TIME_BUDGET
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_records_spans(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """With tracing, the run, its iterations and tool calls are exported as spans."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-tracing",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    tool_call = ToolCall(
+        id="call-1",
+        type="function",
+        function=ToolFunctionCall(name="demo-tool", arguments="{}"),
+    )
+    generate_mock = AsyncMock(
+        side_effect=[
+            _completion(
+                initial_conversation,
+                Message(role=Role.ASSISTANT, content="", tool_calls=[tool_call]),
+            ),
+            _completion(initial_conversation, Message(role=Role.ASSISTANT, content="done")),
+        ]
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    record = ToolCallRecord(
+        request=ToolCallRequestLog(tool_call_id="call-1", tool_name="demo-tool", payload={}),
+        response=ToolExecutionResult(
+            call_id="call-1",
+            tool_name="demo-tool",
+            status=ToolExecutionStatus.SUCCESS,
+            structured_content={"status": "ok"},
+        ),
+    )
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", AsyncMock(return_value=[record]))
+
+    trace_file = tmp_path / "spans.jsonl"
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(model="test-model"),
+        loop_config=AgentLoopConfig(
+            max_iterations=3, tracing=AgentTracingSettings(path=str(trace_file))
+        ),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+    )
+
+    await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    spans = {s.span_id: s for s in jsonl_span_exporter(str(trace_file)).read()}
+    by_name = {s.name: s for s in spans.values()}
+    root = by_name["agent_loop"]
+    assert root.parent_span_id is None
+    assert root.attributes["stop_reason"] == "completed"
+    assert root.attributes["tool_calls"] == 1
+    iterations = [s for s in spans.values() if s.name == "agent_loop.iteration"]
+    assert [s.attributes["iteration"] for s in iterations] == [0, 1]
+    assert all(s.parent_span_id == root.span_id for s in iterations)
+    assert by_name["agent_loop.tool_calls"].parent_span_id in {s.span_id for s in iterations}
+    assert by_name["agent_loop.append_tool_results"].attributes["messages"] == 1
+    assert {s.trace_id for s in spans.values()} == {root.trace_id}
 
 
 def test_format_tool_result_prefers_structured_content() -> None:
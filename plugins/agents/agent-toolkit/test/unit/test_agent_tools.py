@@ -1,15 +1,22 @@
 """Unit tests for MCP agent tool helpers."""
 
+import hashlib
 import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from types import SimpleNamespace
 from typing import Any, cast
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from hopeit.app.context import EventContext
 
 from hopeit_agents.agent_toolkit.mcp import agent_tools
-from hopeit_agents.mcp_client.client import MCPClientError
+from hopeit_agents.agent_toolkit.mcp.tool_results import render_tool_result
+from hopeit_agents.agent_toolkit.settings import ToolResultRendering
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
 from hopeit_agents.mcp_client.models import (
+    BlobHandle,
     MCPClientConfig,
     ToolCallRecord,
     ToolDescriptor,
@@ -192,12 +199,14 @@ async def test_call_tool_invokes_client(monkeypatch: pytest.MonkeyPatch) -> None
             *,
             call_id: str | None = None,
             session_id: str | None = None,
+            deadline: datetime | None = None,
         ) -> ToolExecutionResult:
             captured["call_args"] = {
                 "tool_name": tool_name,
                 "payload": payload,
                 "call_id": call_id,
                 "session_id": session_id,
+                "deadline": deadline,
             }
             return expected_result
 
@@ -224,6 +233,7 @@ async def test_call_tool_invokes_client(monkeypatch: pytest.MonkeyPatch) -> None
         "payload": {"foo": "bar"},
         "call_id": "call-123",
         "session_id": "session-1",
+        "deadline": None,
     }
 
 
@@ -247,6 +257,7 @@ async def test_call_tool_propagates_client_errors(monkeypatch: pytest.MonkeyPatc
             *,
             call_id: str | None = None,
             session_id: str | None = None,
+            deadline: datetime | None = None,
         ) -> ToolExecutionResult:
             raise MCPClientError("failed")
 
@@ -281,6 +292,7 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
         tool_name: str,
         payload: dict[str, Any],
         session_id: str | None,
+        deadline: datetime | None,
     ) -> ToolExecutionResult:
         calls.append(
             {
@@ -288,6 +300,7 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
                 "tool_name": tool_name,
                 "payload": payload,
                 "session_id": session_id,
+                "deadline": deadline,
             }
         )
         return ToolExecutionResult(
@@ -307,6 +320,7 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
 
     config = MCPClientConfig()
     context, _ = _stub_context({})
+    deadline = datetime.now(UTC) + timedelta(seconds=30)
     tool_calls = [
         ToolInvocation(tool_name="alpha", payload={"foo": "bar"}, call_id="explicit"),
         ToolInvocation(tool_name="beta", payload={"baz": "qux"}),
@@ -317,6 +331,7 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
         context,
         tool_calls=tool_calls,
         session_id="session-2",
+        deadline=deadline,
     )
 
     assert len(records) == 2
@@ -326,6 +341,7 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
         "tool_name": "alpha",
         "payload": {"foo": "bar"},
         "session_id": "session-2",
+        "deadline": deadline,
     }
     assert records[0].request.tool_call_id == "explicit"
     assert records[0].request.payload == {"foo": "bar"}
@@ -335,3 +351,78 @@ async def test_execute_tool_calls_invokes_each_call(monkeypatch: pytest.MonkeyPa
     assert calls[1]["tool_name"] == "beta"
     assert records[1].request.tool_call_id == generated_call_id
     assert records[1].request.payload == {"baz": "qux"}
+
+
+@pytest.mark.asyncio
+async def test_load_tool_results_loads_blobs(tmp_path: Path) -> None:
+    """load_tool_results should load structured content of results returned as blobs."""
+    data = b'{"rows": [1, 2, 3]}'
+    digest = hashlib.sha256(data).hexdigest()
+    path = tmp_path / digest[:2] / digest
+    path.parent.mkdir()
+    path.write_bytes(data)
+    inline = ToolExecutionResult(
+        call_id="inline",
+        tool_name="alpha",
+        status=ToolExecutionStatus.SUCCESS,
+        structured_content={"result": 1},
+    )
+    blob = ToolExecutionResult(
+        call_id="blob",
+        tool_name="beta",
+        status=ToolExecutionStatus.SUCCESS,
+        blob=BlobHandle(
+            uri=f"hopeit-blob://sha256/{digest}",
+            sha256=digest,
+            size=len(data),
+        ),
+    )
+    context, _ = _stub_context({})
+
+    config = MCPClientConfig(blob_dir=str(tmp_path))
+
+    assert await agent_tools.load_tool_results(config, context, [inline]) == [inline]
+    results = await agent_tools.load_tool_results(config, context, [inline, blob])
+
+    assert results[0] is inline
+    assert results[1].structured_content == {"rows": [1, 2, 3]}
+    assert results[1].blob == blob.blob
+
+    # Blobs over the rendering size cap are previewed, not loaded
+    capped = ToolResultRendering(max_chars=10, tail_fraction=0.3)
+    results = await agent_tools.load_tool_results(config, context, [inline, blob], [capped, capped])
+
+    assert results[0] is inline
+    assert results[1].structured_content is None
+    preview = '{"rows"\n... [9 characters omitted] ...\n3]}'
+    assert results[1].content == [{"type": "text", "text": preview}]
+    assert render_tool_result(results[1], capped) == preview
+
+
+@pytest.mark.asyncio
+async def test_load_tool_results_reports_blobs_not_loaded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Blobs that cannot be read are returned as errors instead of failing the batch."""
+    digest = hashlib.sha256(b"pruned").hexdigest()
+    pruned = ToolExecutionResult(
+        call_id="pruned",
+        tool_name="beta",
+        status=ToolExecutionStatus.SUCCESS,
+        blob=BlobHandle(uri=f"hopeit-blob://sha256/{digest}", sha256=digest, size=6),
+    )
+    read_blob = AsyncMock(
+        side_effect=MCPClientError(f"Blob 'hopeit-blob://sha256/{digest}' not found")
+    )
+    monkeypatch.setattr(MCPClient, "_read_blob", read_blob)
+    monkeypatch.setattr(agent_tools, "logger", MagicMock())
+    context, _ = _stub_context({})
+
+    results = await agent_tools.load_tool_results(
+        MCPClientConfig(blob_dir=str(tmp_path)), context, [pruned]
+    )
+
+    message = f"Failed to load tool result: Blob 'hopeit-blob://sha256/{digest}' not found"
+    assert results[0].status is ToolExecutionStatus.ERROR
+    assert results[0].error_message == message
+    assert render_tool_result(results[0]) == message
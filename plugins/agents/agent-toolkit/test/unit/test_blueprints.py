@@ -0,0 +1,100 @@
+"""Unit tests for agent blueprints."""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest import MonkeyPatch
+
+from hopeit_agents.agent_toolkit.agents import blueprints
+from hopeit_agents.agent_toolkit.agents.blueprints import AgentBlueprints
+from hopeit_agents.agent_toolkit.agents.templates import TemplateRegistry
+from hopeit_agents.agent_toolkit.settings import AgentSettings
+from hopeit_agents.mcp_client.models import MCPClientConfig, ToolDescriptor
+from hopeit_agents.model_client.models import Role
+
+
+def _tool(name: str) -> ToolDescriptor:
+    return ToolDescriptor(
+        name=name,
+        title=None,
+        description=f"{name} tool",
+        input_schema={"type": "object"},
+        output_schema=None,
+    )
+
+
+def _context(tmp_path: Path, tool_cache_seconds: float) -> MagicMock:
+    (tmp_path / "system.md").write_text("Answer using {{schema}}.")
+    (tmp_path / "tools.md").write_text("{{tool_descriptions}}")
+    settings: dict[str, Any] = {
+        "agent": AgentSettings(
+            agent_name="agent",
+            system_prompt_template=str(tmp_path / "system.md"),
+            tool_prompt_template=str(tmp_path / "tools.md"),
+            enable_tools=True,
+            include_tool_schemas_in_prompt=False,
+        ),
+        "mcp": MCPClientConfig(tool_cache_seconds=tool_cache_seconds),
+    }
+    context = MagicMock()
+    context.app_key = "app"
+    context.settings.side_effect = lambda key, datatype: settings[key]
+    return context
+
+
+@pytest.mark.asyncio
+async def test_blueprint_is_reused_between_requests(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    resolve_mock = AsyncMock(return_value=[_tool("sum")])
+    monkeypatch.setattr(blueprints, "resolve_tools", resolve_mock)
+    monkeypatch.setattr(blueprints, "logger", MagicMock())
+    context = _context(tmp_path, tool_cache_seconds=3600.0)
+    registry = AgentBlueprints(TemplateRegistry())
+    keys: dict[str, Any] = {
+        "settings_key": "agent",
+        "mcp_settings_key": "mcp",
+        "variables": {"schema": "{}"},
+    }
+
+    prepared = await registry.prepare(context, **keys)
+    blueprint = await registry.get(context, **keys)
+
+    assert blueprint is prepared
+    assert resolve_mock.await_count == 1
+    assert context.settings.call_count == 2
+    assert blueprint.system_prompt == "Answer using {}.\nAvailable tools:\n- sum: sum tool"
+    assert blueprint.completion_config.tool_index().get("sum") is not None
+
+    conversation = blueprint.conversation("hello")
+    assert [m.role for m in conversation.messages] == [Role.SYSTEM, Role.USER]
+
+    changed = await registry.get(context, **{**keys, "variables": {"schema": "[]"}})
+    assert changed.system_prompt.startswith("Answer using [].")
+    assert changed.tools is blueprint.tools
+
+
+@pytest.mark.asyncio
+async def test_blueprint_refreshed_when_tools_change(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    resolve_mock = AsyncMock(side_effect=[[_tool("sum")], [_tool("sum")], [_tool("random")]])
+    monkeypatch.setattr(blueprints, "resolve_tools", resolve_mock)
+    monkeypatch.setattr(blueprints, "logger", MagicMock())
+    context = _context(tmp_path, tool_cache_seconds=0.0)
+    registry = AgentBlueprints(TemplateRegistry())
+    keys: dict[str, Any] = {
+        "settings_key": "agent",
+        "mcp_settings_key": "mcp",
+        "variables": {"schema": "{}"},
+    }
+
+    first = await registry.get(context, **keys)
+    same = await registry.get(context, **keys)
+    refreshed = await registry.get(context, **keys)
+
+    assert same is first
+    assert [tool.name for tool in refreshed.tools] == ["random"]
+    assert "- random: random tool" in refreshed.system_prompt
@@ -0,0 +1,101 @@
+"""Unit tests for the bulk agent runner."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from hopeit.dataobjects.payload import Payload
+
+from hopeit_agents.agent_toolkit.bulk import (
+    BulkCaseResult,
+    BulkCaseStatus,
+    completed_cases,
+    read_cases,
+    run_cases,
+)
+from hopeit_agents.mcp_client.tracing import span
+
+
+def _write_cases(path: Path, count: int) -> None:
+    path.write_text(
+        "".join(json.dumps({"id": f"case-{i}", "value": i}) + "\n" for i in range(count))
+    )
+
+
+def _results(path: Path) -> list[BulkCaseResult]:
+    return [
+        Payload.from_json(line, datatype=BulkCaseResult) for line in path.read_text().splitlines()
+    ]
+
+
+def test_read_cases_by_shard(tmp_path: Path) -> None:
+    input_path = tmp_path / "cases.jsonl"
+    _write_cases(input_path, 5)
+
+    shard = list(read_cases(input_path, shard_index=1, shard_count=2, id_field="id"))
+
+    assert [case_id for case_id, _ in shard] == ["case-1", "case-3"]
+    assert [case_id for case_id, _ in read_cases(input_path)] == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_run_cases_bounds_concurrency_and_collects_usage(tmp_path: Path) -> None:
+    input_path = tmp_path / "cases.jsonl"
+    output_path = tmp_path / "out" / "results.jsonl"
+    _write_cases(input_path, 6)
+    running = 0
+    max_running = 0
+
+    async def execute(payload: str) -> dict[str, Any]:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        value = json.loads(payload)["value"]
+        if value == 4:
+            raise ValueError("bad case")
+        with span("model.complete", prompt_tokens=10, completion_tokens=2, total_tokens=12):
+            pass
+        return {"double": value * 2}
+
+    stats = await run_cases(read_cases(input_path), execute, output_path, concurrency=2)
+
+    assert max_running == 2
+    assert (stats.executed, stats.errors, stats.skipped) == (6, 1, 0)
+    results = {r.case_id: r for r in _results(output_path)}
+    assert results["3"].result == {"double": 6}
+    assert results["3"].usage.total_tokens == 12
+    assert results["3"].usage.model_calls == 1
+    assert results["4"].status is BulkCaseStatus.ERROR
+    assert results["4"].error == "ValueError: bad case"
+    assert completed_cases(output_path) == {"0", "1", "2", "3", "5"}
+
+
+@pytest.mark.asyncio
+async def test_run_cases_resumes_skipping_completed(tmp_path: Path) -> None:
+    input_path = tmp_path / "cases.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    _write_cases(input_path, 3)
+    executed: list[str] = []
+
+    async def execute(payload: str) -> None:
+        executed.append(json.loads(payload)["id"])
+
+    await run_cases(list(read_cases(input_path))[:2], execute, output_path, concurrency=4)
+    with open(output_path, "a") as f:
+        f.write('{"case_id": "2", "sta')  # interrupted write
+
+    stats = await run_cases(
+        read_cases(input_path),
+        execute,
+        output_path,
+        concurrency=4,
+        skip=completed_cases(output_path),
+    )
+
+    assert executed == ["case-0", "case-1", "case-2"]
+    assert (stats.executed, stats.skipped) == (1, 2)
+    assert sorted(r.case_id for r in _results(output_path)) == ["0", "1", "2"]
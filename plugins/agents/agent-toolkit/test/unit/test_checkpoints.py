@@ -0,0 +1,171 @@
+"""Unit tests for checkpoint stores and resuming agent loop runs."""
+
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest import MonkeyPatch
+
+from hopeit_agents.agent_toolkit.app.steps import agent_loop
+from hopeit_agents.agent_toolkit.app.steps.agent_loop import (
+    AgentLoopConfig,
+    AgentLoopPayload,
+    AgentLoopStopReason,
+)
+from hopeit_agents.agent_toolkit.checkpoints import create_checkpoint_store
+from hopeit_agents.agent_toolkit.settings import (
+    AgentCheckpointSettings,
+    AgentSettings,
+    CheckpointBackend,
+)
+from hopeit_agents.mcp_client.client import MCPClientError
+from hopeit_agents.mcp_client.models import (
+    MCPClientConfig,
+    ToolCallRecord,
+    ToolCallRequestLog,
+    ToolExecutionResult,
+    ToolExecutionStatus,
+    ToolInvocation,
+)
+from hopeit_agents.model_client.models import (
+    CompletionConfig,
+    CompletionResponse,
+    Conversation,
+    Message,
+    Role,
+    ToolCall,
+    ToolFunctionCall,
+)
+
+
+def _settings(tmp_path: Path, backend: CheckpointBackend) -> AgentCheckpointSettings:
+    path = tmp_path / ("checkpoints.db" if backend == CheckpointBackend.SQLITE else "checkpoints")
+    return AgentCheckpointSettings(path=str(path), backend=backend)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", list(CheckpointBackend))
+async def test_checkpoint_store_save_load_delete(
+    tmp_path: Path, backend: CheckpointBackend
+) -> None:
+    store = create_checkpoint_store(_settings(tmp_path, backend))
+
+    assert create_checkpoint_store(_settings(tmp_path, backend)) is store
+    assert await store.load("run-1") is None
+    await store.save("run-1", '{"iteration": 1}')
+    await store.save("run-1", '{"iteration": 2}')
+    assert await store.load("run-1") == '{"iteration": 2}'
+    await store.delete("run-1")
+    assert await store.load("run-1") is None
+
+
+def _completion(conversation: Conversation, message: Message) -> CompletionResponse:
+    return CompletionResponse(
+        response_id="resp",
+        model="test-model",
+        created_at=datetime.now(UTC),
+        message=message,
+        tool_calls=message.tool_calls or [],
+        conversation=conversation.with_message(message),
+    )
+
+
+def _record(invocation: ToolInvocation) -> ToolCallRecord:
+    return ToolCallRecord(
+        request=ToolCallRequestLog(
+            tool_call_id=invocation.call_id or "",
+            tool_name=invocation.tool_name,
+            payload=invocation.payload,
+        ),
+        response=ToolExecutionResult(
+            call_id=invocation.call_id or "",
+            tool_name=invocation.tool_name,
+            status=ToolExecutionStatus.SUCCESS,
+            structured_content={"ok": invocation.call_id},
+        ),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", list(CheckpointBackend))
+async def test_agent_loop_resumes_without_repeating_tool_calls(
+    tmp_path: Path, monkeypatch: MonkeyPatch, backend: CheckpointBackend
+) -> None:
+    """A run interrupted during tool calls resumes executing only the missing calls."""
+
+    initial_conversation = Conversation(
+        conversation_id="conv-ckpt",
+        messages=[Message(role=Role.USER, content="help")],
+    )
+    tool_calls = [
+        ToolCall(
+            id=f"call-{i}",
+            type="function",
+            function=ToolFunctionCall(name="demo-tool", arguments="{}"),
+        )
+        for i in (1, 2)
+    ]
+    tool_turn = Message(role=Role.ASSISTANT, content="", tool_calls=tool_calls)
+    answer = Message(role=Role.ASSISTANT, content="done")
+    generate_mock = AsyncMock(
+        side_effect=lambda request, context: _completion(
+            request.conversation,
+            answer if request.conversation.messages[-1].role == Role.TOOL else tool_turn,
+        )
+    )
+    monkeypatch.setattr(
+        "hopeit_agents.agent_toolkit.app.steps.agent_loop.model_generate.generate",
+        generate_mock,
+    )
+    monkeypatch.setattr(agent_loop, "logger", MagicMock())
+
+    executed: list[str | None] = []
+    crash = True
+
+    async def execute_tool_calls(*args, tool_calls, **kwargs) -> list[ToolCallRecord]:  # type: ignore[no-untyped-def]
+        invocation = tool_calls[0]
+        if crash and invocation.call_id == "call-2":
+            raise MCPClientError("worker stopped")
+        executed.append(invocation.call_id)
+        return [_record(invocation)]
+
+    monkeypatch.setattr(agent_loop, "execute_tool_calls", execute_tool_calls)
+
+    payload = AgentLoopPayload(
+        conversation=initial_conversation,
+        user_context={},
+        completion_config=CompletionConfig(),
+        loop_config=AgentLoopConfig(max_iterations=3, checkpoints=_settings(tmp_path, backend)),
+        agent_settings=AgentSettings(
+            agent_name="test-agent", system_prompt_template="t.md", enable_tools=True
+        ),
+        mcp_settings=MCPClientConfig(),
+        run_id="run-1",
+    )
+
+    with pytest.raises(MCPClientError):
+        await agent_loop.agent_with_tools_loop(payload, MagicMock())
+    assert executed == ["call-1"]
+    assert generate_mock.await_count == 1
+
+    crash = False
+    result = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+
+    assert executed == ["call-1", "call-2"]
+    assert generate_mock.await_count == 2
+    assert [r.request.tool_call_id for r in result.tool_call_log] == ["call-1", "call-2"]
+    assert [m.role for m in result.conversation.messages] == [
+        Role.USER,
+        Role.ASSISTANT,
+        Role.TOOL,
+        Role.TOOL,
+        Role.ASSISTANT,
+    ]
+    assert result.stop_reason is AgentLoopStopReason.COMPLETED
+
+    # Finished runs return the saved result without calling model or tools
+    again = await agent_loop.agent_with_tools_loop(payload, MagicMock())
+    assert again == result
+    assert generate_mock.await_count == 2
+    assert executed == ["call-1", "call-2"]
@@ -93,3 +93,18 @@ def test_render_prompt_with_tools_requires_tool_template() -> None:
 
     with pytest.raises(ValueError):
         render_prompt(config, {}, include_tools=True)
+
+
+def test_render_prompt_shares_equal_prompts() -> None:
+    """Equal rendered prompts share one string, kept in a bounded cache."""
+
+    config = create_agent_config(
+        name="shared-agent", prompt_template="Hello {{user}}. " * 10, variables={"user": "Ada"}
+    )
+
+    first = render_prompt(config, {})
+    second = render_prompt(config, {})
+    other = render_prompt(config, {"user": "Bob"})
+
+    assert first is second
+    assert other is not first and other != first
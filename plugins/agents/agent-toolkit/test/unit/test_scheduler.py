@@ -0,0 +1,142 @@
+"""Unit tests for the fair scheduler."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from hopeit_agents.agent_toolkit.scheduler import FairScheduler, SchedulerTimeoutError
+from hopeit_agents.agent_toolkit.settings import SchedulerSettings
+
+
+async def _run_all(
+    scheduler: FairScheduler, calls: list[tuple[str, str]], duration: float = 0.0
+) -> list[str]:
+    """Queue all calls while capacity is held, then return their dispatch order."""
+    order: list[str] = []
+
+    async def call(queue: str, name: str) -> None:
+        async with scheduler.slot(queue):
+            order.append(name)
+            await asyncio.sleep(duration)
+
+    await scheduler.acquire("blocker")
+    tasks = [asyncio.create_task(call(queue, name)) for queue, name in calls]
+    await asyncio.sleep(0)
+    scheduler.release("blocker")
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_interactive_queue_not_delayed_by_batch_backlog() -> None:
+    scheduler = FairScheduler(SchedulerSettings(max_in_flight=1, weights={"interactive": 4.0}))
+    calls = [("batch", f"b{i}") for i in range(10)] + [("interactive", "i0"), ("interactive", "i1")]
+
+    order = await _run_all(scheduler, calls)
+
+    assert order.index("i0") <= 1
+    assert order.index("i1") <= 2
+    stats = {s.queue: s for s in scheduler.stats()}
+    assert stats["batch"].dispatched == 10
+    assert stats["batch"].queued == stats["batch"].in_flight == 0
+    assert stats["batch"].wait_seconds_max >= stats["interactive"].wait_seconds_max
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_per_queue() -> None:
+    scheduler = FairScheduler(SchedulerSettings(max_in_flight=4, max_in_flight_per_queue=2))
+    running = {"a": 0, "b": 0}
+    max_running = {"a": 0, "b": 0}
+
+    async def call(queue: str) -> None:
+        async with scheduler.slot(queue):
+            running[queue] += 1
+            max_running[queue] = max(max_running[queue], running[queue])
+            await asyncio.sleep(0.01)
+            running[queue] -= 1
+
+    await asyncio.gather(*(call("a") for _ in range(5)), *(call("b") for _ in range(5)))
+
+    assert max_running == {"a": 2, "b": 2}
+
+
+@pytest.mark.asyncio
+async def test_starved_call_goes_first() -> None:
+    scheduler = FairScheduler(
+        SchedulerSettings(max_in_flight=1, weights={"batch": 0.01}, max_wait_seconds=0.05)
+    )
+    calls = [("batch", "b0")] + [("interactive", f"i{i}") for i in range(8)]
+
+    order = await _run_all(scheduler, calls, duration=0.02)
+
+    assert order[0] == "i0"
+    assert 1 < order.index("b0") < 8
+    assert {s.queue: s.starved for s in scheduler.stats()}["batch"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_its_place() -> None:
+    scheduler = FairScheduler(SchedulerSettings(max_in_flight=1))
+    await scheduler.acquire("a")
+    waiting = asyncio.create_task(scheduler.acquire("b"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    scheduler.release("a")
+    assert await asyncio.wait_for(scheduler.acquire("c"), timeout=1.0) >= 0.0
+    assert {s.queue: s.queued for s in scheduler.stats()} == {"a": 0, "b": 0, "c": 0}
+
+
+@pytest.mark.asyncio
+async def test_idle_queues_are_removed() -> None:
+    scheduler = FairScheduler(SchedulerSettings(max_in_flight=2))
+
+    await asyncio.gather(*(_hold(scheduler, f"tenant-{i}") for i in range(10)))
+
+    assert scheduler._queues == {}
+    stats = {s.queue: s for s in scheduler.stats()}
+    assert len(stats) == 10
+    assert all(s.dispatched == 1 and s.in_flight == s.queued == 0 for s in stats.values())
+
+    await _hold(scheduler, "tenant-0")
+    assert {s.queue: s.dispatched for s in scheduler.stats()}["tenant-0"] == 2
+
+
+async def _hold(scheduler: FairScheduler, queue: str) -> None:
+    async with scheduler.slot(queue):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_slot_times_out() -> None:
+    scheduler = FairScheduler(SchedulerSettings(max_in_flight=1))
+    await scheduler.acquire("a")
+
+    with pytest.raises(SchedulerTimeoutError):
+        async with scheduler.slot("b", timeout=0.01):
+            pass
+
+    scheduler.release("a")
+    assert await asyncio.wait_for(scheduler.acquire("b"), timeout=1.0) >= 0.0
+    assert {s.queue: (s.queued, s.in_flight) for s in scheduler.stats()} == {
+        "a": (0, 0),
+        "b": (0, 1),
+    }
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"max_in_flight": 0},
+        {"max_in_flight": 1, "max_in_flight_per_queue": 0},
+        {"max_in_flight": 1, "weights": {"batch": 0.0}},
+        {"max_in_flight": 1, "default_weight": 0.0},
+    ],
+)
+def test_invalid_settings_are_rejected(settings: dict[str, Any]) -> None:
+    with pytest.raises(ValidationError):
+        SchedulerSettings(**settings)
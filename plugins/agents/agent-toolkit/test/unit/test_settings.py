@@ -1,6 +1,10 @@
 """Unit tests for agent toolkit settings dataclasses."""
 
-from hopeit_agents.agent_toolkit.settings import AgentSettings
+from hopeit_agents.agent_toolkit.settings import (
+    AgentSettings,
+    ModelEscalationTrigger,
+    ModelRoutingPolicy,
+)
 
 
 def test_agent_settings_defaults() -> None:
@@ -31,3 +35,14 @@ def test_agent_settings_custom_allowed_tools() -> None:
     assert settings.allowed_tools == custom_tools
     custom_tools.append("gamma")
     assert settings.allowed_tools == ["alpha", "beta"]
+
+
+def test_model_routing_policy_models() -> None:
+    """Routing starts with the tool turn model, falling back to the config model."""
+
+    policy = ModelRoutingPolicy(escalation_models=["large"])
+    assert policy.models("default") == ["default", "large"]
+    assert policy.escalate_on == list(ModelEscalationTrigger)
+
+    policy = ModelRoutingPolicy(tool_turn_model="small", escalation_models=["large"])
+    assert policy.models("default") == ["small", "large"]
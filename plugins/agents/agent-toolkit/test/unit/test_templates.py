@@ -0,0 +1,61 @@
+"""Unit tests for compiled prompt templates and the template registry."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.agent_toolkit.agents.templates import TemplateRegistry, compile_template
+from hopeit_agents.agent_toolkit.settings import AgentSettings
+
+
+def test_compiled_template_renders_in_single_pass() -> None:
+    template = compile_template("{{greeting}}, {{name}}! Bye {{name}}.")
+
+    assert template.placeholders == {"greeting", "name"}
+    assert compile_template("{{greeting}}, {{name}}! Bye {{name}}.") is template
+    assert template.render({"greeting": "Hi", "name": "{{greeting}}"}) == (
+        "Hi, {{greeting}}! Bye {{greeting}}."
+    )
+    with pytest.raises(ValueError, match="Missing values for placeholders: name"):
+        template.render({"greeting": "Hi"})
+
+
+def test_registry_reloads_changed_files(tmp_path: Path) -> None:
+    prompt_file = tmp_path / "system.md"
+    tool_file = tmp_path / "tools.md"
+    prompt_file.write_text("You are {{role}}.")
+    tool_file.write_text("Tools: {{tool_descriptions}}")
+    settings = AgentSettings(
+        agent_name="agent",
+        system_prompt_template=str(prompt_file),
+        tool_prompt_template=str(tool_file),
+        enable_tools=True,
+        allowed_tools=["sum"],
+    )
+    registry = TemplateRegistry(check_interval_seconds=0.0)
+
+    config = registry.agent_config(settings)
+    assert registry.agent_config(settings) is config
+    assert config.prompt_template == "You are {{role}}."
+    assert config.tool_prompt_template == "Tools: {{tool_descriptions}}"
+    assert config.tools == ["sum"]
+
+    prompt_file.write_text("You are {{role}}, be brief.")
+    stat = prompt_file.stat()
+    os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reloaded = registry.agent_config(settings)
+    assert reloaded.prompt_template == "You are {{role}}, be brief."
+    assert reloaded.version != config.version
+
+
+def test_registry_skips_checks_within_interval(tmp_path: Path) -> None:
+    prompt_file = tmp_path / "system.md"
+    prompt_file.write_text("first")
+    registry = TemplateRegistry(check_interval_seconds=3600.0)
+
+    template = registry.template(str(prompt_file))
+    prompt_file.unlink()
+
+    assert registry.template(str(prompt_file)) is template
@@ -0,0 +1,116 @@
+"""Unit tests for tool result rendering."""
+
+from typing import Any
+
+import pytest
+from hopeit.dataobjects.payload import Payload
+from pydantic import ValidationError
+
+from hopeit_agents.agent_toolkit.mcp.tool_results import (
+    project_to_schema,
+    render_tool_result,
+    tool_result_rendering,
+)
+from hopeit_agents.agent_toolkit.settings import (
+    AgentSettings,
+    ToolResultFormat,
+    ToolResultRendering,
+)
+from hopeit_agents.mcp_client.models import ToolExecutionResult, ToolExecutionStatus
+
+OUTPUT_SCHEMA: dict[str, Any] = {
+    "$defs": {
+        "Item": {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "value": {"type": "integer"}},
+        }
+    },
+    "type": "object",
+    "properties": {
+        "items": {"type": "array", "items": {"$ref": "#/$defs/Item"}},
+        "summary": {"anyOf": [{"$ref": "#/$defs/Item"}, {"type": "null"}]},
+        "extra": {},
+    },
+}
+
+
+def _result(structured: Any) -> ToolExecutionResult:
+    return ToolExecutionResult(
+        call_id="call-1",
+        tool_name="demo",
+        status=ToolExecutionStatus.SUCCESS,
+        structured_content=structured,
+        content=[{"type": "text", "text": "fallback"}],
+    )
+
+
+def test_default_rendering_is_pretty_json() -> None:
+    result = _result({"a": 1})
+    assert render_tool_result(result) == Payload.to_json({"a": 1}, indent=2)
+
+
+def test_compact_rendering_with_head_tail_truncation() -> None:
+    result = _result({"values": list(range(100))})
+    compact = render_tool_result(result, ToolResultRendering(format=ToolResultFormat.COMPACT))
+    assert compact == Payload.to_json({"values": list(range(100))})
+
+    truncated = render_tool_result(
+        result, ToolResultRendering(format=ToolResultFormat.COMPACT, max_chars=40)
+    )
+    head, marker, tail = truncated.split("\n")
+    assert head == compact[:30]
+    assert tail == compact[-10:]
+    assert marker == f"... [{len(compact) - 40} characters omitted] ..."
+
+
+def test_projection_by_output_schema() -> None:
+    value = {
+        "items": [{"name": "a", "value": 1, "debug": "x"}],
+        "summary": {"name": "total", "value": 1, "trace": [1, 2]},
+        "extra": {"kept": True},
+        "internal": "dropped",
+    }
+    assert project_to_schema(value, OUTPUT_SCHEMA) == {
+        "items": [{"name": "a", "value": 1}],
+        "summary": {"name": "total", "value": 1},
+        "extra": {"kept": True},
+    }
+    rendered = render_tool_result(
+        _result(value), ToolResultRendering(project_output_schema=True), OUTPUT_SCHEMA
+    )
+    assert "internal" not in rendered
+    assert "internal" in render_tool_result(_result(value), None, OUTPUT_SCHEMA)
+
+
+def test_projection_keeps_values_of_boolean_schemas() -> None:
+    schema = {"type": "object", "properties": {"any": True, "none": False, "name": {}}}
+    value = {"any": {"nested": 1}, "none": [1], "name": "a", "other": "dropped"}
+    assert project_to_schema(value, schema) == {"any": {"nested": 1}, "none": [1], "name": "a"}
+
+
+@pytest.mark.parametrize("tail_fraction", [-0.1, 1.5])
+def test_invalid_tail_fraction_is_rejected(tail_fraction: float) -> None:
+    with pytest.raises(ValidationError):
+        ToolResultRendering(max_chars=10, tail_fraction=tail_fraction)
+
+
+def test_truncation_keeps_only_tail_with_full_tail_fraction() -> None:
+    result = _result({"values": list(range(100))})
+    rendering = ToolResultRendering(
+        format=ToolResultFormat.COMPACT, max_chars=40, tail_fraction=1.0
+    )
+    compact = Payload.to_json({"values": list(range(100))})
+    head, marker, tail = render_tool_result(result, rendering).split("\n")
+    assert head == ""
+    assert tail == compact[-40:]
+
+
+def test_rendering_per_tool_overrides_agent_default() -> None:
+    compact = ToolResultRendering(format=ToolResultFormat.COMPACT)
+    settings = AgentSettings(
+        agent_name="agent",
+        system_prompt_template="t.md",
+        tool_results_by_tool={"big-tool": compact},
+    )
+    assert tool_result_rendering(settings, "big-tool") == compact
+    assert tool_result_rendering(settings, "other") == ToolResultRendering()
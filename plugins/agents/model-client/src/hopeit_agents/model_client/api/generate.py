@@ -42,6 +42,7 @@ async def generate(
         default_headers=settings.extra_headers,
         deployment_name=settings.deployment_name,
         api_version=settings.api_version,
+        cassette=settings.cassette,
     )
 
     try:
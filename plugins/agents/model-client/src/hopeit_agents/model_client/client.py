@@ -1,13 +1,18 @@
 """Async client to call OpenAI-compatible chat completion endpoints."""
 
+import asyncio
 from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from time import monotonic
 from typing import Any
 
 import aiohttp
-from aiohttp import ClientError, ClientResponse
+from aiohttp import ClientError
 
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.cassettes import CassetteMissError, CassetteSettings, open_cassette
+from hopeit_agents.mcp_client.tracing import span
 from hopeit_agents.model_client.models import (
     CompletionConfig,
     CompletionRequest,
@@ -36,7 +41,12 @@ class ModelClientError(RuntimeError):
 
 
 class AsyncModelClient:
-    """Minimal OpenAI-compatible async client."""
+    """Minimal OpenAI-compatible async client.
+
+    With `cassette` settings, responses are recorded to a cassette file together with their
+    latency, or replayed from it without calling the provider, keyed by the request body.
+    Tool call ids, generated for each run, are numbered in order of appearance in the key.
+    """
 
     def __init__(
         self,
@@ -47,6 +57,7 @@ class AsyncModelClient:
         api_key: str | None,
         timeout_seconds: float,
         default_headers: Mapping[str, str] | None = None,
+        cassette: CassetteSettings | None = None,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._api_key = api_key
@@ -54,6 +65,7 @@ class AsyncModelClient:
         self._default_headers = dict(default_headers or {})
         self._api_version = api_version
         self._deployment_name = deployment_name
+        self._cassette = None if cassette is None else open_cassette(cassette)
 
     def _build_url(self) -> str:
         """Return the chat completions endpoint URL including optional deployment params."""
@@ -69,24 +81,101 @@ class AsyncModelClient:
         request: CompletionRequest,
         config: CompletionConfig,
     ) -> CompletionResponse:
-        """Execute a completion call and normalize the response."""
-        payload = self._build_payload(request.conversation, config)
-        headers = self._build_headers()
-        url = self._build_url()
-        timeout = aiohttp.ClientTimeout(total=self._timeout_seconds)
-        print()
-        print("URL", url)
-        print()
+        """Execute a completion call and normalize the response.
+
+        The call times out after the configured `timeout_seconds` or when `request.deadline`
+        is reached, whichever comes first.
+
+        Records a `model.complete` span with `model.build_payload`, `model.http` and
+        `model.parse_response` children.
+        """
+        with span("model.complete", model=config.model) as complete_span:
+            with span(
+                "model.build_payload",
+                messages=len(request.conversation.messages),
+                tools=len(config.available_tools or ()),
+            ):
+                payload = self._build_payload(request.conversation, config)
+            headers = self._build_headers()
+            url = self._build_url()
+            timeout = aiohttp.ClientTimeout(total=self._call_timeout(request.deadline))
+            try:
+                status, body = await self._send(url, payload, headers, timeout)
+            except TimeoutError as exc:
+                raise ModelClientError(
+                    status=504, message=f"Timed out after {timeout.total:.1f}s waiting for model"
+                ) from exc
+
+            with span("model.parse_response"):
+                completion = self._parse_response(request.conversation, status, body, config)
+
+            if completion.usage is not None:
+                complete_span.set_attributes(
+                    prompt_tokens=completion.usage.prompt_tokens,
+                    completion_tokens=completion.usage.completion_tokens,
+                    total_tokens=completion.usage.total_tokens,
+                )
+            complete_span.set_attribute("tool_calls", len(completion.tool_calls))
+            return completion
+
+    async def _send(
+        self,
+        url: str,
+        payload: dict[str, Any],
+        headers: Mapping[str, str],
+        timeout: aiohttp.ClientTimeout,
+    ) -> tuple[int, Any]:
+        """Return HTTP status and JSON body of the completion call, using the cassette if set."""
+        cassette = self._cassette
+        if cassette is None:
+            return await self._post(url, payload, headers, timeout)
+        key = cassette.request_key({"url": url, "body": _without_tool_call_ids(payload)})
+        if cassette.replaying:
+            with span("model.replay"):
+                try:
+                    recorded = await asyncio.wait_for(cassette.replay(key), timeout=timeout.total)
+                except CassetteMissError as exc:
+                    raise ModelClientError(status=404, message=str(exc)) from exc
+            return int(recorded["status"]), recorded["body"]
+        started = monotonic()
+        status, body = await self._post(url, payload, headers, timeout)
+        await cassette.record(key, {"status": status, "body": body}, monotonic() - started)
+        return status, body
 
+    async def _post(
+        self,
+        url: str,
+        payload: dict[str, Any],
+        headers: Mapping[str, str],
+        timeout: aiohttp.ClientTimeout,
+    ) -> tuple[int, Any]:
+        """Call the provider endpoint, returning HTTP status and JSON body.
+
+        Request and response bodies are encoded with the process-wide JSON codec.
+        """
+        data = codec.dumpb(payload)
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                print()
-                print("REQUEST", request)
-                print()
-                print("RESPONSE", await response.text())
-                print()
+            with span("model.http", bytes=len(data)) as http_span:
+                response = await session.post(url, data=data, headers=headers)
+                http_span.set_attribute("http.status_code", response.status)
+            async with response:
+                try:
+                    with span("model.read_body") as read_span:
+                        raw = await response.read()
+                        read_span.set_attribute("bytes", len(raw))
+                        body = codec.loads(raw)
+                except (ClientError, ValueError) as exc:  # pragma: no cover - mapped once
+                    raise ModelClientError(status=500, message="Invalid JSON response") from exc
+                return response.status, body
 
-                return await self._parse_response(request.conversation, response, config)
+    def _call_timeout(self, deadline: datetime | None) -> float:
+        """Return the timeout for a call, limited by the remaining time until `deadline`."""
+        if deadline is None:
+            return self._timeout_seconds
+        remaining = (deadline - datetime.now(UTC)).total_seconds()
+        if remaining <= 0.0:
+            raise ModelClientError(status=504, message="Deadline exceeded before calling model")
+        return min(self._timeout_seconds, remaining)
 
     def _build_headers(self) -> Mapping[str, str]:
         """Compose the HTTP headers required by the target provider."""
@@ -133,29 +222,25 @@ class AsyncModelClient:
 
         return body
 
-    async def _parse_response(
+    def _parse_response(
         self,
         conversation: Conversation,
-        response: ClientResponse,
+        status: int,
+        payload: Any,
         config: CompletionConfig,
     ) -> CompletionResponse:
-        """Validate the HTTP response and map it to internal completion objects."""
-        try:
-            payload = await response.json()
-        except ClientError as exc:  # pragma: no cover - network issues mapped once
-            raise ModelClientError(status=500, message="Invalid JSON response") from exc
-
-        if response.status >= 400:
+        """Validate the response status and body and map them to internal completion objects."""
+        if status >= 400:
             message = payload.get("error", {}).get("message") if isinstance(payload, dict) else None
             raise ModelClientError(
-                status=response.status,
+                status=status,
                 message=message or "Model provider returned an error",
                 details=payload if isinstance(payload, Mapping) else None,
             )
 
         if not isinstance(payload, Mapping):
             raise ModelClientError(
-                status=response.status,
+                status=status,
                 message="Unexpected response payload type",
                 details={"payload": payload},
             )
@@ -163,7 +248,7 @@ class AsyncModelClient:
         choices = payload.get("choices")
         if not choices:
             raise ModelClientError(
-                status=response.status,
+                status=status,
                 message="Missing choices in completion response",
                 details=payload,
             )
@@ -182,11 +267,13 @@ class AsyncModelClient:
         tool_calls_raw = message_data.get("tool_calls") or []
         tool_calls: list[ToolCall] = []
         if isinstance(tool_calls_raw, list) and len(tool_calls_raw):
-            tool_calls = [
-                tool_call_from_openai_dict(item, config.available_tools)
-                for item in tool_calls_raw
-                if isinstance(item, dict)
-            ]
+            with span("model.resolve_tool_calls", tool_calls=len(tool_calls_raw)):
+                tool_index = config.tool_index()
+                tool_calls = [
+                    tool_call_from_openai_dict(item, tool_index=tool_index)
+                    for item in tool_calls_raw
+                    if isinstance(item, dict)
+                ]
             for tool_call_msg in messages_from_tool_calls(tool_calls):
                 updated_conversation = updated_conversation.with_message(tool_call_msg)
 
@@ -216,3 +303,26 @@ class AsyncModelClient:
             usage=usage,
             finish_reason=used_choice.get("finish_reason"),
         )
+
+
+def _without_tool_call_ids(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return `payload` with tool call ids replaced by their order of appearance."""
+    ids: dict[str, str] = {}
+
+    def number(call_id: Any) -> str:
+        return ids.setdefault(str(call_id), f"call_{len(ids)}")
+
+    messages = []
+    for message in payload.get("messages", ()):
+        if "tool_calls" in message:
+            message = {
+                **message,
+                "tool_calls": [
+                    {**tool_call, "id": number(tool_call.get("id"))}
+                    for tool_call in message["tool_calls"]
+                ],
+            }
+        if "tool_call_id" in message:
+            message = {**message, "tool_call_id": number(message["tool_call_id"])}
+        messages.append(message)
+    return {**payload, "messages": messages}
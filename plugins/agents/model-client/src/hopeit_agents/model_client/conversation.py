@@ -17,7 +17,12 @@ def build_conversation(
     system_prompt: str | None = None,
     tool_prompt: str | None = None,
 ) -> Conversation:
-    """Return a conversation ensuring optional system and user prompts are present."""
+    """Return a conversation ensuring optional system and user prompts are present.
+
+    The system prompt is kept as the first message of the conversation: when `existing`
+    already starts with a system message it is replaced if its content changed, instead
+    of adding a second one.
+    """
     base_messages = list(existing.messages) if existing else []
 
     system_parts = []
@@ -27,17 +32,20 @@ def build_conversation(
         system_parts.append(tool_prompt)
     if system_parts:
         content = "\n\n".join(part for part in system_parts if part)
-        if not base_messages or base_messages[0].content != content:
-            # Creates or updates system prompt
-            base_messages.append(
-                Message(
-                    role=Role.SYSTEM,
-                    content=content,
-                )
-            )
+        if base_messages and base_messages[0].role == Role.SYSTEM:
+            if base_messages[0].content != content:
+                # Updates system prompt
+                base_messages[0] = Message(role=Role.SYSTEM, content=content)
+        else:
+            # Creates system prompt
+            base_messages.insert(0, Message(role=Role.SYSTEM, content=content))
 
     base_messages.append(Message(role=role, content=message))
+    if existing is None:
+        return Conversation(conversation_id=str(uuid.uuid4()), messages=base_messages)
     return Conversation(
-        conversation_id=existing.conversation_id if existing else str(uuid.uuid4()),
+        conversation_id=existing.conversation_id,
         messages=base_messages,
+        session_id=existing.session_id,
+        created_at=existing.created_at,
     )
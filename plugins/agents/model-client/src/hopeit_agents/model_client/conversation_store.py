@@ -0,0 +1,325 @@
+"""Conversation store keeping multi-turn sessions by conversation id.
+
+Conversations are persisted to an append-only JSON lines file per conversation: the
+first line holds the conversation fields without messages, and each following line a
+message. Recently used conversations are also kept in memory, in a LRU cache bounded by
+the size of their serialized messages.
+
+Callers load the stored conversation, continue it, i.e. using `build_conversation`, and
+save it back indicating how many of its leading messages were loaded from the store, so
+only new messages are appended to disk.
+
+Files are read and written in worker threads, and operations on the same conversation
+run one at a time.
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from hopeit.dataobjects.payload import Payload
+
+from hopeit_agents.model_client.models import Conversation, Message, Role
+from hopeit_agents.model_client.settings import ConversationStoreSettings
+
+__all__ = ["ConversationStore", "conversation_store"]
+
+_CONVERSATION_ID_PATTERN = re.compile(r"^[\w\-]{1,128}$")
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+class ConversationStore:
+    """Conversations by id, with a bytes-bounded in-memory LRU over a disk tier."""
+
+    def __init__(self, path: str | Path, *, max_memory_bytes: int) -> None:
+        self.path = Path(path)
+        self.max_memory_bytes = max_memory_bytes
+        self._cache: OrderedDict[str, tuple[Conversation, int]] = OrderedDict()
+        self._memory_bytes = 0
+        self._cache_lock = threading.Lock()
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Serialized size of the messages of conversations kept in memory."""
+        return self._memory_bytes
+
+    async def load(
+        self, conversation_id: str, *, max_messages: int | None = None
+    ) -> Conversation | None:
+        """Return the stored conversation, or None if it does not exist.
+
+        With `max_messages`, only the last `max_messages` messages are returned, plus the
+        leading system prompt message, reading just the end of the file when the
+        conversation is not in memory. Tool results at the start of the returned messages,
+        whose assistant tool calls message is not returned, are left out.
+        """
+        async with self._lock(conversation_id):
+            return await asyncio.to_thread(self._load, conversation_id, max_messages)
+
+    async def save(self, conversation: Conversation, *, stored_count: int = 0) -> None:
+        """Store the conversation, appending messages after the first `stored_count`.
+
+        `stored_count` is the number of leading messages of `conversation` that were
+        returned by `load`. With 0, the stored conversation, if any, is replaced. When the
+        system prompt message differs from the stored one, the stored history is
+        rewritten replacing it.
+        """
+        async with self._lock(conversation.conversation_id):
+            await asyncio.to_thread(self._save, conversation, stored_count)
+
+    async def delete(self, conversation_id: str) -> None:
+        """Remove the conversation from memory and disk."""
+        async with self._lock(conversation_id):
+            await asyncio.to_thread(self._delete, conversation_id)
+
+    def _lock(self, conversation_id: str) -> asyncio.Lock:
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[conversation_id] = lock
+        return lock
+
+    def _load(self, conversation_id: str, max_messages: int | None) -> Conversation | None:
+        cached = self._cache_get(conversation_id)
+        if cached is not None:
+            return _tail(cached[0], max_messages)
+        file = self._conversation_file(conversation_id)
+        if not file.exists():
+            return None
+        if max_messages is not None:
+            return self._read_tail(file, max_messages)
+        conversation, size = self._read(file)
+        self._cache_put(conversation, size)
+        return conversation
+
+    def _save(self, conversation: Conversation, stored_count: int) -> None:
+        conversation_id = conversation.conversation_id
+        file = self._conversation_file(conversation_id)
+        if stored_count == 0 or not file.exists():
+            self._rewrite(file, conversation, conversation.messages)
+            return
+
+        cached = self._cache_get(conversation_id)
+        stored_system = (
+            _system_message(cached[0].messages)
+            if cached is not None
+            else self._read_system_message(file)
+        )
+        system = _system_message(conversation.messages)
+        if system is not None and system != stored_system:
+            # A system prompt added in front of a history without one shifts loaded messages
+            new_messages = conversation.messages[stored_count + (stored_system is None) :]
+            stored = cached[0] if cached is not None else self._read(file)[0]
+            history = stored.messages[1:] if stored_system is not None else stored.messages
+            self._rewrite(file, stored, [system, *history, *new_messages])
+            return
+
+        new_messages = conversation.messages[stored_count:]
+        lines = [_message_line(message) for message in new_messages]
+        _append(file, lines)
+        if cached is not None:
+            stored, size = cached
+            self._cache_pop(conversation_id)
+            self._cache_put(
+                Conversation(
+                    conversation_id=conversation_id,
+                    messages=[*stored.messages, *new_messages],
+                    session_id=stored.session_id,
+                    created_at=stored.created_at,
+                ),
+                size + sum(len(line) for line in lines),
+            )
+
+    def _delete(self, conversation_id: str) -> None:
+        self._cache_pop(conversation_id)
+        self._conversation_file(conversation_id).unlink(missing_ok=True)
+
+    def _rewrite(self, file: Path, header: Conversation, messages: list[Message]) -> None:
+        lines = [_message_line(message) for message in messages]
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, prefix=".conversation.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_header_line(header))
+                f.writelines(lines)
+            os.replace(tmp_name, file)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._cache_pop(header.conversation_id)
+        self._cache_put(
+            Conversation(
+                conversation_id=header.conversation_id,
+                messages=messages,
+                session_id=header.session_id,
+                created_at=header.created_at,
+            ),
+            sum(len(line) for line in lines),
+        )
+
+    def _cache_get(self, conversation_id: str) -> tuple[Conversation, int] | None:
+        with self._cache_lock:
+            cached = self._cache.get(conversation_id)
+            if cached is not None:
+                self._cache.move_to_end(conversation_id)
+            return cached
+
+    def _cache_pop(self, conversation_id: str) -> None:
+        with self._cache_lock:
+            cached = self._cache.pop(conversation_id, None)
+            if cached is not None:
+                self._memory_bytes -= cached[1]
+
+    def _cache_put(self, conversation: Conversation, size: int) -> None:
+        if size > self.max_memory_bytes:
+            return
+        with self._cache_lock:
+            self._cache[conversation.conversation_id] = (conversation, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _read(self, file: Path) -> tuple[Conversation, int]:
+        """Read the full conversation, returning it with the size of its messages."""
+        with open(file, "rb") as f:
+            header = Payload.from_json(f.readline(), datatype=Conversation)
+            lines = list(_complete_lines(f.read()))
+        return _with_messages(header, _parse_messages(lines)), sum(len(line) for line in lines)
+
+    def _read_system_message(self, file: Path) -> Message | None:
+        with open(file, "rb") as f:
+            f.readline()
+            lines = list(_complete_lines(f.readline()))
+        return _system_message(_parse_messages(lines))
+
+    def _read_tail(self, file: Path, max_messages: int) -> Conversation:
+        """Read the first message and the last `max_messages` from the end of the file."""
+        with open(file, "rb") as f:
+            header = Payload.from_json(f.readline(), datatype=Conversation)
+            first_lines = list(_complete_lines(f.readline()))
+            body_start = f.tell()
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            while pos > body_start and data.count(b"\n") <= max_messages:
+                step = min(_READ_BLOCK_SIZE, pos - body_start)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        rest = list(_complete_lines(data))
+        if pos > body_start:
+            # First line read may be partial
+            rest = rest[1:]
+        if pos <= body_start and len(rest) < max_messages:
+            return _with_messages(header, _parse_messages([*first_lines, *rest]))
+        messages = _without_leading_tool_results(
+            _parse_messages(rest[len(rest) - max_messages :] if max_messages else [])
+        )
+        system = _system_message(_parse_messages(first_lines))
+        return _with_messages(header, [system, *messages] if system else messages)
+
+    def _conversation_file(self, conversation_id: str) -> Path:
+        if not _CONVERSATION_ID_PATTERN.match(conversation_id):
+            raise ValueError(f"Invalid conversation_id: {conversation_id!r}")
+        return self.path / f"{conversation_id}.jsonl"
+
+
+_stores: dict[tuple[str, int], ConversationStore] = {}
+
+
+def conversation_store(settings: ConversationStoreSettings) -> ConversationStore:
+    """Return the process-wide conversation store for `settings`.
+
+    Stores are shared by events using the same settings, so the in-memory tier
+    is kept between requests.
+    """
+    key = (settings.path, settings.max_memory_bytes)
+    store = _stores.get(key)
+    if store is None:
+        store = ConversationStore(settings.path, max_memory_bytes=settings.max_memory_bytes)
+        _stores[key] = store
+    return store
+
+
+def _tail(conversation: Conversation, max_messages: int | None) -> Conversation:
+    messages = conversation.messages
+    if max_messages is None or len(messages) <= max_messages:
+        return conversation
+    tail = _without_leading_tool_results(
+        messages[len(messages) - max_messages :] if max_messages else []
+    )
+    system = _system_message(messages)
+    return _with_messages(conversation, [system, *tail] if system else tail)
+
+
+def _without_leading_tool_results(messages: list[Message]) -> list[Message]:
+    """Drop tool results at the start of `messages`, separated from their tool calls."""
+    start = 0
+    while start < len(messages) and messages[start].role == Role.TOOL:
+        start += 1
+    return messages[start:]
+
+
+def _with_messages(conversation: Conversation, messages: list[Message]) -> Conversation:
+    return Conversation(
+        conversation_id=conversation.conversation_id,
+        messages=messages,
+        session_id=conversation.session_id,
+        created_at=conversation.created_at,
+    )
+
+
+def _system_message(messages: list[Message]) -> Message | None:
+    if messages and messages[0].role == Role.SYSTEM:
+        return messages[0]
+    return None
+
+
+def _header_line(conversation: Conversation) -> bytes:
+    return Payload.to_json(_with_messages(conversation, [])).encode() + b"\n"
+
+
+def _message_line(message: Message) -> bytes:
+    return Payload.to_json(message).encode() + b"\n"
+
+
+def _parse_messages(lines: Iterable[bytes]) -> list[Message]:
+    return [Payload.from_json(line, datatype=Message) for line in lines]
+
+
+def _complete_lines(data: bytes) -> Iterable[bytes]:
+    """Yield newline terminated lines, skipping a partially written last line."""
+    start = 0
+    end = data.find(b"\n")
+    while end >= 0:
+        yield data[start : end + 1]
+        start = end + 1
+        end = data.find(b"\n", start)
+
+
+def _append(file: Path, lines: list[bytes]) -> None:
+    """Append lines, first dropping a partial last line left by an interrupted write."""
+    with open(file, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                pos = end
+                while pos > 0:
+                    step = min(_READ_BLOCK_SIZE, pos)
+                    pos -= step
+                    f.seek(pos)
+                    newline = f.read(step).rfind(b"\n")
+                    if newline >= 0:
+                        pos += newline + 1
+                        break
+                f.truncate(pos)
+                f.seek(pos)
+        f.writelines(lines)
@@ -1,16 +1,32 @@
 """Typed data objects used by the model client plugin."""
 
-import json
+import dataclasses
 import uuid
+from dataclasses import replace
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Any
+from typing import Annotated, Any
 
 from hopeit.dataobjects import dataclass, dataobject, field
 from hopeit.dataobjects.payload import Payload
-from hopeit.server.names import spinalcase
 
+from hopeit_agents.mcp_client import codec
 from hopeit_agents.mcp_client.models import ToolDescriptor
+from hopeit_agents.model_client.tool_index import ToolIndex
+
+
+class _EmptyMetadata(dict[str, Any]):
+    """Read-only empty dict shared as `metadata` by messages without metadata."""
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("Message metadata is read-only, use `dataclasses.replace`")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+EMPTY_METADATA: dict[str, Any] = _EmptyMetadata()
+"""Metadata shared by all messages without metadata."""
 
 
 class Role(str, Enum):
@@ -32,16 +48,33 @@ class ToolSpec:
 
 
 @dataobject
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolFunctionCall:
-    """Function payload included in a tool call."""
+    """Function payload included in a tool call.
+
+    `arguments` is the JSON string sent to and received from models. Calls created by
+    the model client also keep the arguments object in `parsed_arguments`, which is not
+    serialized, so the agent loop can invoke tools without decoding `arguments` again.
+    """
 
     name: str
     arguments: str
+    parsed_arguments: Annotated[dict[str, Any] | None, field(exclude=True)] = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
+
+    def arguments_dict(self) -> dict[str, Any]:
+        """Return the arguments object, decoding `arguments` only when not kept parsed.
+
+        Raises `ValueError` when `arguments` is not valid JSON.
+        """
+        if self.parsed_arguments is None:
+            object.__setattr__(self, "parsed_arguments", codec.loads(self.arguments))
+        return self.parsed_arguments  # type: ignore[return-value]
 
 
 @dataobject
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolCall:
     """Represents a tool call issued by the assistant."""
 
@@ -62,16 +95,24 @@ class ToolResult:
 
 
 @dataobject
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Message:
-    """Single message within a conversation."""
+    """Single message within a conversation.
+
+    Messages are immutable, use `dataclasses.replace` to get a modified copy. To keep
+    many conversations in memory, messages without metadata share `EMPTY_METADATA`.
+    """
 
     role: Role
     content: str | None
     tool_call_id: str | None = None
     name: str | None = None
     tool_calls: list[ToolCall] | None = None
-    metadata: dict[str, Any] = field(default_factory=dict)
+    metadata: dict[str, Any] = field(default_factory=lambda: EMPTY_METADATA)
+
+    def __post_init__(self) -> None:
+        if not self.metadata and self.metadata is not EMPTY_METADATA:
+            object.__setattr__(self, "metadata", EMPTY_METADATA)
 
     @classmethod
     def empty(cls) -> "Message":
@@ -80,7 +121,7 @@ class Message:
 
 
 @dataobject
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     """Ordered list of messages forming the conversation context."""
 
@@ -130,14 +171,41 @@ class CompletionConfig:
     enable_tool_expansion: bool | None = None
     available_tools: list[ToolDescriptor] | None = None
 
+    def tool_index(self) -> ToolIndex:
+        """Return the index for `available_tools`, building it once per tool inventory."""
+        index: ToolIndex | None = self.__dict__.get("_tool_index")
+        if index is None or not index.matches(self.available_tools):
+            index = ToolIndex(self.available_tools or [])
+            self.__dict__["_tool_index"] = index
+        return index
+
+    def share_tool_index(self, other: "CompletionConfig") -> None:
+        """Reuse the tool index already built by `other` when both share the tool inventory."""
+        index: ToolIndex | None = other.__dict__.get("_tool_index")
+        if index is not None and index.matches(self.available_tools):
+            self.__dict__["_tool_index"] = index
+
+    def with_model(self, model: str | None) -> "CompletionConfig":
+        """Return a copy of this config using `model`, sharing the tool index."""
+        if model == self.model:
+            return self
+        config = replace(self, model=model)
+        self.tool_index()
+        config.share_tool_index(self)
+        return config
+
 
 @dataobject
 @dataclass
 class CompletionRequest:
-    """Input payload for the generate event."""
+    """Input payload for the generate event.
+
+    When `deadline` is set, the model call timeout is limited to the remaining time.
+    """
 
     conversation: Conversation
     config: CompletionConfig | None = None
+    deadline: datetime | None = None
 
 
 @dataobject
@@ -156,8 +224,32 @@ class CompletionResponse:
 
 
 def message_to_openai_dict(message: Message) -> dict[str, Any]:
-    """Convert a Message into the OpenAI-compatible dict structure."""
-    return Payload.to_obj(message, exclude_none=True)  # type: ignore[return-value]
+    """Convert a Message into the OpenAI-compatible dict structure.
+
+    Equivalent to `Payload.to_obj(message, exclude_none=True)`, built directly since it
+    runs for every message on each model call.
+    """
+    data: dict[str, Any] = {"role": message.role.value}
+    if message.content is not None:
+        data["content"] = message.content
+    if message.tool_call_id is not None:
+        data["tool_call_id"] = message.tool_call_id
+    if message.name is not None:
+        data["name"] = message.name
+    if message.tool_calls is not None:
+        data["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": tool_call.type,
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments,
+                },
+            }
+            for tool_call in message.tool_calls
+        ]
+    data["metadata"] = Payload.to_obj(message.metadata) if message.metadata else {}
+    return data
 
 
 def messages_from_tool_calls(tool_calls: list[ToolCall]) -> list[Message]:
@@ -173,72 +265,46 @@ def messages_from_tool_calls(tool_calls: list[ToolCall]) -> list[Message]:
 
 
 def tool_call_from_openai_dict(
-    tool: dict[str, Any], available_tools: list[ToolDescriptor] | None = None
+    tool: dict[str, Any],
+    available_tools: list[ToolDescriptor] | None = None,
+    *,
+    tool_index: ToolIndex | None = None,
 ) -> ToolCall:
-    """Create a ToolCall from a dict returned by OpenAI-compatible APIs."""
+    """Create a ToolCall from a dict returned by OpenAI-compatible APIs.
+
+    Tool name and arguments are resolved using `tool_index` when provided, otherwise an
+    index is built for `available_tools`.
+    """
     arguments_data = tool.get("function", {}).get("arguments")
     parsed_args: dict[str, Any]
     if isinstance(arguments_data, str):
         try:
-            parsed_args = json.loads(arguments_data)
-        except json.JSONDecodeError:
+            parsed_args = codec.loads(arguments_data)
+        except ValueError:
             parsed_args = {"raw": arguments_data}
     elif isinstance(arguments_data, dict):
         parsed_args = arguments_data
     else:
         parsed_args = {"raw": arguments_data}
 
-    tool_name = _resolve_tool_name(
-        str(tool.get("function", {}).get("name", "")), parsed_args, available_tools or []
+    if tool_index is None:
+        tool_index = ToolIndex(available_tools or [])
+    tool_name = tool_index.resolve_tool_name(
+        str(tool.get("function", {}).get("name", "")), parsed_args
     )
-    tool_name, arguments = _resolve_arguments(tool_name, parsed_args, available_tools or [])
+    tool_name, arguments = tool_index.resolve_arguments(tool_name, parsed_args)
 
     return ToolCall(
         id=f"call_{uuid.uuid4().hex[-10:]}",
         type="function",
         function=ToolFunctionCall(
             name=tool_name,
-            arguments=Payload.to_json(arguments),
+            arguments=codec.dumps(arguments),
+            parsed_arguments=arguments,
         ),
     )
 
 
-def _resolve_tool_name(
-    extracted_name: str, parsed_args: dict[str, Any], available_tools: list[ToolDescriptor]
-) -> str:
-    """Resolve the best matching tool name using extracted data and known descriptors."""
-    tool_names = {t.name for t in available_tools}
-    # Resolve tool name
-    if spinalcase(extracted_name) not in tool_names:
-        for t in available_tools:
-            if t.name in spinalcase(extracted_name):
-                return t.name
-            for k, v in parsed_args.items():
-                if t.name in spinalcase(str(k)) or t.name in spinalcase(str(v)):
-                    return t.name
-    return spinalcase(extracted_name)
-
-
-def _resolve_arguments(
-    tool_name: str, parsed_args: dict[str, Any], available_tools: list[ToolDescriptor]
-) -> tuple[str, dict[str, Any]]:
-    """Normalize arguments to match the resolved tool schema when possible."""
-    for t in available_tools:
-        if tool_name == t.name:
-            if parsed_args.keys() == t.input_schema["properties"].keys():
-                return t.name, parsed_args
-            for _k, v in parsed_args.items():
-                if isinstance(v, dict) and v.keys() == t.input_schema["properties"].keys():
-                    return t.name, v
-    for t in available_tools:
-        if parsed_args.keys() == t.input_schema["properties"].keys():
-            return t.name, parsed_args
-        for _k, v in parsed_args.items():
-            if isinstance(v, dict) and v.keys() == t.input_schema["properties"].keys():
-                return t.name, v
-    return tool_name, parsed_args
-
-
 def message_from_openai_dict(data: dict[str, Any]) -> Message:
     """Convert an OpenAI-compatible message dict into a Message object."""
     role = Role(data.get("role", Role.ASSISTANT.value))
@@ -6,6 +6,7 @@ from typing import Any
 
 from hopeit.dataobjects import dataclass, dataobject, field
 
+from hopeit_agents.mcp_client.cassettes import CassetteSettings
 from hopeit_agents.model_client.models import CompletionConfig
 
 SETTINGS_KEY = "model_client"
@@ -14,7 +15,10 @@ SETTINGS_KEY = "model_client"
 @dataobject
 @dataclass
 class ModelClientSettings:
-    """Configuration loaded from hopeit.app context settings."""
+    """Configuration loaded from hopeit.app context settings.
+
+    When `cassette` is set, completions are recorded to or replayed from a cassette file.
+    """
 
     api_base: str
     default_model: str
@@ -26,6 +30,7 @@ class ModelClientSettings:
     default_config: CompletionConfig = field(
         default_factory=lambda: CompletionConfig(enable_tool_expansion=True)
     )
+    cassette: CassetteSettings | None = None
 
     def resolve_api_key(self, env: Mapping[str, Any]) -> str | None:
         """Return the API key found in context env using api_key_env."""
@@ -71,4 +76,23 @@ def merge_config(
         )
     if target.enable_tool_expansion is None:
         target.enable_tool_expansion = True
+    for source in (override, base):
+        if source is not None:
+            target.share_tool_index(source)
     return target
+
+
+@dataobject
+@dataclass
+class ConversationStoreSettings:
+    """Configuration of the conversation store.
+
+    `path` is the directory holding conversation files, and `max_memory_bytes` the size
+    of the serialized messages kept in memory. `max_loaded_messages` limits how many of
+    the most recent messages, in addition to the system prompt, are loaded to continue a
+    conversation; all messages are loaded when not set.
+    """
+
+    path: str
+    max_memory_bytes: int = 32 * 1024 * 1024
+    max_loaded_messages: int | None = None
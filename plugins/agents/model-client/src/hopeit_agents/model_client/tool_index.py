@@ -0,0 +1,154 @@
+"""Precomputed lookup structures to resolve tool calls against a tool inventory."""
+
+from collections.abc import Iterable
+from typing import Any
+
+from hopeit.server.names import spinalcase
+
+from hopeit_agents.mcp_client.models import ToolDescriptor
+
+__all__ = ["ToolIndex"]
+
+
+class ToolIndex:
+    """Index over a tool inventory used to resolve tool names and arguments.
+
+    Built once per list of `ToolDescriptor`, it keeps:
+    - a map from tool name to its positions in the inventory,
+    - the frozenset of input schema property names for each tool, and a map from
+      each property signature to the first tool exposing it,
+    - tool names bucketed by length, used to find which tool names are contained in
+      a given string without scanning the full inventory.
+
+    Resolution follows inventory order, so results match a linear scan over the tools.
+    """
+
+    __slots__ = (
+        "_tools",
+        "_size",
+        "_positions",
+        "_signatures",
+        "_signature_positions",
+        "_names_by_length",
+    )
+
+    def __init__(self, tools: list[ToolDescriptor]) -> None:
+        self._tools = tools
+        self._size = len(tools)
+        self._positions: dict[str, list[int]] = {}
+        self._signatures: list[frozenset[str]] = []
+        self._signature_positions: dict[frozenset[str], int] = {}
+        self._names_by_length: dict[int, dict[str, int]] = {}
+        for pos, tool in enumerate(tools):
+            signature = frozenset(tool.input_schema.get("properties", {}).keys())
+            self._signatures.append(signature)
+            self._signature_positions.setdefault(signature, pos)
+            self._positions.setdefault(tool.name, []).append(pos)
+            self._names_by_length.setdefault(len(tool.name), {}).setdefault(tool.name, pos)
+
+    def matches(self, tools: list[ToolDescriptor] | None) -> bool:
+        """Return True if this index was built for the given tool inventory.
+
+        Inventories match when they hold the same descriptor instances, so copies of the
+        tools list made during dataobject validation reuse the index.
+        """
+        tools = tools or []
+        if len(tools) != self._size:
+            return False
+        return tools is self._tools or all(a is b for a, b in zip(tools, self._tools, strict=True))
+
+    @property
+    def tools(self) -> list[ToolDescriptor]:
+        """Indexed tool inventory."""
+        return self._tools
+
+    def __contains__(self, tool_name: object) -> bool:
+        return tool_name in self._positions
+
+    def get(self, tool_name: str) -> ToolDescriptor | None:
+        """Return the first tool in the inventory named `tool_name`, if any."""
+        positions = self._positions.get(tool_name)
+        return self._tools[positions[0]] if positions else None
+
+    def resolve_tool_name(self, extracted_name: str, parsed_args: dict[str, Any]) -> str:
+        """Resolve the best matching tool name using extracted data and known descriptors.
+
+        If the normalized name is not a known tool, returns the first tool in the inventory
+        whose name is contained in the normalized extracted name, argument names or
+        argument values.
+        """
+        normalized = spinalcase(extracted_name)
+        if normalized in self._positions:
+            return normalized
+        candidates = [normalized]
+        for k, v in parsed_args.items():
+            candidates.append(spinalcase(str(k)))
+            candidates.append(spinalcase(str(v)))
+        pos = self._first_contained(candidates)
+        if pos is not None:
+            return self._tools[pos].name
+        return normalized
+
+    def resolve_arguments(
+        self, tool_name: str, parsed_args: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        """Normalize arguments to match the resolved tool schema when possible.
+
+        Arguments match a tool when their keys are the tool input schema properties. Nested
+        dict values are also considered, to unwrap arguments the model placed under an
+        extra key. The resolved tool takes precedence, then the first tool in the inventory
+        with a matching signature.
+        """
+        candidates: list[tuple[frozenset[str], dict[str, Any]]] = [
+            (frozenset(parsed_args.keys()), parsed_args)
+        ]
+        candidates.extend(
+            (frozenset(v.keys()), v) for v in parsed_args.values() if isinstance(v, dict)
+        )
+
+        for pos in self._positions.get(tool_name, ()):
+            signature = self._signatures[pos]
+            for candidate_signature, args in candidates:
+                if candidate_signature == signature:
+                    return self._tools[pos].name, args
+
+        best: tuple[int, dict[str, Any]] | None = None
+        for candidate_signature, args in candidates:
+            match = self._signature_positions.get(candidate_signature)
+            if match is not None and (best is None or match < best[0]):
+                best = (match, args)
+        if best is not None:
+            return self._tools[best[0]].name, best[1]
+        return tool_name, parsed_args
+
+    def _first_contained(self, values: Iterable[str]) -> int | None:
+        """Return the lowest inventory position of a tool name contained in any of values."""
+        best: int | None = None
+        for value in values:
+            if len(value) * len(self._names_by_length) > self._size:
+                # Long values: a substring check per tool is cheaper than sliding windows
+                pos = self._scan_contained(value, best)
+            else:
+                pos = self._window_contained(value, best)
+            if pos is not None:
+                best = pos
+                if best == 0:
+                    break
+        return best
+
+    def _window_contained(self, value: str, bound: int | None) -> int | None:
+        best = bound
+        found: int | None = None
+        for length, names in self._names_by_length.items():
+            for start in range(len(value) - length + 1):
+                pos = names.get(value[start : start + length])
+                if pos is not None and (best is None or pos < best):
+                    best = found = pos
+        return found
+
+    def _scan_contained(self, value: str, bound: int | None) -> int | None:
+        stop = self._size if bound is None else bound
+        for pos in range(stop):
+            if self._tools[pos].name in value:
+                return pos
+        return None
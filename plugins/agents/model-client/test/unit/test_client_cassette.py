@@ -0,0 +1,137 @@
+"""Unit tests for model client cassette record and replay."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from hopeit_agents.mcp_client.cassettes import CassetteMissError, CassetteMode, CassetteSettings
+from hopeit_agents.model_client.client import AsyncModelClient, ModelClientError
+from hopeit_agents.model_client.models import (
+    CompletionConfig,
+    CompletionRequest,
+    Conversation,
+    Message,
+    Role,
+)
+
+COMPLETION = {
+    "id": "resp-1",
+    "model": "test-model",
+    "created": 1700000000,
+    "choices": [{"message": {"role": "assistant", "content": "Hi there"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+}
+
+
+def _client(path: Path, mode: CassetteMode) -> AsyncModelClient:
+    return AsyncModelClient(
+        base_url="http://model",
+        api_version=None,
+        deployment_name=None,
+        api_key=None,
+        timeout_seconds=5.0,
+        cassette=CassetteSettings(path=str(path), mode=mode, speed=0.0),
+    )
+
+
+def _request(content: str) -> CompletionRequest:
+    return CompletionRequest(
+        conversation=Conversation(
+            conversation_id="conv-1", messages=[Message(role=Role.USER, content=content)]
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_model_client_records_and_replays(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    path = tmp_path / "model.jsonl"
+    config = CompletionConfig(model="test-model")
+    posted: list[dict[str, Any]] = []
+
+    async def post(self: AsyncModelClient, url: str, payload: dict[str, Any], *_: Any) -> Any:
+        posted.append(payload)
+        if payload["messages"][0]["content"] == "fail":
+            return 429, {"error": {"message": "Rate limited"}}
+        return 200, COMPLETION
+
+    monkeypatch.setattr(AsyncModelClient, "_post", post)
+    recorder = _client(path, CassetteMode.RECORD)
+    recorded = await recorder.complete(_request("hello"), config)
+    with pytest.raises(ModelClientError):
+        await recorder.complete(_request("fail"), config)
+    assert len(posted) == 2
+
+    player = _client(path, CassetteMode.REPLAY)
+    replayed = await player.complete(_request("hello"), config)
+    with pytest.raises(ModelClientError) as error:
+        await player.complete(_request("fail"), config)
+
+    assert len(posted) == 2
+    assert replayed.message == recorded.message
+    assert replayed.usage == recorded.usage
+    assert replayed.conversation.messages == recorded.conversation.messages
+    assert error.value.status == 429
+    with pytest.raises(ModelClientError) as miss:
+        await player.complete(_request("other"), config)
+    assert isinstance(miss.value.__cause__, CassetteMissError)
+
+
+TOOL_CALL_COMPLETION = {
+    "id": "resp-tool",
+    "model": "test-model",
+    "choices": [
+        {
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "provider-call",
+                        "type": "function",
+                        "function": {"name": "sum", "arguments": '{"a": 1, "b": 2}'},
+                    }
+                ],
+            },
+            "finish_reason": "tool_calls",
+        }
+    ],
+}
+
+
+async def _tool_run(client: AsyncModelClient, config: CompletionConfig) -> list[Message]:
+    first = await client.complete(_request("add 1 and 2"), config)
+    conversation = first.conversation.with_message(
+        Message(role=Role.TOOL, content="3", tool_call_id=first.tool_calls[0].id)
+    )
+    second = await client.complete(CompletionRequest(conversation=conversation), config)
+    return second.conversation.messages
+
+
+@pytest.mark.asyncio
+async def test_model_client_replays_tool_calls(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Tool call ids generated on each run do not change request keys."""
+    path = tmp_path / "model.jsonl"
+    config = CompletionConfig(model="test-model")
+
+    async def post(self: AsyncModelClient, url: str, payload: dict[str, Any], *_: Any) -> Any:
+        return 200, COMPLETION if payload["messages"][-1][
+            "role"
+        ] == "tool" else TOOL_CALL_COMPLETION
+
+    monkeypatch.setattr(AsyncModelClient, "_post", post)
+    recorded = await _tool_run(_client(path, CassetteMode.RECORD), config)
+
+    async def no_post(*_: Any) -> Any:
+        raise AssertionError("Replay must not call the provider")
+
+    monkeypatch.setattr(AsyncModelClient, "_post", no_post)
+    replayed = await _tool_run(_client(path, CassetteMode.REPLAY), config)
+
+    assert [m.role for m in replayed] == [m.role for m in recorded]
+    assert replayed[-1].content == recorded[-1].content == "Hi there"
+    assert replayed[1].tool_calls != recorded[1].tool_calls  # Ids differ between runs
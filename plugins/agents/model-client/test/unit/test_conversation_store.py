@@ -0,0 +1,155 @@
+"""Unit tests for the conversation store and conversation building."""
+
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.model_client.conversation import build_conversation
+from hopeit_agents.model_client.conversation_store import ConversationStore, conversation_store
+from hopeit_agents.model_client.models import (
+    Conversation,
+    Message,
+    Role,
+    ToolCall,
+    ToolFunctionCall,
+)
+from hopeit_agents.model_client.settings import ConversationStoreSettings
+
+
+def _turn(conversation: Conversation, n: int) -> Conversation:
+    return conversation.with_message(Message(role=Role.ASSISTANT, content=f"answer {n}"))
+
+
+def test_build_conversation_keeps_single_system_prompt() -> None:
+    conversation = build_conversation(None, message="hi", system_prompt="You are helpful")
+    conversation.session_id = "session-1"
+
+    same = build_conversation(conversation, message="again", system_prompt="You are helpful")
+    assert [m.role for m in same.messages] == [Role.SYSTEM, Role.USER, Role.USER]
+    assert same.session_id == "session-1"
+    assert same.conversation_id == conversation.conversation_id
+
+    updated = build_conversation(same, message="more", system_prompt="Be brief")
+    assert [m.role for m in updated.messages] == [Role.SYSTEM, Role.USER, Role.USER, Role.USER]
+    assert updated.messages[0].content == "Be brief"
+
+
+@pytest.mark.asyncio
+async def test_store_appends_only_new_messages(tmp_path: Path) -> None:
+    store = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    conversation = _turn(build_conversation(None, message="q1", system_prompt="sys"), 1)
+    await store.save(conversation)
+    file = tmp_path / f"{conversation.conversation_id}.jsonl"
+    original = file.read_bytes()
+
+    loaded = await store.load(conversation.conversation_id)
+    assert loaded == conversation
+    continued = _turn(build_conversation(loaded, message="q2", system_prompt="sys"), 2)
+    await store.save(continued, stored_count=len(loaded.messages))
+
+    assert file.read_bytes().startswith(original)
+    assert len(file.read_bytes().splitlines()) == 1 + len(continued.messages)
+
+    # Reading from disk returns the same history
+    fresh = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    assert await fresh.load(conversation.conversation_id) == continued
+    assert await store.load(conversation.conversation_id) == continued
+
+
+@pytest.mark.asyncio
+async def test_store_loads_tail_with_system_prompt(tmp_path: Path) -> None:
+    store = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    conversation = build_conversation(None, message="q0", system_prompt="sys")
+    for n in range(1, 20):
+        conversation = build_conversation(_turn(conversation, n), message=f"q{n}")
+    await store.save(conversation)
+
+    fresh = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    tail = await fresh.load(conversation.conversation_id, max_messages=3)
+    assert tail is not None
+    assert tail.messages == [conversation.messages[0], *conversation.messages[-3:]]
+    assert tail == await store.load(conversation.conversation_id, max_messages=3)
+    assert await fresh.load(conversation.conversation_id, max_messages=100) == conversation
+
+    # Continuing from the tail appends after the full stored history
+    continued = _turn(build_conversation(tail, message="last", system_prompt="new sys"), 99)
+    await fresh.save(continued, stored_count=len(tail.messages))
+    stored = await ConversationStore(tmp_path, max_memory_bytes=1_000_000).load(
+        conversation.conversation_id
+    )
+    assert stored is not None
+    assert stored.messages[0].content == "new sys"
+    assert stored.messages[1:] == [*conversation.messages[1:], *continued.messages[-2:]]
+
+
+@pytest.mark.asyncio
+async def test_store_tail_keeps_tool_calls_with_their_results(tmp_path: Path) -> None:
+    conversation = build_conversation(None, message="q0", system_prompt="sys")
+    tool_calls = [
+        ToolCall(
+            id=f"call_{n}", type="function", function=ToolFunctionCall(name="sum", arguments="{}")
+        )
+        for n in range(3)
+    ]
+    conversation = conversation.with_message(
+        Message(role=Role.ASSISTANT, content="", tool_calls=tool_calls)
+    )
+    for tool_call in tool_calls:
+        conversation = conversation.with_message(
+            Message(role=Role.TOOL, content="3", tool_call_id=tool_call.id)
+        )
+    conversation = _turn(conversation, 1)
+    store = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    await store.save(conversation)
+
+    # The last 3 messages start with tool results of a tool calls message left out
+    for loader in (store, ConversationStore(tmp_path, max_memory_bytes=1_000_000)):
+        tail = await loader.load(conversation.conversation_id, max_messages=3)
+        assert tail is not None
+        assert tail.messages == [conversation.messages[0], conversation.messages[-1]]
+        tail = await loader.load(conversation.conversation_id, max_messages=5)
+        assert tail is not None
+        assert tail.messages == [conversation.messages[0], *conversation.messages[-5:]]
+
+
+@pytest.mark.asyncio
+async def test_store_memory_is_bounded(tmp_path: Path) -> None:
+    store = ConversationStore(tmp_path, max_memory_bytes=2_000)
+    ids = []
+    for n in range(10):
+        conversation = build_conversation(None, message="x" * 300 + str(n))
+        await store.save(conversation)
+        ids.append(conversation.conversation_id)
+        assert store.memory_bytes <= 2_000
+
+    # Evicted conversations are loaded from disk
+    first = await store.load(ids[0])
+    assert first is not None
+    assert first.messages[-1].content == "x" * 300 + "0"
+
+
+@pytest.mark.asyncio
+async def test_store_ignores_partial_last_line(tmp_path: Path) -> None:
+    store = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    conversation = build_conversation(None, message="q1")
+    await store.save(conversation)
+    file = tmp_path / f"{conversation.conversation_id}.jsonl"
+    with open(file, "ab") as f:
+        f.write(b'{"role": "assis')
+
+    fresh = ConversationStore(tmp_path, max_memory_bytes=1_000_000)
+    loaded = await fresh.load(conversation.conversation_id)
+    assert loaded == conversation
+    continued = _turn(loaded, 1)
+    await fresh.save(continued, stored_count=len(loaded.messages))
+    assert (
+        await ConversationStore(tmp_path, max_memory_bytes=0).load(loaded.conversation_id)
+        == continued
+    )
+
+
+def test_conversation_store_is_shared_per_settings(tmp_path: Path) -> None:
+    settings = ConversationStoreSettings(path=str(tmp_path))
+    assert conversation_store(settings) is conversation_store(
+        ConversationStoreSettings(path=str(tmp_path))
+    )
@@ -0,0 +1,115 @@
+"""Unit tests for compact message and conversation representations."""
+
+import dataclasses
+import json
+
+import pytest
+from hopeit.dataobjects.payload import Payload
+
+from hopeit_agents.model_client.models import (
+    EMPTY_METADATA,
+    Conversation,
+    Message,
+    Role,
+    ToolCall,
+    ToolFunctionCall,
+    tool_call_from_openai_dict,
+)
+
+
+def _conversation_json(conversation_id: str, system_prompt: str) -> str:
+    return json.dumps(
+        {
+            "conversation_id": conversation_id,
+            "messages": [
+                {"role": "system", "content": system_prompt, "metadata": {}},
+                {
+                    "role": "assistant",
+                    "content": "",
+                    "tool_calls": [
+                        {
+                            "id": "call-1",
+                            "type": "function",
+                            "function": {"name": "sum", "arguments": '{"a": 1}'},
+                        }
+                    ],
+                },
+                {"role": "user", "content": "hi", "metadata": {"source": "web"}},
+            ],
+        }
+    )
+
+
+def test_conversations_share_empty_metadata() -> None:
+    system_prompt = "".join(["You are a helpful agent. "] * 100)
+    first = Payload.from_json(_conversation_json("c1", system_prompt), datatype=Conversation)
+    second = Payload.from_json(_conversation_json("c2", system_prompt), datatype=Conversation)
+
+    assert first.messages[0].metadata is EMPTY_METADATA
+    assert second.messages[1].metadata is EMPTY_METADATA
+    assert first.messages[2].metadata == {"source": "web"}
+
+
+def test_messages_are_immutable() -> None:
+    message = Message(role=Role.USER, content="hi")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        message.content = "bye"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        message.metadata["key"] = "value"
+    assert EMPTY_METADATA == {}
+
+    updated = dataclasses.replace(message, content="bye", metadata={"key": "value"})
+    assert (updated.content, updated.metadata) == ("bye", {"key": "value"})
+
+
+def test_serialization_is_unchanged() -> None:
+    conversation = Conversation(
+        conversation_id="c1",
+        messages=[
+            Message(role=Role.SYSTEM, content="system"),
+            Message(
+                role=Role.ASSISTANT,
+                content="",
+                tool_calls=[
+                    ToolCall(
+                        id="call-1",
+                        type="function",
+                        function=ToolFunctionCall(name="sum", arguments="{}"),
+                    )
+                ],
+            ),
+        ],
+    )
+
+    data = Payload.to_obj(conversation)
+
+    assert data["messages"][0] == {  # type: ignore[call-overload,index]
+        "role": "system",
+        "content": "system",
+        "tool_call_id": None,
+        "name": None,
+        "tool_calls": None,
+        "metadata": {},
+    }
+    assert Payload.from_json(Payload.to_json(conversation), datatype=Conversation) == conversation
+
+
+def test_tool_call_keeps_parsed_arguments() -> None:
+    tool_call = tool_call_from_openai_dict(
+        {"function": {"name": "sum", "arguments": '{"a": 1, "b": 2}'}}
+    )
+    function = tool_call.function
+
+    assert function.arguments == '{"a":1,"b":2}'
+    assert function.parsed_arguments == {"a": 1, "b": 2}
+    assert function.arguments_dict() is function.parsed_arguments
+    assert Payload.to_obj(tool_call)["function"] == {  # type: ignore[call-overload,index]
+        "name": "sum",
+        "arguments": '{"a":1,"b":2}',
+    }
+
+    restored = Payload.from_json(Payload.to_json(tool_call), datatype=ToolCall)
+    assert restored == tool_call
+    assert restored.function.parsed_arguments is None
+    assert restored.function.arguments_dict() == {"a": 1, "b": 2}
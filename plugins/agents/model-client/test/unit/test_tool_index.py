@@ -0,0 +1,140 @@
+"""Unit tests for tool-call resolution using the precomputed tool index."""
+
+import json
+import random
+from typing import Any
+
+from hopeit.server.names import spinalcase
+
+from hopeit_agents.mcp_client.models import ToolDescriptor
+from hopeit_agents.model_client.models import CompletionConfig, tool_call_from_openai_dict
+from hopeit_agents.model_client.settings import ModelClientSettings, merge_config
+from hopeit_agents.model_client.tool_index import ToolIndex
+
+
+def _tool(name: str, *properties: str) -> ToolDescriptor:
+    return ToolDescriptor(
+        name=name,
+        title=None,
+        description=None,
+        input_schema={"type": "object", "properties": {p: {"type": "string"} for p in properties}},
+        output_schema=None,
+    )
+
+
+def _linear_resolve(
+    extracted_name: str, parsed_args: dict[str, Any], tools: list[ToolDescriptor]
+) -> tuple[str, dict[str, Any]]:
+    """Reference resolution scanning the tool list, as done before indexing."""
+    tool_name = spinalcase(extracted_name)
+    if tool_name not in {t.name for t in tools}:
+        for t in tools:
+            if t.name in spinalcase(extracted_name) or any(
+                t.name in spinalcase(str(k)) or t.name in spinalcase(str(v))
+                for k, v in parsed_args.items()
+            ):
+                tool_name = t.name
+                break
+    for t in tools:
+        if tool_name == t.name:
+            if parsed_args.keys() == t.input_schema["properties"].keys():
+                return t.name, parsed_args
+            for v in parsed_args.values():
+                if isinstance(v, dict) and v.keys() == t.input_schema["properties"].keys():
+                    return t.name, v
+    for t in tools:
+        if parsed_args.keys() == t.input_schema["properties"].keys():
+            return t.name, parsed_args
+        for v in parsed_args.values():
+            if isinstance(v, dict) and v.keys() == t.input_schema["properties"].keys():
+                return t.name, v
+    return tool_name, parsed_args
+
+
+TOOLS = [
+    _tool("tool-sum-two-numbers", "a", "b"),
+    _tool("tool-generate-random", "range"),
+    _tool("sum", "x", "y"),
+    _tool("expert-agent", "user_message"),
+]
+
+
+def test_resolve_exact_and_normalized_names() -> None:
+    index = ToolIndex(TOOLS)
+
+    assert index.resolve_tool_name("tool-generate-random", {}) == "tool-generate-random"
+    assert index.resolve_tool_name("tool_generate_random", {}) == "tool-generate-random"
+    assert index.resolve_tool_name("unknown", {}) == "unknown"
+    assert index.get("sum") is TOOLS[2]
+    assert index.get("unknown") is None
+
+
+def test_resolve_name_contained_in_name_or_arguments() -> None:
+    index = ToolIndex(TOOLS)
+
+    assert index.resolve_tool_name("functions.tool_sum_two_numbers", {}) == "tool-sum-two-numbers"
+    assert index.resolve_tool_name("call", {"tool": "expert_agent"}) == "expert-agent"
+    # First tool in inventory order wins over longer or earlier-in-string matches
+    assert index.resolve_tool_name("summary", {}) == "sum"
+    assert index.resolve_tool_name("tool-sum-two-numbers-v2", {}) == "tool-sum-two-numbers"
+
+
+def test_resolve_arguments_by_signature() -> None:
+    index = ToolIndex(TOOLS)
+
+    assert index.resolve_arguments("sum", {"x": 1, "y": 2}) == ("sum", {"x": 1, "y": 2})
+    assert index.resolve_arguments("sum", {"args": {"x": 1, "y": 2}}) == ("sum", {"x": 1, "y": 2})
+    assert index.resolve_arguments("unknown", {"b": 2, "a": 1}) == (
+        "tool-sum-two-numbers",
+        {"b": 2, "a": 1},
+    )
+    assert index.resolve_arguments("unknown", {"z": 1}) == ("unknown", {"z": 1})
+
+
+def test_index_matches_linear_resolution() -> None:
+    rng = random.Random(42)
+    words = ["tool", "sum", "two", "numbers", "generate", "random", "expert", "agent", "x", "a"]
+    tools = [
+        _tool("-".join(rng.sample(words, rng.randint(1, 3))), *rng.sample(words, rng.randint(0, 3)))
+        for _ in range(60)
+    ]
+    index = ToolIndex(tools)
+    for _ in range(500):
+        name = "_".join(rng.sample(words, rng.randint(1, 4)))
+        args: dict[str, Any] = {
+            rng.choice(words): rng.choice([*words, 1, "Some long text " * rng.randint(0, 20)])
+            for _ in range(rng.randint(0, 3))
+        }
+        if rng.random() < 0.3:
+            args["nested"] = {rng.choice(words): 1 for _ in range(rng.randint(1, 3))}
+        resolved = index.resolve_tool_name(name, args)
+        assert index.resolve_arguments(resolved, args) == _linear_resolve(name, args, tools)
+
+
+def test_tool_call_from_openai_dict_uses_index() -> None:
+    tool_call = tool_call_from_openai_dict(
+        {"function": {"name": "SumTwoNumbers", "arguments": json.dumps({"x": {"a": 1, "b": 2}})}},
+        tool_index=ToolIndex(TOOLS),
+    )
+
+    assert tool_call.function.name == "tool-sum-two-numbers"
+    assert json.loads(tool_call.function.arguments) == {"a": 1, "b": 2}
+
+
+def test_completion_config_caches_index_per_inventory() -> None:
+    config = CompletionConfig(model="test", available_tools=TOOLS)
+    index = config.tool_index()
+
+    assert config.tool_index() is index
+
+    settings = ModelClientSettings(api_base="http://localhost", default_model="test")
+    merged = merge_config(settings, config)
+    assert merged.tool_index() is index
+
+    other_model = config.with_model("other")
+    assert other_model.model == "other"
+    assert other_model.tool_index() is index
+    assert config.with_model("test") is config
+
+    config.available_tools = TOOLS[:2]
+    assert config.tool_index() is not index
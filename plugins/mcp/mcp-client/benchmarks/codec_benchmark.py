@@ -0,0 +1,119 @@
+"""Benchmark of JSON codecs encoding and decoding model and MCP payloads.
+
+Compares the codecs in `hopeit_agents.mcp_client.codec` on payloads shaped like the
+ones clients exchange: a chat completion request body with tool specs, a completion
+response with tool calls, and an indented tool result as rendered for models. Codecs
+not installed, e.g. `orjson` without the `fast` extra, are skipped.
+
+Run with:
+
+    python plugins/mcp/mcp-client/benchmarks/codec_benchmark.py [--number N]
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from hopeit_agents.mcp_client.codec import (
+    JsonCodec,
+    OrjsonCodec,
+    PydanticCoreCodec,
+    StdlibJsonCodec,
+)
+
+
+def _request_body() -> dict[str, Any]:
+    tool = {
+        "type": "function",
+        "function": {
+            "name": "search_documents",
+            "description": "Search indexed documents matching a query and filters.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Text to search"},
+                    "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+                    "filters": {"type": "object", "additionalProperties": {"type": "string"}},
+                },
+                "required": ["query"],
+            },
+        },
+    }
+    messages = [{"role": "system", "content": "You are a helpful assistant. " * 10}]
+    for i in range(15):
+        messages.append({"role": "user", "content": f"Question {i} about the documents ñ"})
+        messages.append({"role": "assistant", "content": f"Answer {i} " * 20})
+    return {"model": "gpt-4o", "messages": messages, "tools": [tool] * 8, "temperature": 0.2}
+
+
+def _response_body() -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-123",
+        "model": "gpt-4o",
+        "created": 1700000000,
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": f"call_{i}",
+                            "type": "function",
+                            "function": {
+                                "name": "search_documents",
+                                "arguments": '{"query": "quarterly report", "limit": 10}',
+                            },
+                        }
+                        for i in range(5)
+                    ],
+                },
+                "finish_reason": "tool_calls",
+            }
+        ],
+        "usage": {"prompt_tokens": 2500, "completion_tokens": 120, "total_tokens": 2620},
+    }
+
+
+def _tool_result() -> dict[str, Any]:
+    return {
+        "items": [
+            {"id": i, "title": f"Document {i}", "score": i / 100, "tags": ["a", "b", "c"]}
+            for i in range(100)
+        ],
+        "total": 100,
+    }
+
+
+def _codecs() -> list[JsonCodec]:
+    codecs: list[JsonCodec] = [StdlibJsonCodec(), PydanticCoreCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:
+        print("orjson not installed, skipped")
+    return codecs
+
+
+def _cases(codec: JsonCodec) -> dict[str, Callable[[], Any]]:
+    request, result = _request_body(), _tool_result()
+    response = StdlibJsonCodec().dumpb(_response_body())
+    return {
+        f"request encode ({len(codec.dumpb(request))}B)": lambda: codec.dumpb(request),
+        f"response decode ({len(response)}B)": lambda: codec.loads(response),
+        "tool result, indented": lambda: codec.dumpb(result, indent=True),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+    for codec in _codecs():
+        for name, case in _cases(codec).items():
+            best = min(timeit.repeat(case, number=args.number, repeat=5)) / args.number
+            print(f"{codec.name:<14} {name:<32} {best * 1e6:8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,11 @@ async def invoke_tool(args: ToolInvocation, context: EventContext) -> ToolExecut
 
     try:
         result = await client.call_tool(
-            args.tool_name, args.payload, call_id=args.call_id, session_id=args.session_id
+            args.tool_name,
+            args.payload,
+            call_id=args.call_id,
+            session_id=args.session_id,
+            deadline=args.deadline,
         )
     except MCPClientError as exc:
         logger.error(
@@ -0,0 +1,57 @@
+"""Invoke a batch of MCP tools and return their results."""
+
+from hopeit.app.api import event_api
+from hopeit.app.context import EventContext
+from hopeit.app.logger import app_extra_logger
+
+from hopeit_agents.mcp_client.client import MCPClient
+from hopeit_agents.mcp_client.models import (
+    MCPClientConfig,
+    ToolBatchResult,
+    ToolExecutionStatus,
+    ToolInvocationBatch,
+)
+from hopeit_agents.mcp_client.settings import build_environment
+
+__steps__ = ["invoke_tools"]
+
+__api__ = event_api(
+    summary="hopeit_agents MCP client: invoke tools",
+    payload=(ToolInvocationBatch, "Tool invocations"),
+    responses={
+        200: (ToolBatchResult, "Tool execution results, including failed invocations"),
+    },
+)
+
+logger, extra = app_extra_logger()
+
+
+async def invoke_tools(args: ToolInvocationBatch, context: EventContext) -> ToolBatchResult:
+    """Invoke the requested tools using MCP, sharing sessions between invocations.
+
+    The requested `max_concurrency` can lower, but not exceed, the configured
+    `batch_concurrency`.
+    """
+    config = context.settings(key="mcp_client", datatype=MCPClientConfig)
+    env = build_environment(config, context.env)
+    client = MCPClient(config=config, env=env)
+
+    results = await client.call_tools(
+        args.invocations,
+        max_concurrency=min(
+            args.max_concurrency or config.batch_concurrency, config.batch_concurrency
+        ),
+        call_timeout_seconds=args.call_timeout_seconds,
+    )
+    error_count = sum(result.status is ToolExecutionStatus.ERROR for result in results)
+
+    logger.info(
+        context,
+        "mcp_invoke_tools_done",
+        extra=extra(invocations=len(results), error_count=error_count),
+    )
+    return ToolBatchResult(
+        results=results,
+        success_count=len(results) - error_count,
+        error_count=error_count,
+    )
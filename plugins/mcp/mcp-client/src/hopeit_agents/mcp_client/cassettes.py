@@ -0,0 +1,145 @@
+"""Record and replay of model and MCP traffic using cassette files.
+
+In `record` mode, clients pass through to the real endpoint and append each request
+key, response and latency to the cassette file as a compact JSON line. In `replay` mode,
+clients do not reach the endpoint: responses are served from the cassette, after
+waiting the recorded latency divided by `speed`.
+
+Requests are keyed by a hash of their canonical JSON, so replay does not depend on
+volatile values such as deadlines or call ids, which are not part of the key. Responses
+recorded for the same key are served in recorded order, repeating the last one.
+
+The cassette file is read once, on the first replay, and appended to, in worker threads.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from hopeit.dataobjects import dataclass, dataobject
+from hopeit.dataobjects.payload import Payload
+
+__all__ = [
+    "Cassette",
+    "CassetteEntry",
+    "CassetteMissError",
+    "CassetteMode",
+    "CassetteSettings",
+    "open_cassette",
+]
+
+
+class CassetteMode(str, Enum):
+    """Whether clients record traffic or replay it."""
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+@dataobject
+@dataclass
+class CassetteSettings:
+    """Cassette file used by a client.
+
+    `speed` divides recorded latencies on replay: 1.0 replays at recorded speed, larger
+    values accelerate, and 0 serves responses without waiting.
+    """
+
+    path: str
+    mode: CassetteMode = CassetteMode.REPLAY
+    speed: float = 1.0
+
+
+@dataobject
+@dataclass
+class CassetteEntry:
+    """Recorded response to a request."""
+
+    key: str
+    latency_seconds: float
+    response: Any
+
+
+class CassetteMissError(LookupError):
+    """Raised on replay when the cassette has no response for a request."""
+
+
+class Cassette:
+    """Recorded traffic in a JSON lines file."""
+
+    def __init__(self, settings: CassetteSettings) -> None:
+        self.settings = settings
+        self.path = Path(settings.path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[CassetteEntry]] | None = None
+        self._served: dict[str, int] = {}
+
+    @property
+    def replaying(self) -> bool:
+        return self.settings.mode is CassetteMode.REPLAY
+
+    @staticmethod
+    def request_key(request: Any) -> str:
+        """Return the key of a JSON-compatible request, hashing its canonical JSON."""
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+    async def record(self, key: str, response: Any, latency_seconds: float) -> None:
+        """Append the response to `key` to the cassette file."""
+        line = Payload.to_json(
+            CassetteEntry(key=key, latency_seconds=round(latency_seconds, 6), response=response)
+        )
+        await asyncio.to_thread(self._append, line)
+
+    async def replay(self, key: str) -> Any:
+        """Return the next response recorded for `key`, after its recorded latency."""
+        if self._entries is None:
+            entries = await asyncio.to_thread(self._read)
+            if self._entries is None:
+                self._entries = entries
+        recorded = self._entries.get(key)
+        if not recorded:
+            raise CassetteMissError(f"No response recorded for request key={key}")
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        entry = recorded[min(served, len(recorded) - 1)]
+        if self.settings.speed > 0.0 and entry.latency_seconds > 0.0:
+            await asyncio.sleep(entry.latency_seconds / self.settings.speed)
+        return entry.response
+
+    def _append(self, line: str) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _read(self) -> dict[str, list[CassetteEntry]]:
+        entries: dict[str, list[CassetteEntry]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        entry = Payload.from_json(line, datatype=CassetteEntry)
+                        entries.setdefault(entry.key, []).append(entry)
+        return entries
+
+
+_cassettes: dict[tuple[str, CassetteMode, float], Cassette] = {}
+
+
+def open_cassette(settings: CassetteSettings) -> Cassette:
+    """Return the process-wide cassette for `settings`.
+
+    Cassettes are shared by clients using the same settings, so replay order and the
+    loaded entries are kept between requests.
+    """
+    key = (settings.path, settings.mode, settings.speed)
+    found = _cassettes.get(key)
+    if found is None:
+        found = Cassette(settings)
+        _cassettes[key] = found
+    return found
@@ -1,24 +1,58 @@
 """Async client that delegates MCP tool operations to the official SDK."""
 
 import asyncio
+import base64
+import dataclasses
+import hashlib
+import importlib
+import mmap
+import os
 import uuid
-from collections.abc import AsyncIterator, Mapping
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
 from time import monotonic
-from typing import Any, cast
+from types import ModuleType
+from typing import Any, TypeVar, cast
 
 from mcp import ClientSession, McpError, StdioServerParameters, stdio_client, types
+from mcp.client.session import MessageHandlerFnT
 from mcp.client.streamable_http import streamablehttp_client
+from pydantic import AnyUrl
 
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.cassettes import CassetteMissError, open_cassette
 from hopeit_agents.mcp_client.models import (
+    BLOB_META_KEY,
+    BLOB_THRESHOLD_META_KEY,
+    DEADLINE_META_KEY,
+    PARTIAL_META_KEY,
+    BlobHandle,
     MCPClientConfig,
     ToolAnnotations,
     ToolDescriptor,
     ToolExecutionResult,
     ToolExecutionStatus,
+    ToolInvocation,
+    ToolProgress,
+    ToolResultMode,
     Transport,
+    blob_path,
+    intern_schema,
 )
+from hopeit_agents.mcp_client.replicas import ReplicasUnavailableError, replica_set
+from hopeit_agents.mcp_client.session import MCPSession, ProgressHandler
+from hopeit_agents.mcp_client.stdio_pool import stdio_pool
+from hopeit_agents.mcp_client.tool_inventory import tool_inventory
+from hopeit_agents.mcp_client.tracing import span
+
+ResultT = TypeVar("ResultT", types.ListToolsResult, types.CallToolResult)
+
+ToolProgressCallback = Callable[[ToolProgress], Awaitable[None]]
+"""Receives progress and partial results reported by a tool while it runs."""
 
 
 @dataclass
@@ -32,6 +66,16 @@ class MCPClientError(RuntimeError):
         return f"MCPClientError(message={self.message})"
 
 
+def _inprocess_handler() -> ModuleType:
+    """Return the MCP server plugin tool handler, used by the `inprocess` transport."""
+    try:
+        return importlib.import_module("hopeit_agents.mcp_server.server.handler")
+    except ImportError as exc:
+        raise MCPClientError(
+            "INPROCESS transport requires hopeit-agents.mcp-server installed in this process"
+        ) from exc
+
+
 class MCPClient:
     """High-level wrapper over the official MCP SDK."""
 
@@ -39,36 +83,84 @@ class MCPClient:
         self._config = config
         self._env = dict(env or {})
         self._tools_cache: tuple[float, list[ToolDescriptor]] | None = None
+        self._cassette = None if config.cassette is None else open_cassette(config.cassette)
 
     async def list_tools(self) -> list[ToolDescriptor]:
-        """Return cached list of tools when possible, otherwise query MCP server."""
+        """Return cached list of tools when possible, otherwise query MCP server.
+
+        With `subscribe_tool_changes`, the cache is shared by the clients of the process
+        and invalidated by `list_changed` notifications received on a subscription.
+        """
+        if (
+            self._config.subscribe_tool_changes
+            and self._config.transport is not Transport.INPROCESS
+            and self._cassette is None
+        ):
+            return await self._list_subscribed_tools()
+
         cache = self._tools_cache
         now = monotonic()
         if cache and now - cache[0] < self._config.tool_cache_seconds:
             return cache[1]
 
-        async with self._session() as session:
-            try:
-                result = await asyncio.wait_for(
-                    session.list_tools(),
-                    timeout=self._config.list_timeout_seconds,
-                )
-            except TimeoutError as exc:
-                raise MCPClientError("Timed out listing tools") from exc
-            except McpError as exc:  # pragma: no cover - depends on SDK runtime
-                raise MCPClientError(
-                    "MCP protocol error while listing tools",
-                    details={
-                        "code": exc.error.code,
-                        "message": exc.error.message,
-                        "data": exc.error.data,
-                    },
-                ) from exc
+        if self._config.transport is Transport.INPROCESS:
+            tools = _inprocess_handler().tool_list()
+            descriptors = [self._tool_from_mcp(tool) for tool in tools]
+            self._tools_cache = (monotonic(), descriptors)
+            return descriptors
+
+        with span("mcp.list_tools", transport=self._config.transport.value) as list_span:
+            result = await self._recorded(
+                {"op": "list_tools"},
+                self._request_list_tools,
+                types.ListToolsResult,
+                timeout=self._config.list_timeout_seconds,
+            )
+            list_span.set_attribute("tools", len(result.tools))
 
         descriptors = [self._tool_from_mcp(tool) for tool in result.tools]
         self._tools_cache = (monotonic(), descriptors)
         return descriptors
 
+    async def _list_subscribed_tools(self) -> list[ToolDescriptor]:
+        """Return tools from the process-wide inventory, subscribing to its changes."""
+        inventory = tool_inventory(self._server_key(), self._config.tool_cache_seconds)
+        inventory.subscribe(self._subscription_session, self._tool_from_mcp)
+        tools = inventory.cached()
+        if tools is not None:
+            return tools
+        version = inventory.version
+        with span("mcp.list_tools", transport=self._config.transport.value) as list_span:
+            result = await self._request_list_tools()
+            list_span.set_attribute("tools", len(result.tools))
+        tools = [self._tool_from_mcp(tool) for tool in result.tools]
+        inventory.store(tools, version)
+        return tools
+
+    @asynccontextmanager
+    async def _subscription_session(
+        self, message_handler: MessageHandlerFnT
+    ) -> AsyncIterator[tuple[ClientSession, bool]]:
+        """Yield a session receiving notifications and whether it supports `list_changed`."""
+        async with self._session(message_handler) as session:
+            result = getattr(session, "initialize_result", None)
+            tools = None if result is None else result.capabilities.tools
+            yield session, bool(tools and tools.listChanged)
+
+    def _server_key(self) -> tuple[Any, ...]:
+        """Identify the MCP server of this client, to share its tool inventory."""
+        config = self._config
+        return (
+            config.transport,
+            config.url,
+            config.host,
+            config.port,
+            tuple(config.replicas),
+            config.command,
+            tuple(config.args),
+            config.cwd,
+        )
+
     async def call_tool(
         self,
         tool_name: str,
@@ -76,21 +168,280 @@ class MCPClient:
         *,
         call_id: str | None = None,
         session_id: str | None = None,
+        deadline: datetime | None = None,
+        timeout: float | None = None,
+        on_progress: ToolProgressCallback | None = None,
     ) -> ToolExecutionResult:
-        """Invoke a tool by name passing the provided arguments."""
+        """Invoke a tool by name passing the provided arguments.
+
+        `timeout` replaces the configured call timeout. When `deadline` is provided, the
+        call timeout is limited to the remaining time and the deadline is sent to the
+        server in the request `_meta`.
+
+        With `on_progress`, the server is requested to report progress, and the callback
+        receives progress and partial results reported by the tool while it runs. Progress
+        is not recorded to cassettes. Cancelling the call, or its timeout, notifies the
+        server to stop running the tool.
+
+        Records a `mcp.call_tool` span, with `mcp.initialize` and `mcp.request` children.
+        """
         call_id = call_id or str(uuid.uuid4())
+        call_timeout = self._call_timeout(tool_name, deadline, timeout)
+        if self._config.transport is Transport.INPROCESS:
+            return await self._call_inprocess(
+                tool_name,
+                payload,
+                call_id=call_id,
+                session_id=session_id,
+                deadline=deadline,
+                timeout=call_timeout,
+                on_progress=on_progress,
+            )
+        meta = self._request_meta(deadline)
+        progress = _progress_handler(tool_name, call_id, on_progress)
+
+        with span(
+            "mcp.call_tool",
+            tool_name=tool_name,
+            call_id=call_id,
+            transport=self._config.transport.value,
+        ) as call_span:
+            result = await self._recorded(
+                {"op": "call_tool", "tool": tool_name, "arguments": payload},
+                partial(self._request_call_tool, tool_name, payload, meta, call_timeout, progress),
+                types.CallToolResult,
+                timeout=call_timeout,
+            )
+            call_span.set_attribute("is_error", bool(result.isError))
+
+        return self._tool_result_from_mcp(
+            tool_name,
+            result,
+            call_id=call_id,
+            session_id=session_id,
+            compact=self._config.result_mode is ToolResultMode.COMPACT,
+        )
+
+    async def call_tools(
+        self,
+        invocations: list[ToolInvocation],
+        *,
+        max_concurrency: int = 4,
+        call_timeout_seconds: float | None = None,
+        on_progress: ToolProgressCallback | None = None,
+    ) -> list[ToolExecutionResult]:
+        """Invoke a batch of tools, returning their results in invocation order.
+
+        Calls run over up to `max_concurrency` sessions, each session sending one call
+        at a time. `call_timeout_seconds` replaces the configured call timeout of each
+        call, which is also limited by the invocation deadline.
+
+        Calls that fail, time out, or cannot be sent return an ERROR result instead of
+        raising, so a failed call does not affect the results of the others. A session
+        is closed after a transport failure, and its remaining calls are sent over the
+        other sessions.
+
+        `on_progress` receives progress reported by any of the tools, identified by the
+        call id of the invocation.
+
+        Records a `mcp.call_tools` span.
+        """
+        if not invocations:
+            return []
+        results: list[ToolExecutionResult | None] = [None] * len(invocations)
+        pending = deque(range(len(invocations)))
+        errors: list[Exception] = []
+
+        async def run(index: int, session: ClientSession | None) -> None:
+            invocation = invocations[index]
+            call_id = invocation.call_id or str(uuid.uuid4())
+            try:
+                if session is None:  # Recorded, replayed or in-process calls
+                    results[index] = await self.call_tool(
+                        invocation.tool_name,
+                        invocation.payload,
+                        call_id=call_id,
+                        session_id=invocation.session_id,
+                        deadline=invocation.deadline,
+                        timeout=call_timeout_seconds,
+                        on_progress=on_progress,
+                    )
+                else:
+                    results[index] = await self._call_tool_in_session(
+                        session, invocation, call_id, call_timeout_seconds, on_progress
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                results[index] = _error_result(invocation, call_id, exc)
+                if session is not None and _is_session_failure(exc):
+                    raise
+
+        async def worker() -> None:
+            if self._config.transport is Transport.INPROCESS or self._cassette is not None:
+                while pending:
+                    await run(pending.popleft(), None)
+                return
+            try:
+                async with self._session() as session:
+                    while pending:
+                        await run(pending.popleft(), session)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        with span("mcp.call_tools", calls=len(invocations)) as batch_span:
+            await asyncio.gather(
+                *(worker() for _ in range(max(1, min(max_concurrency, len(invocations)))))
+            )
+            for index in pending:  # Left when all sessions failed
+                invocation = invocations[index]
+                results[index] = _error_result(
+                    invocation, invocation.call_id or str(uuid.uuid4()), errors[-1]
+                )
+            batch_span.set_attribute(
+                "errors",
+                sum(r is not None and r.status is ToolExecutionStatus.ERROR for r in results),
+            )
+        return cast(list[ToolExecutionResult], results)
+
+    async def load_blob(self, result: ToolExecutionResult) -> ToolExecutionResult:
+        """Return `result` with its structured content loaded from its blob handle.
+
+        Results without a blob handle, or already loaded, are returned as they are.
+        """
+        if result.blob is None or result.structured_content is not None:
+            return result
+        async with self.open_blob(result.blob) as data:
+            structured = codec.loads(data if isinstance(data, bytes) else data[:])
+        return dataclasses.replace(result, structured_content=structured)
+
+    @asynccontextmanager
+    async def open_blob(self, blob: BlobHandle) -> AsyncIterator[bytes | mmap.mmap]:
+        """Yield the content of `blob`, memory-mapped when its file is in `blob_dir`.
+
+        Otherwise, e.g. when the server runs in another host, the blob is read from the
+        server with `resources/read`. Memory-mapped content is only valid in the context.
+        With `replicas`, servers should share their blob directory.
+
+        Records a `mcp.read_blob` span when reading from the server.
+        """
+        mapped = _map_local_blob(blob, self._config.blob_dir)
+        if mapped is not None:
+            with mapped:
+                yield mapped
+            return
+        with span("mcp.read_blob", size=blob.size):
+            data = await self._read_blob(blob)
+        yield data
 
+    async def _read_blob(self, blob: BlobHandle) -> bytes:
+        """Read `blob` from the server, checking its content matches its digest."""
         async with self._session() as session:
             try:
                 result = await asyncio.wait_for(
-                    session.call_tool(tool_name, payload),
+                    session.read_resource(AnyUrl(blob.uri)),
                     timeout=self._config.call_timeout_seconds,
                 )
             except TimeoutError as exc:
-                raise MCPClientError(f"Timed out calling tool '{tool_name}'") from exc
+                raise MCPClientError(f"Timed out reading blob '{blob.uri}'") from exc
+            except McpError as exc:  # pragma: no cover - depends on SDK runtime
+                raise MCPClientError(
+                    f"MCP protocol error reading blob '{blob.uri}'",
+                    details={
+                        "code": exc.error.code,
+                        "message": exc.error.message,
+                        "data": exc.error.data,
+                    },
+                ) from exc
+        if not result.contents:
+            raise MCPClientError(f"Blob '{blob.uri}' not found")
+        contents = result.contents[0]
+        data = (
+            base64.b64decode(contents.blob)
+            if isinstance(contents, types.BlobResourceContents)
+            else contents.text.encode()
+        )
+        if hashlib.sha256(data).hexdigest() != blob.sha256:
+            raise MCPClientError(f"Blob '{blob.uri}' content does not match its digest")
+        return data
+
+    async def _call_tool_in_session(
+        self,
+        session: ClientSession,
+        invocation: ToolInvocation,
+        call_id: str,
+        timeout: float | None,
+        on_progress: ToolProgressCallback | None = None,
+    ) -> ToolExecutionResult:
+        """Invoke a tool in an open session, as `call_tool` does in a new session."""
+        tool_name = invocation.tool_name
+        deadline = invocation.deadline
+        meta = self._request_meta(deadline)
+        with span(
+            "mcp.call_tool",
+            tool_name=tool_name,
+            call_id=call_id,
+            transport=self._config.transport.value,
+        ) as call_span:
+            result = await self._request_call_tool_in_session(
+                session,
+                tool_name,
+                invocation.payload,
+                meta,
+                self._call_timeout(tool_name, deadline, timeout),
+                _progress_handler(tool_name, call_id, on_progress),
+            )
+            call_span.set_attribute("is_error", bool(result.isError))
+        return self._tool_result_from_mcp(
+            tool_name,
+            result,
+            call_id=call_id,
+            session_id=invocation.session_id,
+            compact=self._config.result_mode is ToolResultMode.COMPACT,
+        )
+
+    async def _recorded(
+        self,
+        request: dict[str, Any],
+        send: Callable[[], Awaitable[ResultT]],
+        result_type: type[ResultT],
+        *,
+        timeout: float,
+    ) -> ResultT:
+        """Return the result of `send`, recording it to or replaying it from the cassette."""
+        cassette = self._cassette
+        if cassette is None:
+            return await send()
+        key = cassette.request_key(request)
+        if cassette.replaying:
+            try:
+                recorded = await asyncio.wait_for(cassette.replay(key), timeout=timeout)
+            except TimeoutError as exc:
+                raise MCPClientError(f"Timed out replaying {request['op']}") from exc
+            except CassetteMissError as exc:
+                raise MCPClientError(str(exc)) from exc
+            return result_type.model_validate(recorded)
+        started = monotonic()
+        result = await send()
+        await cassette.record(
+            key,
+            result.model_dump(mode="json", by_alias=True, exclude_none=True),
+            monotonic() - started,
+        )
+        return result
+
+    async def _request_list_tools(self) -> types.ListToolsResult:
+        """Send a `tools/list` request in a new session."""
+        async with self._session() as session:
+            try:
+                with span("mcp.request"):
+                    return await asyncio.wait_for(
+                        session.list_tools(),
+                        timeout=self._config.list_timeout_seconds,
+                    )
+            except TimeoutError as exc:
+                raise MCPClientError("Timed out listing tools") from exc
             except McpError as exc:  # pragma: no cover - depends on SDK runtime
                 raise MCPClientError(
-                    f"MCP protocol error calling tool '{tool_name}'",
+                    "MCP protocol error while listing tools",
                     details={
                         "code": exc.error.code,
                         "message": exc.error.message,
@@ -98,12 +449,200 @@ class MCPClient:
                     },
                 ) from exc
 
-        return self._tool_result_from_mcp(tool_name, result, call_id=call_id, session_id=session_id)
+    async def _request_call_tool(
+        self,
+        tool_name: str,
+        payload: dict[str, Any] | None,
+        meta: dict[str, Any] | None,
+        timeout: float,
+        progress: ProgressHandler | None = None,
+    ) -> types.CallToolResult:
+        """Send a `tools/call` request in a new session."""
+        async with self._session() as session:
+            return await self._request_call_tool_in_session(
+                session, tool_name, payload, meta, timeout, progress
+            )
+
+    async def _request_call_tool_in_session(
+        self,
+        session: ClientSession,
+        tool_name: str,
+        payload: dict[str, Any] | None,
+        meta: dict[str, Any] | None,
+        timeout: float,
+        progress: ProgressHandler | None = None,
+    ) -> types.CallToolResult:
+        """Send a `tools/call` request in an open session.
+
+        With `progress`, a progress token is sent in the request `_meta`, and progress
+        notifications for it are passed to `progress` until the call returns.
+        """
+        token: str | None = None
+        if progress is not None and isinstance(session, MCPSession):
+            token = str(uuid.uuid4())
+            meta = {**(meta or {}), "progressToken": token}
+            session.progress_handlers[token] = progress
+        try:
+            with span("mcp.request"):
+                return await asyncio.wait_for(
+                    self._send_call_tool(session, tool_name, payload, meta),
+                    timeout=timeout,
+                )
+        except TimeoutError as exc:
+            raise MCPClientError(f"Timed out calling tool '{tool_name}'") from exc
+        except McpError as exc:  # pragma: no cover - depends on SDK runtime
+            raise MCPClientError(
+                f"MCP protocol error calling tool '{tool_name}'",
+                details={
+                    "code": exc.error.code,
+                    "message": exc.error.message,
+                    "data": exc.error.data,
+                },
+            ) from exc
+        finally:
+            if token is not None:
+                cast(MCPSession, session).progress_handlers.pop(token, None)
+
+    async def _call_inprocess(
+        self,
+        tool_name: str,
+        payload: dict[str, Any] | None,
+        *,
+        call_id: str,
+        session_id: str | None,
+        deadline: datetime | None,
+        timeout: float,
+        on_progress: ToolProgressCallback | None = None,
+    ) -> ToolExecutionResult:
+        """Invoke a tool registered in this process by the MCP server plugin.
+
+        Errors raised by the tool are returned as an ERROR result, as the MCP server does.
+        """
+        handler = _inprocess_handler()
+
+        async def report(
+            progress: float,
+            total: float | None,
+            message: str | None,
+            partial: dict[str, Any] | list[Any] | None,
+        ) -> None:
+            assert on_progress is not None
+            await on_progress(
+                ToolProgress(
+                    call_id=call_id,
+                    tool_name=tool_name,
+                    progress=progress,
+                    total=total,
+                    message=message,
+                    partial_content=partial,
+                )
+            )
+
+        with span(
+            "mcp.call_tool",
+            tool_name=tool_name,
+            call_id=call_id,
+            transport=Transport.INPROCESS.value,
+        ) as call_span:
+            try:
+                structured = await asyncio.wait_for(
+                    handler.invoke_tool(
+                        tool_name,
+                        payload or {},
+                        headers={},
+                        deadline=deadline,
+                        # Only passed when requested, as older server plugins do not accept it
+                        **({} if on_progress is None else {"progress": report}),
+                    ),
+                    timeout=timeout,
+                )
+            except TimeoutError as exc:
+                raise MCPClientError(f"Timed out calling tool '{tool_name}'") from exc
+            except Exception as exc:  # pylint: disable=broad-except
+                call_span.set_attribute("is_error", True)
+                return ToolExecutionResult(
+                    call_id=call_id,
+                    tool_name=tool_name,
+                    status=ToolExecutionStatus.ERROR,
+                    content=[{"type": "text", "text": str(exc)}],
+                    error_message=str(exc),
+                    session_id=session_id,
+                )
+        return ToolExecutionResult(
+            call_id=call_id,
+            tool_name=tool_name,
+            status=ToolExecutionStatus.SUCCESS,
+            structured_content=structured,
+            session_id=session_id,
+        )
+
+    def _request_meta(self, deadline: datetime | None) -> dict[str, Any] | None:
+        """Return `_meta` fields of a `tools/call` request: deadline and blob threshold."""
+        meta: dict[str, Any] = {}
+        if deadline is not None:
+            meta[DEADLINE_META_KEY] = deadline.isoformat()
+        if self._config.blob_threshold_bytes is not None:
+            meta[BLOB_THRESHOLD_META_KEY] = self._config.blob_threshold_bytes
+        return meta or None
+
+    def _call_timeout(
+        self, tool_name: str, deadline: datetime | None, timeout: float | None = None
+    ) -> float:
+        """Return the call timeout, limited by the remaining time until `deadline`."""
+        if timeout is None:
+            timeout = self._config.call_timeout_seconds
+        if deadline is None:
+            return timeout
+        remaining = (deadline - datetime.now(UTC)).total_seconds()
+        if remaining <= 0.0:
+            raise MCPClientError(f"Deadline exceeded before calling tool '{tool_name}'")
+        return min(timeout, remaining)
+
+    @staticmethod
+    async def _send_call_tool(
+        session: ClientSession,
+        tool_name: str,
+        payload: dict[str, Any] | None,
+        meta: dict[str, Any] | None,
+    ) -> types.CallToolResult:
+        """Send a `tools/call` request including optional `_meta` fields."""
+        if meta is None:
+            return await session.call_tool(tool_name, payload)
+        # SDK `call_tool` does not accept `_meta`: send the request directly,
+        # structured output is validated server side against the tool output schema.
+        return await session.send_request(
+            types.ClientRequest(
+                types.CallToolRequest(
+                    params=types.CallToolRequestParams(
+                        name=tool_name,
+                        arguments=payload,
+                        _meta=types.RequestParams.Meta(**meta),
+                    ),
+                )
+            ),
+            types.CallToolResult,
+        )
 
     @asynccontextmanager
-    async def _session(self) -> AsyncIterator[ClientSession]:
-        """Yield an initialised MCP client session using the configured transport."""
+    async def _session(
+        self, message_handler: MessageHandlerFnT | None = None
+    ) -> AsyncIterator[ClientSession]:
+        """Yield an initialised MCP client session using the configured transport.
+
+        Sessions with a `message_handler`, receiving server notifications, do not use
+        pooled stdio processes.
+        """
         transport = self._config.transport
+        if transport is Transport.HTTP and self._config.replicas:
+            replicas = replica_set(self._config.replicas, self._config.replica_settings)
+            try:
+                with replicas.endpoint(_is_session_failure) as replica_url:
+                    async with self._http_session(replica_url, message_handler) as session:
+                        yield session
+            except ReplicasUnavailableError as exc:
+                raise MCPClientError(str(exc)) from exc
+            return
+
         if transport is Transport.HTTP:
             url = self._config.url
             if not url:
@@ -112,15 +651,8 @@ class MCPClient:
                 if not host or port is None:
                     raise MCPClientError("HTTP transport requires either a URL or host and port")
                 url = f"http://{host}:{int(port)}/mcp"
-
-            async with streamablehttp_client(
-                url,
-                timeout=self._config.list_timeout_seconds,
-                sse_read_timeout=self._config.call_timeout_seconds,
-            ) as (read_stream, write_stream, _):
-                async with ClientSession(read_stream, write_stream) as session:
-                    await session.initialize()
-                    yield session
+            async with self._http_session(url, message_handler) as session:
+                yield session
             return
 
         if transport is not Transport.STDIO:
@@ -137,15 +669,46 @@ class MCPClient:
             cwd=self._config.cwd,
         )
 
+        if self._config.stdio_pool is not None and message_handler is None:
+            pool = stdio_pool(params, self._config.stdio_pool)
+            try:
+                async with pool.session(_is_session_failure) as session:
+                    yield session
+            except TimeoutError as exc:
+                raise MCPClientError("Timed out waiting for a pooled MCP server process") from exc
+            return
+
         async with stdio_client(params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
+            async with MCPSession(read, write, message_handler=message_handler) as session:
+                with span("mcp.initialize"):
+                    await session.initialize()
+                yield session
+
+    @asynccontextmanager
+    async def _http_session(
+        self, url: str, message_handler: MessageHandlerFnT | None = None
+    ) -> AsyncIterator[ClientSession]:
+        """Yield an initialised MCP client session with the server at `url`."""
+        async with streamablehttp_client(
+            url,
+            timeout=self._config.list_timeout_seconds,
+            sse_read_timeout=self._config.call_timeout_seconds,
+        ) as (read_stream, write_stream, _):
+            async with MCPSession(
+                read_stream, write_stream, message_handler=message_handler
+            ) as session:
+                with span("mcp.initialize", url=url):
+                    await session.initialize()
                 yield session
 
     @staticmethod
     def _tool_from_mcp(tool: types.Tool) -> ToolDescriptor:
-        """Map an MCP tool descriptor into the internal dataclass representation."""
-        return ToolDescriptor(
+        """Map an MCP tool descriptor into the internal dataclass representation.
+
+        Schemas are interned once here, when tools are listed, so descriptors of the same
+        tool share them. They are assigned after validation, which copies them.
+        """
+        descriptor = ToolDescriptor(
             name=tool.name,
             title=tool.title,
             description=tool.description,
@@ -158,19 +721,25 @@ class MCPClient:
             ),
             _meta=tool.meta,
         )
+        descriptor.input_schema = intern_schema(descriptor.input_schema)
+        if descriptor.output_schema is not None:
+            descriptor.output_schema = intern_schema(descriptor.output_schema)
+        return descriptor
 
     @staticmethod
     def _tool_result_from_mcp(
-        tool_name: str, result: types.CallToolResult, *, call_id: str, session_id: str | None
+        tool_name: str,
+        result: types.CallToolResult,
+        *,
+        call_id: str,
+        session_id: str | None,
+        compact: bool = False,
     ) -> ToolExecutionResult:
-        """Convert an MCP tool response into the high-level execution result schema."""
-        content: list[dict[str, Any]] = []
-        for item in result.content:
-            if hasattr(item, "model_dump"):
-                content.append(item.model_dump(mode="json"))
-            else:
-                content.append({"type": item.__class__.__name__})
+        """Convert an MCP tool response into the high-level execution result schema.
 
+        With `compact`, `raw_result` is not set and text content repeating the structured
+        content is dropped.
+        """
         structured: dict[str, Any] | list[Any] | None
         structured_raw = getattr(result, "structuredContent", None)
         if structured_raw is None:
@@ -180,6 +749,15 @@ class MCPClient:
         else:
             structured = cast(dict[str, Any] | list[Any], structured_raw)
 
+        content: list[dict[str, Any]] = []
+        for item in result.content:
+            if compact and structured is not None and _repeats_json(item, structured):
+                continue
+            if hasattr(item, "model_dump"):
+                content.append(item.model_dump(mode="json"))
+            else:
+                content.append({"type": item.__class__.__name__})
+
         error_message: str | None = None
         if result.isError:
             for item in result.content:
@@ -187,6 +765,12 @@ class MCPClient:
                     error_message = item.text
                     break
 
+        raw_result: dict[str, Any] | None = None
+        if not compact:
+            # Reuse dumped content instead of dumping it again with the whole result
+            raw_result = result.model_dump(mode="json", exclude={"content"})
+            raw_result["content"] = content
+
         return ToolExecutionResult(
             call_id=call_id,
             tool_name=tool_name,
@@ -194,6 +778,105 @@ class MCPClient:
             content=content,
             structured_content=structured,
             error_message=error_message,
-            raw_result=result.model_dump(mode="json"),
+            raw_result=raw_result,
             session_id=session_id,
+            blob=_blob_handle(result) if structured is None else None,
+        )
+
+
+def _is_session_failure(exc: Exception) -> bool:
+    """True when `exc` leaves the session, or the server endpoint, unusable.
+
+    Timeouts, exceeded deadlines and MCP protocol errors fail a single call, not the
+    session, unless the connection was closed. Only transport errors and closed
+    connections count as failures of replicas and pooled processes.
+    """
+    if not isinstance(exc, MCPClientError):
+        return True
+    return exc.details is not None and exc.details.get("code") == types.CONNECTION_CLOSED
+
+
+def _error_result(invocation: ToolInvocation, call_id: str, exc: Exception) -> ToolExecutionResult:
+    """Return an ERROR result for an invocation that failed with `exc`."""
+    message = exc.message if isinstance(exc, MCPClientError) else str(exc) or repr(exc)
+    return ToolExecutionResult(
+        call_id=call_id,
+        tool_name=invocation.tool_name,
+        status=ToolExecutionStatus.ERROR,
+        content=[{"type": "text", "text": message}],
+        error_message=message,
+        session_id=invocation.session_id,
+    )
+
+
+def _progress_handler(
+    tool_name: str, call_id: str, on_progress: ToolProgressCallback | None
+) -> ProgressHandler | None:
+    """Return a handler converting progress notifications of a call for `on_progress`."""
+    if on_progress is None:
+        return None
+
+    async def handle(params: types.ProgressNotificationParams) -> None:
+        assert on_progress is not None
+        partial_content = (
+            None if params.meta is None else getattr(params.meta, PARTIAL_META_KEY, None)
+        )
+        await on_progress(
+            ToolProgress(
+                call_id=call_id,
+                tool_name=tool_name,
+                progress=params.progress,
+                total=params.total,
+                message=params.message,
+                partial_content=partial_content,
+            )
         )
+
+    return handle
+
+
+def _blob_handle(result: types.CallToolResult) -> BlobHandle | None:
+    """Return the handle of the blob linked by `result` content, if it is a blob."""
+    if len(result.content) != 1 or not isinstance(link := result.content[0], types.ResourceLink):
+        return None
+    info = (link.meta or {}).get(BLOB_META_KEY)
+    if not isinstance(info, dict) or not isinstance(info.get("sha256"), str):
+        return None
+    return BlobHandle(
+        uri=str(link.uri),
+        sha256=info["sha256"],
+        size=int(info.get("size", link.size or 0)),
+        mime_type=link.mimeType or "application/json",
+    )
+
+
+def _map_local_blob(blob: BlobHandle, blob_dir: str | None) -> mmap.mmap | None:
+    """Memory-map the file of `blob`, if it is available in this host in `blob_dir`.
+
+    The file path is built from the validated blob digest, see `blob_path`, so files
+    outside `blob_dir` are never read. Blob files are written once, by renaming a
+    complete file.
+    """
+    if blob_dir is None:
+        return None
+    try:
+        path = blob_path(blob_dir, blob.sha256)
+    except ValueError:
+        return None
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size != blob.size:
+                return None
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # Not in this host, or removed
+
+
+def _repeats_json(item: Any, structured: dict[str, Any] | list[Any]) -> bool:
+    """True when `item` is text content with `structured` serialized as JSON."""
+    if not isinstance(item, types.TextContent) or item.text[:1] not in ("{", "["):
+        return False
+    try:
+        return bool(codec.loads(item.text) == structured)
+    except ValueError:
+        return False
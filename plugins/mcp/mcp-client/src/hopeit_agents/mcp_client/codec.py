@@ -0,0 +1,131 @@
+"""JSON encoding and decoding of model and MCP payloads.
+
+Payloads sent to and received from models and MCP servers are plain JSON values, so
+they are encoded directly instead of through dataobject serialization. `orjson` is used
+when installed, and `pydantic_core`, always available with hopeit dataobjects, otherwise.
+The standard library `json` module, or any other codec, can be installed process-wide
+with `set_json_codec`.
+
+All codecs produce the same output: compact, or indented by 2 spaces, with non-ASCII
+characters kept as UTF-8.
+"""
+
+import json
+from typing import Any, Protocol
+
+import pydantic_core
+
+__all__ = [
+    "JsonCodec",
+    "OrjsonCodec",
+    "PydanticCoreCodec",
+    "StdlibJsonCodec",
+    "dumpb",
+    "dumps",
+    "json_codec",
+    "loads",
+    "set_json_codec",
+]
+
+
+class JsonCodec(Protocol):
+    """Encodes and decodes JSON values."""
+
+    name: str
+
+    def dumpb(self, obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+        """Return `obj` as UTF-8 encoded JSON."""
+
+    def loads(self, data: str | bytes) -> Any:
+        """Return the value of a JSON document, raising `ValueError` when invalid."""
+
+
+class StdlibJsonCodec:
+    """Codec using the standard library `json` module."""
+
+    name = "json"
+
+    def dumpb(self, obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+        return json.dumps(
+            obj,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+            sort_keys=sort_keys,
+            default=str,
+        ).encode()
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+class PydanticCoreCodec:
+    """Codec using `pydantic_core`, also used by hopeit `Payload` serialization."""
+
+    name = "pydantic_core"
+
+    def dumpb(self, obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+        if sort_keys:  # Not supported by pydantic_core
+            return StdlibJsonCodec().dumpb(obj, indent=indent, sort_keys=True)
+        return pydantic_core.to_json(obj, indent=2 if indent else None, fallback=str)
+
+    def loads(self, data: str | bytes) -> Any:
+        return pydantic_core.from_json(data)
+
+
+class OrjsonCodec:
+    """Codec using `orjson`."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        self._orjson = orjson
+
+    def dumpb(self, obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+        option = 0
+        if indent:
+            option |= self._orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return self._orjson.dumps(obj, default=str, option=option)
+
+    def loads(self, data: str | bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+def _default_codec() -> JsonCodec:
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return PydanticCoreCodec()
+
+
+_codec: JsonCodec = _default_codec()
+
+
+def json_codec() -> JsonCodec:
+    """Return the process-wide codec."""
+    return _codec
+
+
+def set_json_codec(codec: JsonCodec) -> None:
+    """Install `codec` as the process-wide codec."""
+    global _codec  # pylint: disable=global-statement
+    _codec = codec
+
+
+def dumpb(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Return `obj` as UTF-8 encoded JSON, using the process-wide codec."""
+    return _codec.dumpb(obj, indent=indent, sort_keys=sort_keys)
+
+
+def dumps(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    """Return `obj` as a JSON string, using the process-wide codec."""
+    return _codec.dumpb(obj, indent=indent, sort_keys=sort_keys).decode()
+
+
+def loads(data: str | bytes) -> Any:
+    """Return the value of a JSON document, using the process-wide codec."""
+    return _codec.loads(data)
@@ -1,17 +1,76 @@
 """Typed data objects for the MCP client plugin."""
 
+import json
+from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
 from hopeit.dataobjects import dataclass, dataobject, field
 from hopeit.dataobjects.payload import Payload
 
+from hopeit_agents.mcp_client.cassettes import CassetteSettings
+from hopeit_agents.mcp_client.replicas import ReplicaSettings
+from hopeit_agents.mcp_client.stdio_pool import StdioPoolSettings
+
+DEADLINE_META_KEY = "hopeit.agents/deadline"
+"""Request `_meta` key used to forward the caller deadline (ISO 8601) to MCP servers."""
+
+PARTIAL_META_KEY = "hopeit.agents/partial"
+"""Progress notification `_meta` key carrying partial structured output of a tool."""
+
+BLOB_THRESHOLD_META_KEY = "hopeit.agents/blob_threshold"
+"""Request `_meta` key with the result size in bytes above which results are blobs."""
+
+BLOB_META_KEY = "hopeit.agents/blob"
+"""Resource link `_meta` key describing a tool result stored as a blob by the server."""
+
+
+def blob_path(blob_dir: str | Path, sha256: str) -> Path:
+    """Return the path of the blob with digest `sha256` in the blob store `blob_dir`.
+
+    Servers store blobs in this layout, so clients in the same host find them from the
+    digest alone. Raises `ValueError` for digests not made of 64 hex characters.
+    """
+    if len(sha256) != 64 or not all(c in "0123456789abcdef" for c in sha256):
+        raise ValueError(f"Invalid blob digest: {sha256}")
+    return Path(blob_dir) / sha256[:2] / sha256
+
 
 class Transport(str, Enum):
-    """Supported MCP transport mechanisms."""
+    """Supported MCP transport mechanisms.
+
+    `inprocess` dispatches calls directly to tools registered by the MCP server plugin
+    running in the same process, skipping sessions and JSON-RPC serialization.
+    """
 
     STDIO = "stdio"
     HTTP = "http"
+    INPROCESS = "inprocess"
+
+
+class ToolResultMode(str, Enum):
+    """How much of the MCP tool response is kept in `ToolExecutionResult`.
+
+    `full` keeps the parsed content and the full response in `raw_result`. `compact`
+    skips `raw_result`, which can be built on request with `ToolExecutionResult.raw()`,
+    and drops text content that only repeats the structured content as JSON.
+    """
+
+    FULL = "full"
+    COMPACT = "compact"
+
+
+class ToolCallLogRetention(str, Enum):
+    """What is kept of each tool call in tool call logs.
+
+    `full` keeps the complete request and result, `summary` keeps the request and
+    the result status and error message, and `none` keeps no records.
+    """
+
+    FULL = "full"
+    SUMMARY = "summary"
+    NONE = "none"
 
 
 class ToolExecutionStatus(str, Enum):
@@ -70,10 +129,32 @@ class ToolAnnotations:
     """
 
 
+_SCHEMAS_MAX_SIZE = 1024
+_schemas: dict[str, dict[str, Any]] = {}
+
+
+def intern_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """Return a shared dict equal to `schema`, so equal JSON schemas are kept once.
+
+    Interned schemas are shared and must not be modified.
+    """
+    key = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    interned = _schemas.get(key)
+    if interned is None:
+        if len(_schemas) >= _SCHEMAS_MAX_SIZE:
+            _schemas.clear()
+        interned = _schemas[key] = schema
+    return interned
+
+
 @dataobject
 @dataclass
 class ToolDescriptor:
-    """Definition for a tool the client can call."""
+    """Definition for a tool the client can call.
+
+    Descriptors listed by `MCPClient` share input and output schemas interned with
+    `intern_schema`, which must not be modified.
+    """
 
     name: str
     """The programmatic name of the entity."""
@@ -126,18 +207,57 @@ class ToolDescriptor:
 @dataobject
 @dataclass
 class ToolInvocation:
-    """Payload to invoke a tool."""
+    """Payload to invoke a tool.
+
+    When `deadline` is set, the call times out at the deadline and the deadline is
+    forwarded to the MCP server.
+    """
 
     tool_name: str
     payload: dict[str, Any] = field(default_factory=dict)
     call_id: str | None = None
     session_id: str | None = None
+    deadline: datetime | None = None
+
+
+@dataobject
+@dataclass
+class ToolInvocationBatch:
+    """Payload to invoke a batch of tools.
+
+    `max_concurrency` and `call_timeout_seconds` replace the configured
+    `batch_concurrency` and `call_timeout_seconds` when set. `max_concurrency` is
+    limited to the configured `batch_concurrency`.
+    """
+
+    invocations: list[ToolInvocation]
+    max_concurrency: int | None = field(default=None, gt=0)
+    call_timeout_seconds: float | None = None
+
+
+@dataobject
+@dataclass
+class BlobHandle:
+    """Tool result stored by the MCP server as a blob, read only when needed.
+
+    The blob file is read directly when found by its digest in the client `blob_dir`,
+    otherwise the blob is read from the server as the `uri` resource.
+    """
+
+    uri: str
+    sha256: str
+    size: int
+    mime_type: str = "application/json"
 
 
 @dataobject
 @dataclass
 class ToolExecutionResult:
-    """Result of calling a tool through MCP."""
+    """Result of calling a tool through MCP.
+
+    When the result was returned as a blob handle, `blob` is set and structured content
+    is not loaded until requested with `MCPClient.load_blob`.
+    """
 
     call_id: str
     tool_name: str
@@ -147,6 +267,55 @@ class ToolExecutionResult:
     error_message: str | None = None
     raw_result: dict[str, Any] | None = None
     session_id: str | None = None
+    blob: BlobHandle | None = None
+
+    def raw(self) -> dict[str, Any]:
+        """Return `raw_result`, or an MCP `CallToolResult` dict built from this result."""
+        if self.raw_result is not None:
+            return self.raw_result
+        raw: dict[str, Any] = {
+            "content": self.content,
+            "isError": self.status is ToolExecutionStatus.ERROR,
+        }
+        if self.structured_content is not None:
+            raw["structuredContent"] = self.structured_content
+        return raw
+
+    def summary(self) -> "ToolExecutionResult":
+        """Return a copy with status and error message, without content."""
+        return ToolExecutionResult(
+            call_id=self.call_id,
+            tool_name=self.tool_name,
+            status=self.status,
+            error_message=self.error_message,
+            session_id=self.session_id,
+        )
+
+
+@dataobject
+@dataclass
+class ToolProgress:
+    """Progress reported by a tool while it runs, with optional partial output."""
+
+    call_id: str
+    tool_name: str
+    progress: float
+    total: float | None = None
+    message: str | None = None
+    partial_content: dict[str, Any] | list[Any] | None = None
+
+
+@dataobject
+@dataclass
+class ToolBatchResult:
+    """Results of a batch of tool invocations, in invocation order.
+
+    Failed invocations have an ERROR result and do not affect the others.
+    """
+
+    results: list[ToolExecutionResult]
+    success_count: int
+    error_count: int
 
 
 @dataobject
@@ -168,10 +337,48 @@ class ToolCallRecord:
     response: ToolExecutionResult
 
 
+def retained_tool_calls(
+    records: list[ToolCallRecord], retention: ToolCallLogRetention
+) -> list[ToolCallRecord]:
+    """Return what is kept of `records` in a tool call log with `retention`."""
+    if retention is ToolCallLogRetention.FULL:
+        return records
+    if retention is ToolCallLogRetention.NONE:
+        return []
+    return [
+        ToolCallRecord(request=record.request, response=record.response.summary())
+        for record in records
+    ]
+
+
 @dataobject
 @dataclass
 class MCPClientConfig:
-    """Configuration required to communicate with an MCP server."""
+    """Configuration required to communicate with an MCP server.
+
+    When `cassette` is set, `list_tools` and `call_tool` responses are recorded to or
+    replayed from a cassette file, which should not be shared with other MCP servers.
+    The `inprocess` transport does not use cassettes.
+
+    `result_mode` sets how much of each tool response is kept in results.
+    `batch_concurrency` is the number of sessions used to invoke a batch of tools.
+
+    With the `http` transport, `replicas` lists the URLs of replicas of the MCP server,
+    used instead of `url` or `host` and `port`. Requests are balanced across replicas
+    with circuit breaking and health probes configured by `replica_settings`.
+
+    With the `stdio` transport, `stdio_pool` keeps a pool of running, initialized server
+    processes shared by requests, instead of launching the server for each request.
+
+    With `subscribe_tool_changes`, clients share a process-wide tool list, kept by a
+    session subscribed to `notifications/tools/list_changed` from the server, and
+    `tool_cache_seconds` only applies while the subscription is not available.
+
+    With `blob_threshold_bytes`, servers supporting blob handles return results larger
+    than that as a `BlobHandle`, fetched only when loaded, instead of inline. Blob files
+    are memory-mapped only from `blob_dir`, the blob store directory of a server running
+    in the same host, and read from the server otherwise.
+    """
 
     command: str | None = None
     args: list[str] = field(default_factory=list)
@@ -184,3 +391,12 @@ class MCPClientConfig:
     tool_cache_seconds: float = 30.0
     list_timeout_seconds: float = 10.0
     call_timeout_seconds: float = 60.0
+    cassette: CassetteSettings | None = None
+    result_mode: ToolResultMode = ToolResultMode.FULL
+    replicas: list[str] = field(default_factory=list)
+    replica_settings: ReplicaSettings = field(default_factory=ReplicaSettings)
+    stdio_pool: StdioPoolSettings | None = None
+    batch_concurrency: int = 4
+    subscribe_tool_changes: bool = False
+    blob_threshold_bytes: int | None = None
+    blob_dir: str | None = None
@@ -0,0 +1,257 @@
+"""Balancing of MCP requests across replicas of an HTTP MCP server.
+
+Each request goes to the available replica with the fewest outstanding requests. A
+circuit breaker per replica stops sending requests to a replica after consecutive
+failures: the circuit opens for `open_seconds`, then becomes half-open and lets a
+single trial request through, which closes it on success or opens it again on failure.
+
+A background task probes the health route (`/`) of each replica, opening the circuit
+of replicas that do not respond and moving open circuits to half-open when they
+respond again. When every replica is open, requests fail immediately instead of
+waiting for their timeout.
+"""
+
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import Enum
+from time import monotonic
+from urllib.parse import urlsplit
+
+import httpx
+from hopeit.dataobjects import dataclass, dataobject
+
+from hopeit_agents.mcp_client.tracing import span
+
+__all__ = [
+    "CircuitState",
+    "ReplicaSet",
+    "ReplicaSettings",
+    "ReplicaStats",
+    "ReplicasUnavailableError",
+    "replica_set",
+    "replica_stats",
+]
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state of a replica."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataobject
+@dataclass
+class ReplicaSettings:
+    """Circuit breaking and health probing of MCP server replicas.
+
+    A replica circuit opens after `failure_threshold` consecutive failed requests or a
+    failed health probe. Health probes run every `health_interval_seconds`, or not at
+    all when it is `None`.
+    """
+
+    failure_threshold: int = 3
+    open_seconds: float = 30.0
+    health_interval_seconds: float | None = 10.0
+    health_timeout_seconds: float = 2.0
+
+
+@dataobject
+@dataclass
+class ReplicaStats:
+    """Circuit state and request counters of a replica."""
+
+    url: str
+    state: CircuitState
+    outstanding: int
+    requests: int
+    failures: int
+    consecutive_failures: int
+
+
+class ReplicasUnavailableError(RuntimeError):
+    """Raised when the circuits of all replicas are open."""
+
+
+class _Replica:
+    __slots__ = ("health_url", "opened_at", "state", "stats", "trial_in_flight", "url")
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.url = url
+        self.health_url = f"{parts.scheme}://{parts.netloc}/"
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.stats = ReplicaStats(
+            url=url,
+            state=self.state,
+            outstanding=0,
+            requests=0,
+            failures=0,
+            consecutive_failures=0,
+        )
+
+    def set_state(self, state: CircuitState) -> None:
+        self.state = self.stats.state = state
+        if state is CircuitState.OPEN:
+            self.opened_at = monotonic()
+
+
+class ReplicaSet:
+    """Replicas of an MCP server with least-outstanding-request balancing."""
+
+    def __init__(self, urls: list[str], settings: ReplicaSettings) -> None:
+        self.settings = settings
+        self._replicas = [_Replica(url) for url in urls]
+        self._next = 0
+        self._probe_task: asyncio.Task[None] | None = None
+
+    @contextmanager
+    def endpoint(self, is_failure: Callable[[Exception], bool] = lambda _: True) -> Iterator[str]:
+        """Hold an outstanding request to the selected replica, yielding its URL.
+
+        Exceptions raised in the context count as failures of the replica when
+        `is_failure` returns True for them. Cancellations are not counted.
+
+        Raises `ReplicasUnavailableError` when the circuits of all replicas are open.
+        """
+        replica = self._select()
+        replica.stats.outstanding += 1
+        replica.stats.requests += 1
+        failed: bool | None = None
+        try:
+            yield replica.url
+            failed = False
+        except Exception as exc:
+            failed = is_failure(exc)
+            raise
+        finally:
+            replica.stats.outstanding -= 1
+            if failed is None:
+                replica.trial_in_flight = False
+            else:
+                self._record(replica, failed=failed)
+
+    def stats(self) -> list[ReplicaStats]:
+        """Return a copy of the stats of each replica."""
+        self._refresh()
+        return [ReplicaStats(**vars(replica.stats)) for replica in self._replicas]
+
+    def start_probes(self) -> None:
+        """Start health probes in the running event loop, if not already running."""
+        if self.settings.health_interval_seconds is None:
+            return
+        task = self._probe_task
+        loop = asyncio.get_running_loop()
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._probe_task = loop.create_task(self._probe_forever())
+
+    def stop_probes(self) -> None:
+        """Cancel the health probes task."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    async def probe(self) -> None:
+        """Probe the health route of each replica once."""
+        timeout = self.settings.health_timeout_seconds
+        async with httpx.AsyncClient(timeout=timeout) as http:
+            healthy = await asyncio.gather(
+                *(self._probe(http, replica) for replica in self._replicas)
+            )
+        for replica, ok in zip(self._replicas, healthy, strict=True):
+            if not ok:
+                if replica.state is not CircuitState.OPEN:
+                    replica.set_state(CircuitState.OPEN)
+            elif replica.state is CircuitState.OPEN:
+                replica.set_state(CircuitState.HALF_OPEN)
+
+    async def _probe(self, http: httpx.AsyncClient, replica: _Replica) -> bool:
+        with span("mcp.health_probe", replica=replica.url) as probe_span:
+            try:
+                response = await http.get(replica.health_url)
+            except httpx.HTTPError:
+                ok = False
+            else:
+                ok = response.status_code == 200
+            probe_span.set_attribute("healthy", ok)
+        return ok
+
+    async def _probe_forever(self) -> None:
+        while self.settings.health_interval_seconds is not None:
+            await asyncio.sleep(self.settings.health_interval_seconds)
+            await self.probe()
+
+    def _refresh(self) -> None:
+        """Move circuits open for longer than `open_seconds` to half-open."""
+        reopen_before = monotonic() - self.settings.open_seconds
+        for replica in self._replicas:
+            if replica.state is CircuitState.OPEN and replica.opened_at <= reopen_before:
+                replica.set_state(CircuitState.HALF_OPEN)
+
+    def _select(self) -> _Replica:
+        """Return the available replica with the fewest outstanding requests.
+
+        Replicas with the same number of outstanding requests are taken in turns.
+        """
+        self._refresh()
+        count = len(self._replicas)
+        selected: _Replica | None = None
+        for i in range(count):
+            replica = self._replicas[(self._next + i) % count]
+            if replica.state is CircuitState.OPEN or (
+                replica.state is CircuitState.HALF_OPEN and replica.trial_in_flight
+            ):
+                continue
+            if selected is None or replica.stats.outstanding < selected.stats.outstanding:
+                selected = replica
+        if selected is None:
+            raise ReplicasUnavailableError(
+                "All MCP server replicas are unavailable: "
+                + ", ".join(replica.url for replica in self._replicas)
+            )
+        self._next = (self._replicas.index(selected) + 1) % count
+        if selected.state is CircuitState.HALF_OPEN:
+            selected.trial_in_flight = True
+        return selected
+
+    def _record(self, replica: _Replica, *, failed: bool) -> None:
+        replica.trial_in_flight = False
+        if not failed:
+            replica.stats.consecutive_failures = 0
+            if replica.state is not CircuitState.CLOSED:
+                replica.set_state(CircuitState.CLOSED)
+            return
+        replica.stats.failures += 1
+        replica.stats.consecutive_failures += 1
+        if replica.state is CircuitState.HALF_OPEN or (
+            replica.stats.consecutive_failures >= self.settings.failure_threshold
+        ):
+            replica.set_state(CircuitState.OPEN)
+
+
+_replica_sets: dict[tuple[str, ...], ReplicaSet] = {}
+
+
+def replica_set(urls: list[str], settings: ReplicaSettings) -> ReplicaSet:
+    """Return the process-wide replica set for `urls`, applying `settings` if they changed.
+
+    Health probes are started in the running event loop.
+    """
+    key = tuple(urls)
+    replicas = _replica_sets.get(key)
+    if replicas is None:
+        replicas = _replica_sets[key] = ReplicaSet(urls, settings)
+    elif replicas.settings != settings:
+        replicas.settings = settings
+    replicas.start_probes()
+    return replicas
+
+
+def replica_stats() -> dict[str, list[ReplicaStats]]:
+    """Return replica stats of process-wide replica sets, by comma-separated URLs."""
+    return {",".join(urls): replicas.stats() for urls, replicas in _replica_sets.items()}
@@ -0,0 +1,103 @@
+"""MCP client session dispatching progress notifications and cancelling abandoned calls."""
+
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+
+import anyio
+from mcp import ClientSession, types
+from mcp.shared.message import MessageMetadata
+from mcp.shared.session import ProgressFnT, ReceiveResultT
+
+__all__ = [
+    "MCPSession",
+    "ProgressHandler",
+]
+
+ProgressHandler = Callable[[types.ProgressNotificationParams], Awaitable[None]]
+"""Receives the parameters of a progress notification, including their `_meta`."""
+
+CANCEL_TIMEOUT_SECONDS = 1.0
+
+
+class MCPSession(ClientSession):
+    """Client session keeping the server initialization result.
+
+    Progress notifications are passed to the handler registered in `progress_handlers`
+    for their progress token. Unlike the SDK progress callbacks, handlers receive the
+    notification `_meta`, and tokens are chosen by the caller, so they can be sent
+    along other request `_meta` fields.
+
+    When a `tools/call` request is cancelled, e.g. on timeout, the server is notified
+    with `notifications/cancelled` so it stops running the tool, also when the session
+    keeps being used for other requests.
+    """
+
+    initialize_result: types.InitializeResult | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.progress_handlers: dict[types.ProgressToken, ProgressHandler] = {}
+
+    async def initialize(self) -> types.InitializeResult:
+        self.initialize_result = await super().initialize()
+        return self.initialize_result
+
+    async def send_request(
+        self,
+        request: types.ClientRequest,
+        result_type: type[ReceiveResultT],
+        request_read_timeout_seconds: timedelta | None = None,
+        metadata: MessageMetadata = None,
+        progress_callback: ProgressFnT | None = None,
+    ) -> ReceiveResultT:
+        request_id = self._request_id  # Id assigned to the request by the SDK
+        try:
+            return await super().send_request(
+                request,
+                result_type,
+                request_read_timeout_seconds,
+                metadata,
+                progress_callback,
+            )
+        except anyio.get_cancelled_exc_class():
+            if isinstance(request.root, types.CallToolRequest):
+                await self._cancel(request_id)
+            raise
+
+    async def _cancel(self, request_id: types.RequestId) -> None:
+        """Notify the server that request `request_id` was cancelled.
+
+        Waits for the server to respond the cancelled request, so the response is not
+        received while the session is closing.
+        """
+        send, receive = anyio.create_memory_object_stream[
+            types.JSONRPCResponse | types.JSONRPCError
+        ](1)
+        self._response_streams[request_id] = send
+        try:
+            with anyio.move_on_after(CANCEL_TIMEOUT_SECONDS, shield=True):
+                await self.send_notification(
+                    types.ClientNotification(
+                        types.CancelledNotification(
+                            params=types.CancelledNotificationParams(
+                                requestId=request_id, reason="Cancelled by the client"
+                            ),
+                        )
+                    )
+                )
+                await receive.receive()
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream):
+            pass  # Session closed, the server stops its requests
+        finally:
+            self._response_streams.pop(request_id, None)
+            send.close()
+            receive.close()
+
+    async def _received_notification(self, notification: types.ServerNotification) -> None:
+        await super()._received_notification(notification)
+        if isinstance(notification.root, types.ProgressNotification):
+            params = notification.root.params
+            handler = self.progress_handlers.get(params.progressToken)
+            if handler is not None:
+                await handler(params)
@@ -0,0 +1,401 @@
+"""Pool of pre-spawned, initialized stdio MCP server processes.
+
+Launching a stdio MCP server for each request pays the server startup on every tool
+call. A pool keeps server processes running with an initialized session, and lends
+their sessions to requests, up to `max_concurrency` requests per process at a time.
+
+The pool starts `min_size` processes when created and grows up to `max_size` while all
+processes are busy. Processes are recycled after `max_calls` requests or when their
+resident memory exceeds `max_rss_mb`, and processes above `min_size` are stopped after
+`idle_seconds` without requests. A process is replaced when a request using it fails
+with a transport error or timeout, or when it exits unexpectedly.
+
+Resident memory and unexpected exits are checked every `check_interval_seconds` using
+`/proc`, so they are only detected on Linux; elsewhere processes are replaced when a
+request using them fails. Process ids are taken from the processes spawned by the SDK
+stdio transport, which reports them to the pool spawning the process.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from enum import Enum
+from functools import wraps
+from pathlib import Path
+from time import monotonic
+from typing import Any, TypeVar, cast
+
+from hopeit.dataobjects import dataclass, dataobject
+from mcp import ClientSession, StdioServerParameters, stdio_client
+from mcp.client import stdio as stdio_transport
+
+from hopeit_agents.mcp_client.session import MCPSession
+from hopeit_agents.mcp_client.tracing import span
+
+__all__ = [
+    "PooledProcessState",
+    "PooledProcessStats",
+    "StdioPoolSettings",
+    "StdioProcessPool",
+    "close_stdio_pools",
+    "stdio_pool",
+    "stdio_pool_stats",
+]
+
+_PROC = Path("/proc")
+
+_spawned_pid: ContextVar[Callable[[int], None] | None] = ContextVar("_spawned_pid", default=None)
+_ProcessFactory = TypeVar("_ProcessFactory", bound=Callable[..., Awaitable[Any]])
+
+
+def _reporting_pid(create_process: _ProcessFactory) -> _ProcessFactory:
+    """Wrap the SDK process factory to report the id of the process spawned by a pool."""
+
+    @wraps(create_process)
+    async def create(*args: Any, **kwargs: Any) -> Any:
+        process = await create_process(*args, **kwargs)
+        report = _spawned_pid.get()
+        if report is not None:
+            report(process.pid)
+        return process
+
+    return cast(_ProcessFactory, create)
+
+
+stdio_transport._create_platform_compatible_process = _reporting_pid(  # pylint: disable=protected-access
+    stdio_transport._create_platform_compatible_process  # pylint: disable=protected-access
+)
+
+
+class PooledProcessState(str, Enum):
+    """Lifecycle state of a pooled server process."""
+
+    STARTING = "starting"
+    READY = "ready"
+    RETIRING = "retiring"
+    STOPPED = "stopped"
+
+
+@dataobject
+@dataclass
+class StdioPoolSettings:
+    """Size, concurrency and recycling of a pool of stdio MCP server processes.
+
+    `max_calls` and `max_rss_mb` recycle processes after a number of requests or above
+    a resident memory size, and are not applied when `None`.
+    """
+
+    min_size: int = 1
+    max_size: int = 4
+    max_concurrency: int = 1
+    max_calls: int | None = 1000
+    max_rss_mb: float | None = None
+    idle_seconds: float = 300.0
+    acquire_timeout_seconds: float = 30.0
+    check_interval_seconds: float = 5.0
+
+
+@dataobject
+@dataclass
+class PooledProcessStats:
+    """State and counters of a pooled server process."""
+
+    number: int
+    pid: int | None
+    state: PooledProcessState
+    in_flight: int
+    calls: int
+    rss_mb: float | None = None
+
+
+class _PooledProcess:
+    __slots__ = (
+        "calls",
+        "error",
+        "in_flight",
+        "last_used",
+        "number",
+        "pid",
+        "ready",
+        "session",
+        "state",
+        "stop",
+        "task",
+    )
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.state = PooledProcessState.STARTING
+        self.session: ClientSession | None = None
+        self.pid: int | None = None
+        self.in_flight = 0
+        self.calls = 0
+        self.last_used = monotonic()
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.error: Exception | None = None
+
+    def set_pid(self, pid: int) -> None:
+        self.pid = pid
+
+    def stats(self) -> PooledProcessStats:
+        return PooledProcessStats(
+            number=self.number,
+            pid=self.pid,
+            state=self.state,
+            in_flight=self.in_flight,
+            calls=self.calls,
+            rss_mb=None if self.pid is None else _rss_mb(self.pid),
+        )
+
+
+class StdioProcessPool:
+    """Pre-spawned stdio MCP server processes sharing their initialized sessions."""
+
+    def __init__(self, params: StdioServerParameters, settings: StdioPoolSettings) -> None:
+        self.params = params
+        self.settings = settings
+        self._processes: list[_PooledProcess] = []
+        self._spawned = 0
+        self._waiting = 0
+        self._changed = asyncio.Event()
+        self._maintenance: asyncio.Task[None] | None = None
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop running the pool processes."""
+        return self._loop
+
+    def start(self) -> None:
+        """Spawn processes up to `min_size` and start checking processes periodically."""
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = self._loop.create_task(self._maintain())
+        for _ in range(self.settings.min_size - self._size()):
+            self._spawn()
+
+    async def close(self) -> None:
+        """Stop all processes and the periodic checks."""
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            self._maintenance = None
+        for process in self._processes:
+            process.state = PooledProcessState.RETIRING
+            process.stop.set()
+        tasks = [p.task for p in self._processes if p.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @asynccontextmanager
+    async def session(
+        self, is_failure: Callable[[Exception], bool] = lambda _: True
+    ) -> AsyncIterator[ClientSession]:
+        """Yield the session of a pooled process for one request.
+
+        When the request raises an exception for which `is_failure` returns True, the
+        process is replaced.
+        """
+        with span("mcp.pool.acquire") as acquire_span:
+            async with asyncio.timeout(self.settings.acquire_timeout_seconds):
+                process = await self._acquire()
+            acquire_span.set_attribute("process", process.number)
+        assert process.session is not None
+        try:
+            yield process.session
+        except Exception as exc:
+            if is_failure(exc):
+                self._retire(process)
+            raise
+        finally:
+            self._release(process)
+
+    def stats(self) -> list[PooledProcessStats]:
+        """Return the stats of each process in the pool."""
+        return [process.stats() for process in self._processes]
+
+    async def _acquire(self) -> _PooledProcess:
+        """Return a process to send a request, spawning one if all are busy.
+
+        A process is spawned only when there are more waiting requests than processes
+        starting, so a request does not spawn a process while a pre-spawned one starts.
+        """
+        self._waiting += 1
+        try:
+            while True:
+                changed = self._changed
+                max_calls = self.settings.max_calls
+                available = [
+                    p
+                    for p in self._processes
+                    if p.state is PooledProcessState.READY
+                    and p.in_flight < self.settings.max_concurrency
+                    and (max_calls is None or p.calls < max_calls)
+                ]
+                if available:
+                    process = min(available, key=lambda p: p.in_flight)
+                    process.in_flight += 1
+                    process.calls += 1
+                    return process
+                starting = sum(p.state is PooledProcessState.STARTING for p in self._processes)
+                if starting < self._waiting and self._size() < self.settings.max_size:
+                    spawned = self._spawn()
+                    await spawned.ready.wait()
+                    if spawned.session is None and spawned.error is not None:
+                        raise spawned.error
+                    continue
+                await changed.wait()
+        finally:
+            self._waiting -= 1
+
+    def _release(self, process: _PooledProcess) -> None:
+        process.in_flight -= 1
+        process.last_used = monotonic()
+        max_calls = self.settings.max_calls
+        if max_calls is not None and process.calls >= max_calls:
+            self._retire(process)
+        elif process.state is PooledProcessState.RETIRING and process.in_flight == 0:
+            process.stop.set()
+        self._notify()
+
+    def _retire(self, process: _PooledProcess) -> None:
+        """Stop lending `process`, stopping it once its requests finish, and replace it."""
+        if process.state is PooledProcessState.STOPPED:
+            return
+        process.state = PooledProcessState.RETIRING
+        if process.in_flight == 0:
+            process.stop.set()
+        if self._size() < self.settings.min_size:
+            self._spawn()
+
+    def _size(self) -> int:
+        """Number of processes starting or available to lend."""
+        return sum(
+            p.state in (PooledProcessState.STARTING, PooledProcessState.READY)
+            for p in self._processes
+        )
+
+    def _spawn(self) -> _PooledProcess:
+        self._spawned += 1
+        process = _PooledProcess(self._spawned)
+        self._processes.append(process)
+        process.task = self._loop.create_task(self._serve(process))
+        return process
+
+    async def _serve(self, process: _PooledProcess) -> None:
+        """Run a server process, keeping its session open until it is stopped."""
+        try:
+            async with AsyncExitStack() as stack:
+                with span("mcp.pool.spawn", process=process.number):
+                    reporting = _spawned_pid.set(process.set_pid)
+                    try:
+                        read, write = await stack.enter_async_context(stdio_client(self.params))
+                    finally:
+                        _spawned_pid.reset(reporting)
+                    session = await stack.enter_async_context(MCPSession(read, write))
+                    await session.initialize()
+                process.session = session
+                if process.state is PooledProcessState.STARTING:
+                    process.state = PooledProcessState.READY
+                process.ready.set()
+                self._notify()
+                await process.stop.wait()
+        except Exception as exc:  # pylint: disable=broad-except
+            process.error = exc  # Failed to start or exited unexpectedly
+        finally:
+            process.state = PooledProcessState.STOPPED
+            process.ready.set()
+            self._processes.remove(process)
+            self._notify()
+
+    async def _maintain(self) -> None:
+        """Replace exited processes, recycle large ones and stop idle ones."""
+        while True:
+            await asyncio.sleep(self.settings.check_interval_seconds)
+            idle_before = monotonic() - self.settings.idle_seconds
+            max_rss_mb = self.settings.max_rss_mb
+            for process in list(self._processes):
+                if process.state is not PooledProcessState.READY or process.pid is None:
+                    continue
+                if not _alive(process.pid):
+                    process.state = PooledProcessState.RETIRING
+                    process.stop.set()
+                elif max_rss_mb is not None and (_rss_mb(process.pid) or 0.0) > max_rss_mb:
+                    self._retire(process)
+            for process in list(self._processes):
+                if (
+                    self._size() > self.settings.min_size
+                    and process.state is PooledProcessState.READY
+                    and process.in_flight == 0
+                    and process.last_used < idle_before
+                ):
+                    self._retire(process)
+            for _ in range(self.settings.min_size - self._size()):
+                self._spawn()
+
+    def _notify(self) -> None:
+        """Wake up requests waiting for a process."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+def _alive(pid: int) -> bool:
+    """False when process `pid` exited, including not yet reaped ones."""
+    try:
+        stat = (_PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return False
+    return stat.rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+
+
+def _rss_mb(pid: int) -> float | None:
+    """Return the resident memory of process `pid` in MB, if available."""
+    try:
+        status = (_PROC / str(pid) / "status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return None
+
+
+_PoolKey = tuple[str, tuple[str, ...], str | None, tuple[tuple[str, str], ...]]
+_pools: dict[_PoolKey, StdioProcessPool] = {}
+
+
+def stdio_pool(params: StdioServerParameters, settings: StdioPoolSettings) -> StdioProcessPool:
+    """Return the process-wide pool for `params`, applying `settings` if they changed.
+
+    Pools run in the event loop where they are created, a new pool is created when
+    called from a different loop.
+    """
+    key: _PoolKey = (
+        params.command,
+        tuple(params.args),
+        None if params.cwd is None else str(params.cwd),
+        tuple(sorted((params.env or {}).items())),
+    )
+    pool = _pools.get(key)
+    if pool is None or pool.loop is not asyncio.get_running_loop():
+        pool = _pools[key] = StdioProcessPool(params, settings)
+    elif pool.settings != settings:
+        pool.settings = settings
+    pool.start()
+    return pool
+
+
+async def close_stdio_pools() -> None:
+    """Stop the processes of the process-wide pools running in the current event loop."""
+    loop = asyncio.get_running_loop()
+    for key, pool in list(_pools.items()):
+        if pool.loop is loop:
+            del _pools[key]
+            await pool.close()
+
+
+def stdio_pool_stats() -> dict[str, list[PooledProcessStats]]:
+    """Return process stats of process-wide pools, by server command line."""
+    return {
+        " ".join((pool.params.command, *pool.params.args)): pool.stats() for pool in _pools.values()
+    }
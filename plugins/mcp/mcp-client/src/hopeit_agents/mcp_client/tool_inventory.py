@@ -0,0 +1,166 @@
+"""Process-wide tool inventories refreshed on `notifications/tools/list_changed`.
+
+An inventory caches the tool list of an MCP server for all the clients of the process,
+and keeps a subscription session open with the server, which lists tools when opened
+and again each time the server notifies that its tools changed. While the subscription
+is open and the server supports `list_changed` notifications, the cached list does not
+expire. Otherwise, e.g. while reconnecting, the cached list expires after
+`ttl_seconds`, as without a subscription.
+
+The subscription session is pinged every `ttl_seconds`, at least a second, to detect
+lost connections, and opened again after the same interval when it fails. Call
+`close_tool_inventories` on shutdown to close the subscription sessions.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable, Hashable
+from contextlib import AbstractAsyncContextManager
+from time import monotonic
+from typing import Any
+
+from mcp import ClientSession, types
+from mcp.client.session import MessageHandlerFnT
+
+from hopeit_agents.mcp_client.models import ToolDescriptor
+from hopeit_agents.mcp_client.tracing import span
+
+__all__ = [
+    "SubscriptionOpener",
+    "ToolInventory",
+    "close_tool_inventories",
+    "tool_inventory",
+]
+
+logger = logging.getLogger(__name__)
+
+SubscriptionOpener = Callable[
+    [MessageHandlerFnT], AbstractAsyncContextManager[tuple[ClientSession, bool]]
+]
+"""Opens a session passing it a message handler, yielding it and whether the server
+supports `list_changed` notifications."""
+
+ToolConverter = Callable[[types.Tool], ToolDescriptor]
+
+
+class ToolInventory:
+    """Cached tool list of an MCP server, kept up to date by a subscription session."""
+
+    def __init__(self, ttl_seconds: float, name: str = "") -> None:
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.subscribed = False
+        self.version = 0
+        self._tools: tuple[float, list[ToolDescriptor]] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._changed = asyncio.Event()
+
+    def cached(self) -> list[ToolDescriptor] | None:
+        """Return the cached tools, unless invalidated or expired."""
+        cache = self._tools
+        if cache is None:
+            return None
+        if self.subscribed or monotonic() - cache[0] < self.ttl_seconds:
+            return cache[1]
+        return None
+
+    def store(self, tools: list[ToolDescriptor], version: int) -> None:
+        """Cache `tools` listed at inventory `version`, unless invalidated since."""
+        if version == self.version:
+            self._tools = (monotonic(), tools)
+
+    def invalidate(self) -> None:
+        """Drop the cached tools and tool lists being fetched."""
+        self.version += 1
+        self._tools = None
+
+    def subscribe(self, open_session: SubscriptionOpener, convert: ToolConverter) -> None:
+        """Keep a subscription session open in the running event loop.
+
+        Tools listed by the subscription are converted to descriptors with `convert`.
+        """
+        task = self._task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._changed = asyncio.Event()
+            self._task = loop.create_task(self._subscription(open_session, convert))
+
+    def unsubscribe(self) -> None:
+        """Close the subscription session."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.subscribed = False
+
+    async def close(self) -> None:
+        """Close the subscription session and wait until it is closed."""
+        task = self._task
+        self.unsubscribe()
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _on_message(self, message: Any) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            with span("mcp.tools_list_changed"):
+                self.invalidate()
+                self._changed.set()
+
+    async def _subscription(self, open_session: SubscriptionOpener, convert: ToolConverter) -> None:
+        while True:
+            interval = max(self.ttl_seconds, 1.0)
+            try:
+                async with open_session(self._on_message) as (session, list_changed):
+                    # Tools may have changed while not subscribed
+                    self.invalidate()
+                    self.subscribed = list_changed
+                    await self._refresh(session, convert, interval)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning(
+                    "Tool subscription to %s failed, retrying in %.1fs",
+                    self.name,
+                    interval,
+                    exc_info=True,
+                )
+            finally:
+                self.subscribed = False
+            await asyncio.sleep(interval)
+
+    async def _refresh(
+        self, session: ClientSession, convert: ToolConverter, interval: float
+    ) -> None:
+        """List tools on `session` now and after each notification, pinging it meanwhile."""
+        changed = True
+        while True:
+            if changed:
+                self._changed.clear()
+                version = self.version
+                with span("mcp.list_tools", subscription=True) as list_span:
+                    result = await asyncio.wait_for(session.list_tools(), timeout=interval)
+                    list_span.set_attribute("tools", len(result.tools))
+                self.store([convert(tool) for tool in result.tools], version)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=interval)
+                changed = True
+            except TimeoutError:
+                await asyncio.wait_for(session.send_ping(), timeout=interval)
+                changed = False
+
+
+_inventories: dict[Hashable, ToolInventory] = {}
+
+
+def tool_inventory(key: Hashable, ttl_seconds: float) -> ToolInventory:
+    """Return the process-wide inventory of the MCP server identified by `key`."""
+    inventory = _inventories.get(key)
+    if inventory is None:
+        inventory = _inventories[key] = ToolInventory(ttl_seconds, name=str(key))
+    inventory.ttl_seconds = ttl_seconds
+    return inventory
+
+
+async def close_tool_inventories() -> None:
+    """Close the subscription sessions of the process-wide inventories."""
+    for inventory in list(_inventories.values()):
+        await inventory.close()
@@ -0,0 +1,304 @@
+"""Tracing spans to measure where time goes in agent, model and MCP client calls.
+
+Spans follow the OpenTelemetry data model: each has a trace id shared by all spans of
+a trace, its own span id, the id of its parent span, start and end timestamps in unix
+nanoseconds, attributes and a status. The current span is kept in a context variable,
+so spans opened while another is active, including from tasks it spawns, become its
+children and export to the same exporter.
+
+Tracing is disabled unless an exporter is given to a root span or set process-wide with
+`set_span_exporter`: `span` then returns a shared no-op span without recording anything.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from time import time_ns
+from typing import Protocol, TextIO
+
+from hopeit.dataobjects import dataclass, dataobject, field
+from hopeit.dataobjects.payload import Payload
+
+__all__ = [
+    "JsonlSpanExporter",
+    "Span",
+    "SpanExporter",
+    "SpanRecord",
+    "current_span",
+    "jsonl_span_exporter",
+    "set_span_exporter",
+    "span",
+]
+
+AttributeValue = str | int | float | bool
+
+
+@dataobject
+@dataclass
+class SpanRecord:
+    """Finished span as exported, using OpenTelemetry field names and status codes."""
+
+    trace_id: str
+    span_id: str
+    name: str
+    start_time_unix_nano: int
+    end_time_unix_nano: int
+    parent_span_id: str | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    status_code: str = "UNSET"
+    status_message: str | None = None
+
+
+class SpanExporter(Protocol):
+    """Receives spans as they finish."""
+
+    def export(self, record: SpanRecord) -> None:
+        """Export a finished span."""
+        ...
+
+
+class Span:
+    """Span being recorded. Use `span` to create one."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "start_time_unix_nano",
+        "attributes",
+        "status_code",
+        "status_message",
+        "exporter",
+    )
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_time_unix_nano: int
+    attributes: dict[str, AttributeValue]
+    status_code: str
+    status_message: str | None
+    exporter: "SpanExporter | None"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        exporter: SpanExporter | None,
+        parent: "Span | None" = None,
+        attributes: dict[str, AttributeValue] | None = None,
+    ) -> None:
+        self.name = name
+        self.exporter = exporter
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_time_unix_nano = time_ns()
+        self.attributes = attributes or {}
+        self.status_code = "UNSET"
+        self.status_message = None
+
+    @property
+    def recording(self) -> bool:
+        """False for the no-op span returned when tracing is disabled."""
+        return self.exporter is not None
+
+    def set_attribute(self, key: str, value: AttributeValue | None) -> None:
+        """Set an attribute. None values are ignored."""
+        if self.exporter is not None and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: AttributeValue | None) -> None:
+        """Set several attributes. None values are ignored."""
+        if self.exporter is not None:
+            self.attributes.update((k, v) for k, v in attributes.items() if v is not None)
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed with the given exception."""
+        if self.exporter is not None:
+            self.status_code = "ERROR"
+            self.status_message = str(exc)
+            self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        """Finish the span and export it."""
+        if self.exporter is None:
+            return
+        if self.status_code == "UNSET":
+            self.status_code = "OK"
+        self.exporter.export(
+            SpanRecord(
+                trace_id=self.trace_id,
+                span_id=self.span_id,
+                name=self.name,
+                start_time_unix_nano=self.start_time_unix_nano,
+                end_time_unix_nano=time_ns(),
+                parent_span_id=self.parent_span_id,
+                attributes=self.attributes,
+                status_code=self.status_code,
+                status_message=self.status_message,
+            )
+        )
+
+
+class _NoopSpan(Span):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        self.name = ""
+        self.exporter = None
+        self.trace_id = self.span_id = ""
+        self.parent_span_id = None
+        self.start_time_unix_nano = 0
+        self.attributes = {}
+        self.status_code = "UNSET"
+        self.status_message = None
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Span | None] = ContextVar("hopeit_agents_span", default=None)
+_default_exporter: SpanExporter | None = None
+
+
+def set_span_exporter(exporter: SpanExporter | None) -> None:
+    """Set the process-wide exporter used by root spans, or None to disable tracing."""
+    global _default_exporter
+    _default_exporter = exporter
+
+
+def current_span() -> Span:
+    """Return the active span, or the no-op span when there is none."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(
+    name: str, *, exporter: SpanExporter | None = None, **attributes: AttributeValue | None
+) -> Iterator[Span]:
+    """Record a span around the enclosed block, as a child of the active span.
+
+    `exporter` only applies to root spans; child spans export to their parent exporter.
+    Exceptions raised in the block are recorded in the span and propagated.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        exporter = parent.exporter
+    elif exporter is None:
+        exporter = _default_exporter
+    if exporter is None:
+        yield _NOOP_SPAN
+        return
+
+    current = Span(
+        name,
+        exporter=exporter,
+        parent=parent,
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+class JsonlSpanExporter:
+    """Appends finished spans as JSON lines to a local file.
+
+    Spans are queued and written by a background thread that keeps the file open, so
+    exporting from the event loop does not wait on file I/O. `flush` waits until spans
+    exported so far are written; `read` and interpreter exit flush the queue.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+
+    def export(self, record: SpanRecord) -> None:
+        self._queue.put(Payload.to_json(record) + "\n")
+        if self._writer is None:
+            self._start_writer()
+
+    def flush(self) -> None:
+        """Wait until spans exported so far are written to the file."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write pending spans and stop the writer thread, closing the file."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def read(self) -> list[SpanRecord]:
+        """Return spans exported to the file so far."""
+        self.flush()
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return [Payload.from_json(line, datatype=SpanRecord) for line in f if line.strip()]
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write, name=f"span-writer:{self.path}", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write(self) -> None:
+        """Write queued lines in batches until `close`, keeping the file open."""
+        file: TextIO | None = None
+        try:
+            while True:
+                lines = [self._queue.get()]
+                while True:
+                    try:
+                        lines.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    if file is None:
+                        self.path.parent.mkdir(parents=True, exist_ok=True)
+                        file = open(self.path, "a", encoding="utf-8")
+                    file.write("".join(line for line in lines if line is not None))
+                    file.flush()
+                except OSError:
+                    logging.getLogger(__name__).exception("Failed to write spans to %s", self.path)
+                finally:
+                    for _ in lines:
+                        self._queue.task_done()
+                if None in lines:
+                    return
+        finally:
+            if file is not None:
+                file.close()
+
+
+_jsonl_exporters: dict[str, JsonlSpanExporter] = {}
+
+
+def jsonl_span_exporter(path: str) -> JsonlSpanExporter:
+    """Return the process-wide exporter writing to `path`."""
+    exporter = _jsonl_exporters.get(path)
+    if exporter is None:
+        exporter = JsonlSpanExporter(path)
+        _jsonl_exporters[path] = exporter
+    return exporter
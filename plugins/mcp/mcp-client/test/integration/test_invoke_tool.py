@@ -1,5 +1,7 @@
 """Integration tests for the invoke_tool API event."""
 
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from hopeit.testing.apps import config, execute_event
 
@@ -47,12 +49,14 @@ async def test_invoke_tool_returns_execution_result(monkeypatch: pytest.MonkeyPa
             *,
             call_id: str | None,
             session_id: str | None,
+            deadline: datetime | None,
         ) -> ToolExecutionResult:
             captured["call_args"] = {
                 "tool_name": tool_name,
                 "payload": payload,
                 "call_id": call_id,
                 "session_id": session_id,
+                "deadline": deadline,
             }
             return expected_result
 
@@ -60,11 +64,13 @@ async def test_invoke_tool_returns_execution_result(monkeypatch: pytest.MonkeyPa
     monkeypatch.setattr(invoke_tool_module, "MCPClient", FakeClient)
 
     app_config = config("plugins/mcp/mcp-client/config/plugin-config.json")
+    deadline = datetime.now(UTC) + timedelta(seconds=30)
     payload = ToolInvocation(
         tool_name="demo/tool.sum",
         payload={"a": 1, "b": 2},
         call_id="call-123",
         session_id="session-1",
+        deadline=deadline,
     )
 
     response = await execute_event(app_config, "api.invoke_tool", payload)
@@ -75,5 +81,6 @@ async def test_invoke_tool_returns_execution_result(monkeypatch: pytest.MonkeyPa
         "payload": {"a": 1, "b": 2},
         "call_id": "call-123",
         "session_id": "session-1",
+        "deadline": deadline,
     }
     assert captured["client_env"] == {"ENV_FLAG": "invoke"}
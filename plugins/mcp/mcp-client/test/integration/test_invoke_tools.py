@@ -0,0 +1,71 @@
+"""Integration tests for the invoke_tools API event."""
+
+import pytest
+from hopeit.testing.apps import config, execute_event
+
+from hopeit_agents.mcp_client.api import invoke_tools as invoke_tools_module
+from hopeit_agents.mcp_client.models import (
+    MCPClientConfig,
+    ToolBatchResult,
+    ToolExecutionResult,
+    ToolExecutionStatus,
+    ToolInvocation,
+    ToolInvocationBatch,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("max_concurrency", "expected"), [(None, 4), (2, 2), (100, 4)])
+async def test_invoke_tools_returns_batch_result(
+    monkeypatch: pytest.MonkeyPatch, max_concurrency: int | None, expected: int
+) -> None:
+    """invoke_tools event should run the batch with the MCP client and count failures.
+
+    Requested concurrency is limited to the configured `batch_concurrency`.
+    """
+
+    captured: dict[str, object] = {}
+
+    class FakeClient:
+        def __init__(self, *, config: MCPClientConfig, env: dict[str, str]) -> None:
+            captured["client_config"] = config
+
+        async def call_tools(
+            self,
+            invocations: list[ToolInvocation],
+            *,
+            max_concurrency: int,
+            call_timeout_seconds: float | None,
+        ) -> list[ToolExecutionResult]:
+            captured["call_args"] = (len(invocations), max_concurrency, call_timeout_seconds)
+            return [
+                ToolExecutionResult(
+                    call_id=invocation.call_id or "",
+                    tool_name=invocation.tool_name,
+                    status=(
+                        ToolExecutionStatus.ERROR
+                        if invocation.tool_name == "missing"
+                        else ToolExecutionStatus.SUCCESS
+                    ),
+                )
+                for invocation in invocations
+            ]
+
+    monkeypatch.setattr(invoke_tools_module, "MCPClient", FakeClient)
+
+    app_config = config("plugins/mcp/mcp-client/config/plugin-config.json")
+    payload = ToolInvocationBatch(
+        invocations=[
+            ToolInvocation(tool_name="demo/tool.sum", payload={"a": 1, "b": 2}, call_id="c1"),
+            ToolInvocation(tool_name="missing", call_id="c2"),
+        ],
+        max_concurrency=max_concurrency,
+        call_timeout_seconds=5.0,
+    )
+
+    response = await execute_event(app_config, "api.invoke_tools", payload)
+
+    assert isinstance(response, ToolBatchResult)
+    assert [r.call_id for r in response.results] == ["c1", "c2"]
+    assert (response.success_count, response.error_count) == (1, 1)
+    assert captured["call_args"] == (2, expected, 5.0)
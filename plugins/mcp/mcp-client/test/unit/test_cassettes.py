@@ -0,0 +1,99 @@
+"""Unit tests for cassette record and replay."""
+
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+from mcp import types
+
+from hopeit_agents.mcp_client.cassettes import (
+    Cassette,
+    CassetteMissError,
+    CassetteMode,
+    CassetteSettings,
+)
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
+from hopeit_agents.mcp_client.models import MCPClientConfig, ToolExecutionStatus, Transport
+
+
+class RecordingSession:
+    """Session stub answering `tools/list` and `tools/call`."""
+
+    async def list_tools(self) -> types.ListToolsResult:
+        return types.ListToolsResult(tools=[types.Tool(name="sum", inputSchema={"type": "object"})])
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> types.CallToolResult:
+        total = arguments["a"] + arguments["b"]
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=str(total))],
+            structuredContent={"result": total},
+        )
+
+
+def _config(path: Path, mode: CassetteMode) -> MCPClientConfig:
+    return MCPClientConfig(
+        transport=Transport.HTTP,
+        url="http://mcp/mcp",
+        tool_cache_seconds=0.0,
+        cassette=CassetteSettings(path=str(path), mode=mode, speed=0.0),
+    )
+
+
+def test_request_key_is_canonical() -> None:
+    assert Cassette.request_key({"a": 1, "b": [1, 2]}) == Cassette.request_key(
+        {"b": [1, 2], "a": 1}
+    )
+    assert Cassette.request_key({"a": 1}) != Cassette.request_key({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_responses_in_order(tmp_path: Path) -> None:
+    path = tmp_path / "cassette.jsonl"
+    recorder = Cassette(CassetteSettings(path=str(path), mode=CassetteMode.RECORD))
+    await recorder.record("key", {"n": 1}, latency_seconds=0.2)
+    await recorder.record("key", {"n": 2}, latency_seconds=0.2)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "key", "late')  # interrupted write
+
+    player = Cassette(CassetteSettings(path=str(path), speed=0.0))
+
+    assert [await player.replay("key") for _ in range(3)] == [{"n": 1}, {"n": 2}, {"n": 2}]
+    with pytest.raises(CassetteMissError):
+        await player.replay("other")
+
+
+@pytest.mark.asyncio
+async def test_mcp_client_records_and_replays(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    path = tmp_path / "mcp.jsonl"
+
+    @asynccontextmanager
+    async def fake_session(self: MCPClient) -> AsyncGenerator[RecordingSession, None]:
+        yield RecordingSession()
+
+    monkeypatch.setattr(MCPClient, "_session", fake_session, raising=False)
+    recorder = MCPClient(config=_config(path, CassetteMode.RECORD))
+    recorded_tools = await recorder.list_tools()
+    recorded = await recorder.call_tool("sum", {"a": 1, "b": 2}, call_id="call-1")
+
+    @asynccontextmanager
+    async def no_session(self: MCPClient) -> AsyncGenerator[RecordingSession, None]:
+        raise AssertionError("Replay must not open sessions")
+        yield RecordingSession()  # pragma: no cover
+
+    monkeypatch.setattr(MCPClient, "_session", no_session, raising=False)
+    player = MCPClient(config=_config(path, CassetteMode.REPLAY))
+    replayed_tools = await player.list_tools()
+    replayed = await player.call_tool("sum", {"b": 2, "a": 1}, call_id="call-2")
+
+    assert replayed_tools == recorded_tools
+    assert replayed.status is ToolExecutionStatus.SUCCESS
+    assert replayed.call_id == "call-2"
+    assert replayed.structured_content == recorded.structured_content == {"result": 3}
+    assert replayed.content == recorded.content
+    with pytest.raises(MCPClientError) as miss:
+        await player.call_tool("sum", {"a": 2, "b": 2})
+    assert isinstance(miss.value.__cause__, CassetteMissError)
@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from types import SimpleNamespace
 from typing import Any
 
 import pytest
 from mcp import types
 
+from hopeit_agents.mcp_client import client as client_module
 from hopeit_agents.mcp_client.client import MCPClient
-from hopeit_agents.mcp_client.models import MCPClientConfig, Transport
+from hopeit_agents.mcp_client.models import (
+    MCPClientConfig,
+    ToolDescriptor,
+    ToolExecutionStatus,
+    ToolInvocation,
+    Transport,
+)
 
 
 def _client_config() -> MCPClientConfig:
@@ -73,3 +82,134 @@ async def test_list_tools_uses_cache(monkeypatch: pytest.MonkeyPatch) -> None:
     assert tools_first == tools_second
     assert len(session_holder) == 1
     assert session_holder[0].list_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_inprocess_transport_dispatches_to_handler(monkeypatch: pytest.MonkeyPatch) -> None:
+    """INPROCESS transport calls tools registered in this process without sessions."""
+    calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def invoke_tool(
+        tool_name: str, payload: dict[str, Any], headers: dict[str, str], *, deadline: Any
+    ) -> dict[str, Any]:
+        calls.append((tool_name, payload))
+        if tool_name != "sum":
+            raise ValueError(f"Invalid tool name: '{tool_name}'.")
+        return {"result": payload["a"] + payload["b"]}
+
+    tool = types.Tool(name="sum", inputSchema={"type": "object"})
+    handler = SimpleNamespace(tool_list=lambda: [tool], invoke_tool=invoke_tool)
+    monkeypatch.setattr(client_module, "_inprocess_handler", lambda: handler)
+
+    @asynccontextmanager
+    async def no_session(self: MCPClient) -> AsyncGenerator[DummySession, None]:
+        raise AssertionError("INPROCESS transport must not open sessions")
+        yield DummySession()  # pragma: no cover
+
+    monkeypatch.setattr(MCPClient, "_session", no_session, raising=False)
+    client = MCPClient(config=MCPClientConfig(transport=Transport.INPROCESS))
+
+    tools = await client.list_tools()
+    result = await client.call_tool("sum", {"a": 1, "b": 2}, call_id="call-1")
+    error = await client.call_tool("missing", None)
+
+    assert [t.name for t in tools] == ["sum"]
+    assert result.status is ToolExecutionStatus.SUCCESS
+    assert result.call_id == "call-1"
+    assert result.structured_content == {"result": 3}
+    assert error.status is ToolExecutionStatus.ERROR
+    assert error.error_message == "Invalid tool name: 'missing'."
+    assert calls == [("sum", {"a": 1, "b": 2}), ("missing", {})]
+
+
+def test_listed_tools_share_schemas() -> None:
+    """Schemas are interned when tools are listed, not when descriptors are built."""
+    schema = {"type": "object", "properties": {"a": {"type": "number"}}}
+    listed = [
+        MCPClient._tool_from_mcp(types.Tool(name="sum", inputSchema=dict(schema))) for _ in range(2)
+    ]
+    built = [
+        ToolDescriptor(
+            name="sum", title=None, description=None, input_schema=dict(schema), output_schema=None
+        )
+        for _ in range(2)
+    ]
+
+    assert listed[0].input_schema is listed[1].input_schema
+    assert built[0].input_schema is not built[1].input_schema
+
+
+def test_tool_result_compact_mode() -> None:
+    """Compact results skip raw_result and text content repeating structured content."""
+    result = types.CallToolResult(
+        content=[
+            types.TextContent(type="text", text='{\n  "result": 3\n}'),
+            types.TextContent(type="text", text="note"),
+        ],
+        structuredContent={"result": 3},
+    )
+
+    full = MCPClient._tool_result_from_mcp("sum", result, call_id="call-1", session_id=None)
+    compact = MCPClient._tool_result_from_mcp(
+        "sum", result, call_id="call-1", session_id=None, compact=True
+    )
+
+    assert full.raw_result == result.model_dump(mode="json")
+    assert len(full.content) == 2
+    assert compact.raw_result is None
+    assert [item["text"] for item in compact.content] == ["note"]
+    assert compact.structured_content == {"result": 3}
+    assert compact.raw() == {
+        "content": compact.content,
+        "isError": False,
+        "structuredContent": {"result": 3},
+    }
+
+
+@pytest.mark.asyncio
+async def test_call_tools_shares_sessions_with_partial_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Batches run over shared sessions, returning ERROR results for failed calls."""
+    sessions: list[str] = []
+
+    async def send_call_tool(
+        session: str, tool_name: str, payload: dict[str, Any] | None, meta: Any
+    ) -> types.CallToolResult:
+        if tool_name == "slow":
+            await asyncio.sleep(1.0)
+        if tool_name == "broken":
+            raise OSError("connection reset")
+        return types.CallToolResult(content=[], structuredContent={"session": session})
+
+    @asynccontextmanager
+    async def fake_session(self: MCPClient) -> AsyncGenerator[str, None]:
+        sessions.append(f"s{len(sessions)}")
+        yield sessions[-1]
+
+    monkeypatch.setattr(MCPClient, "_session", fake_session, raising=False)
+    monkeypatch.setattr(MCPClient, "_send_call_tool", staticmethod(send_call_tool))
+    client = MCPClient(config=_client_config())
+    names = ["sum", "slow", "sum", "broken", "sum", "sum"]
+
+    results = await client.call_tools(
+        [ToolInvocation(tool_name=name, call_id=f"c{i}") for i, name in enumerate(names)],
+        max_concurrency=2,
+        call_timeout_seconds=0.05,
+    )
+
+    assert [r.call_id for r in results] == [f"c{i}" for i in range(len(names))]
+    assert [r.status is ToolExecutionStatus.SUCCESS for r in results] == [
+        True,
+        False,
+        True,
+        False,
+        True,
+        True,
+    ]
+    assert results[1].error_message == "Timed out calling tool 'slow'"
+    assert results[3].error_message == "connection reset"
+    assert len(sessions) == 2
+
+    assert await client.call_tools([]) == []
+    assert len(sessions) == 2  # No session opened for an empty batch
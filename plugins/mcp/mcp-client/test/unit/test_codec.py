@@ -0,0 +1,46 @@
+"""Unit tests for the JSON codecs."""
+
+import pytest
+
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.codec import (
+    JsonCodec,
+    OrjsonCodec,
+    PydanticCoreCodec,
+    StdlibJsonCodec,
+)
+
+VALUE = {"b": [1, 2.5, None, True], "a": {"text": "año ✓", "empty": {}}}
+
+
+def _codecs() -> list[JsonCodec]:
+    codecs: list[JsonCodec] = [PydanticCoreCodec(), StdlibJsonCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+    return codecs
+
+
+@pytest.mark.parametrize("json_codec", _codecs(), ids=lambda c: c.name)
+def test_codecs_output(json_codec: JsonCodec) -> None:
+    assert json_codec.dumpb(VALUE) == (
+        '{"b":[1,2.5,null,true],"a":{"text":"año ✓","empty":{}}}'.encode()
+    )
+    assert json_codec.dumpb({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+    assert json_codec.dumpb({"a": [1]}, indent=True) == b'{\n  "a": [\n    1\n  ]\n}'
+    assert json_codec.loads(json_codec.dumpb(VALUE)) == VALUE
+    with pytest.raises(ValueError):
+        json_codec.loads("{invalid")
+
+
+def test_set_json_codec() -> None:
+    current = codec.json_codec()
+    stdlib = StdlibJsonCodec()
+    codec.set_json_codec(stdlib)
+    try:
+        assert codec.json_codec() is stdlib
+        assert codec.dumps({"a": 1}) == '{"a":1}'
+        assert codec.loads(b"[1]") == [1]
+    finally:
+        codec.set_json_codec(current)
@@ -0,0 +1,138 @@
+"""Unit tests for tool progress notifications and cancellation of tool calls."""
+
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
+from hopeit_agents.mcp_client.models import (
+    MCPClientConfig,
+    ToolExecutionStatus,
+    ToolProgress,
+    Transport,
+)
+from hopeit_agents.mcp_client.stdio_pool import StdioPoolSettings, close_stdio_pools
+
+# Server reporting progress with partial output, and writing a file when a call is cancelled
+SERVER = """
+import sys
+
+import anyio
+from mcp import types
+from mcp.server.lowlevel.server import Server
+from mcp.server.stdio import stdio_server
+
+server = Server("progress-test")
+
+
+@server.list_tools()
+async def list_tools():
+    return [
+        types.Tool(name=name, inputSchema={"type": "object"}) for name in ("slow", "steps")
+    ]
+
+
+@server.call_tool()
+async def call_tool(name, arguments):
+    context = server.request_context
+    if name == "slow":
+        try:
+            await anyio.sleep(30)
+        except anyio.get_cancelled_exc_class():
+            with open(sys.argv[1], "w") as file:
+                file.write("cancelled")
+            raise
+    token = None if context.meta is None else context.meta.progressToken
+    for step in (1, 2) if token is not None else ():
+        await context.session.send_notification(
+            types.ServerNotification(
+                types.ProgressNotification(
+                    params=types.ProgressNotificationParams(
+                        progressToken=token,
+                        progress=step,
+                        total=2,
+                        message=f"step {step}",
+                        _meta=types.NotificationParams.Meta(
+                            **{"hopeit.agents/partial": {"items": list(range(step))}}
+                        ),
+                    )
+                )
+            ),
+            related_request_id=context.request_id,
+        )
+    return {"items": [0, 1]}
+
+
+async def main():
+    async with stdio_server() as (read, write):
+        await server.run(read, write, server.create_initialization_options())
+
+
+anyio.run(main)
+"""
+
+
+@pytest.fixture(autouse=True)
+async def close_pools() -> AsyncIterator[None]:
+    yield
+    await close_stdio_pools()
+
+
+def _client(tmp_path: Path, stdio_pool: StdioPoolSettings | None = None) -> MCPClient:
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return MCPClient(
+        MCPClientConfig(
+            command=sys.executable,
+            args=[str(script), str(tmp_path / "cancelled")],
+            transport=Transport.STDIO,
+            stdio_pool=stdio_pool,
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_call_tool_reports_progress(tmp_path: Path) -> None:
+    reported: list[ToolProgress] = []
+
+    async def on_progress(progress: ToolProgress) -> None:
+        reported.append(progress)
+
+    result = await _client(tmp_path).call_tool(
+        "steps", {}, call_id="call-1", on_progress=on_progress
+    )
+
+    assert result.status is ToolExecutionStatus.SUCCESS
+    assert result.structured_content == {"items": [0, 1]}
+    assert reported == [
+        ToolProgress(
+            call_id="call-1",
+            tool_name="steps",
+            progress=1.0,
+            total=2.0,
+            message="step 1",
+            partial_content={"items": [0]},
+        ),
+        ToolProgress(
+            call_id="call-1",
+            tool_name="steps",
+            progress=2.0,
+            total=2.0,
+            message="step 2",
+            partial_content={"items": [0, 1]},
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_call_is_cancelled_on_server(tmp_path: Path) -> None:
+    client = _client(tmp_path, StdioPoolSettings(min_size=1, max_size=1))
+
+    with pytest.raises(MCPClientError):
+        await client.call_tool("slow", {}, timeout=1.0)
+
+    assert (tmp_path / "cancelled").read_text() == "cancelled"
+    result = await client.call_tool("steps", {})  # Pooled session still usable
+    assert result.status is ToolExecutionStatus.SUCCESS
@@ -0,0 +1,195 @@
+"""Unit tests for MCP server replica balancing and circuit breaking."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from mcp import types
+
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
+from hopeit_agents.mcp_client.models import MCPClientConfig, Transport
+from hopeit_agents.mcp_client.replicas import (
+    CircuitState,
+    ReplicaSet,
+    ReplicaSettings,
+    ReplicasUnavailableError,
+    replica_set,
+)
+
+URLS = ["http://replica-a/mcp", "http://replica-b/mcp"]
+
+
+def _replicas(failure_threshold: int = 3, open_seconds: float = 60.0) -> ReplicaSet:
+    settings = ReplicaSettings(
+        failure_threshold=failure_threshold,
+        open_seconds=open_seconds,
+        health_interval_seconds=None,
+    )
+    return ReplicaSet(URLS, settings)
+
+
+def _fail(replicas: ReplicaSet, url: str) -> None:
+    with pytest.raises(OSError):
+        with replicas.endpoint() as selected:
+            assert selected == url
+            raise OSError("connection refused")
+
+
+def _states(replicas: ReplicaSet) -> dict[str, CircuitState]:
+    return {s.url: s.state for s in replicas.stats()}
+
+
+def test_least_outstanding_requests() -> None:
+    replicas = _replicas()
+
+    with replicas.endpoint() as first:
+        with replicas.endpoint() as second:
+            with replicas.endpoint() as third:
+                assert {s.url: s.outstanding for s in replicas.stats()} == {
+                    first: 2,
+                    second: 1,
+                }
+    assert {first, second} == set(URLS)
+    assert third == first
+    assert [s.requests for s in replicas.stats()] == [2, 1]
+
+
+def test_circuit_opens_half_opens_and_closes() -> None:
+    replicas = _replicas(failure_threshold=2)
+
+    _fail(replicas, URLS[0])
+    _fail(replicas, URLS[1])
+    _fail(replicas, URLS[0])
+    assert _states(replicas) == {URLS[0]: CircuitState.OPEN, URLS[1]: CircuitState.CLOSED}
+
+    with replicas.endpoint() as url:
+        assert url == URLS[1]
+
+    replicas.settings.open_seconds = 0.0
+    assert _states(replicas)[URLS[0]] is CircuitState.HALF_OPEN
+    with replicas.endpoint() as url:
+        assert url == URLS[0]
+        with replicas.endpoint() as other:
+            assert other == URLS[1]  # Single trial request while half-open
+    assert _states(replicas) == {URLS[0]: CircuitState.CLOSED, URLS[1]: CircuitState.CLOSED}
+
+
+def test_fails_fast_when_all_circuits_open() -> None:
+    replicas = _replicas(failure_threshold=1)
+    _fail(replicas, URLS[0])
+    _fail(replicas, URLS[1])
+
+    with pytest.raises(ReplicasUnavailableError):
+        with replicas.endpoint():
+            pass
+
+
+def test_failures_excluded_by_predicate() -> None:
+    replicas = _replicas(failure_threshold=1)
+
+    with pytest.raises(ValueError):
+        with replicas.endpoint(lambda exc: not isinstance(exc, ValueError)):
+            raise ValueError("protocol error")
+
+    assert _states(replicas)[URLS[0]] is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_health_probes() -> None:
+    async def health(_: web.Request) -> web.Response:
+        return web.Response(text="OK")
+
+    app = web.Application()
+    app.router.add_get("/", health)
+    async with TestServer(app) as server:
+        healthy_url = str(server.make_url("/mcp"))
+        replicas = ReplicaSet(
+            [healthy_url, "http://127.0.0.1:9/mcp"],
+            ReplicaSettings(failure_threshold=1, open_seconds=60.0, health_timeout_seconds=1.0),
+        )
+        _fail(replicas, healthy_url)
+
+        await replicas.probe()
+
+    assert [s.state for s in replicas.stats()] == [CircuitState.HALF_OPEN, CircuitState.OPEN]
+
+
+@pytest.mark.asyncio
+async def test_client_balances_and_fails_fast(monkeypatch: pytest.MonkeyPatch) -> None:
+    urls = ["http://client-replica-a/mcp", "http://client-replica-b/mcp"]
+    config = MCPClientConfig(
+        transport=Transport.HTTP,
+        replicas=urls,
+        replica_settings=ReplicaSettings(
+            failure_threshold=1, open_seconds=60.0, health_interval_seconds=None
+        ),
+        tool_cache_seconds=0.0,
+    )
+    used: list[str] = []
+    failing = {urls[1]}
+
+    class Session:
+        async def list_tools(self) -> types.ListToolsResult:
+            return types.ListToolsResult(tools=[])
+
+    @asynccontextmanager
+    async def http_session(
+        self: MCPClient, url: str, message_handler: object = None
+    ) -> AsyncIterator[Session]:
+        used.append(url)
+        if url in failing:
+            raise OSError("connection refused")
+        yield Session()
+
+    monkeypatch.setattr(MCPClient, "_http_session", http_session)
+    client = MCPClient(config)
+
+    assert await client.list_tools() == []
+    with pytest.raises(OSError):
+        await client.list_tools()
+    assert await client.list_tools() == []
+    assert used == [urls[0], urls[1], urls[0]]
+
+    failing.add(urls[0])
+    with pytest.raises(OSError):
+        await client.list_tools()
+    with pytest.raises(MCPClientError):
+        await client.list_tools()
+    assert len(used) == 4
+
+
+@pytest.mark.asyncio
+async def test_client_call_timeouts_do_not_open_circuits(monkeypatch: pytest.MonkeyPatch) -> None:
+    urls = ["http://slow-replica-a/mcp", "http://slow-replica-b/mcp"]
+    config = MCPClientConfig(
+        transport=Transport.HTTP,
+        replicas=urls,
+        replica_settings=ReplicaSettings(
+            failure_threshold=1, open_seconds=60.0, health_interval_seconds=None
+        ),
+    )
+
+    class Session:
+        async def call_tool(self, *_: object) -> types.CallToolResult:
+            await asyncio.sleep(1.0)
+            return types.CallToolResult(content=[])
+
+    @asynccontextmanager
+    async def http_session(
+        self: MCPClient, url: str, message_handler: object = None
+    ) -> AsyncIterator[Session]:
+        yield Session()
+
+    monkeypatch.setattr(MCPClient, "_http_session", http_session)
+    client = MCPClient(config)
+
+    for _ in range(3):
+        with pytest.raises(MCPClientError):
+            await client.call_tool("slow", {}, timeout=0.01)
+
+    replicas = replica_set(urls, config.replica_settings)
+    assert [s.state for s in replicas.stats()] == [CircuitState.CLOSED, CircuitState.CLOSED]
+    assert [s.failures for s in replicas.stats()] == [0, 0]
@@ -0,0 +1,88 @@
+"""Unit tests for the pool of stdio MCP server processes."""
+
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
+from hopeit_agents.mcp_client.models import MCPClientConfig, ToolExecutionStatus, Transport
+from hopeit_agents.mcp_client.stdio_pool import (
+    PooledProcessState,
+    StdioPoolSettings,
+    close_stdio_pools,
+    stdio_pool_stats,
+)
+
+SERVER = """
+import os
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("pool-test")
+
+
+@server.tool()
+def pid() -> int:
+    return os.getpid()
+
+
+@server.tool()
+def crash() -> int:
+    os._exit(1)
+
+
+server.run("stdio")
+"""
+
+
+@pytest.fixture(autouse=True)
+async def close_pools() -> AsyncIterator[None]:
+    yield
+    await close_stdio_pools()
+    assert not stdio_pool_stats()
+
+
+def _client(tmp_path: Path, settings: StdioPoolSettings) -> MCPClient:
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return MCPClient(
+        MCPClientConfig(
+            command=sys.executable,
+            args=[str(script)],
+            transport=Transport.STDIO,
+            call_timeout_seconds=10.0,
+            stdio_pool=settings,
+        )
+    )
+
+
+async def _pid(client: MCPClient) -> int:
+    result = await client.call_tool("pid", {})
+    assert result.status is ToolExecutionStatus.SUCCESS
+    return int(result.structured_content["result"])  # type: ignore[call-overload,index]
+
+
+@pytest.mark.asyncio
+async def test_processes_are_reused_and_recycled(tmp_path: Path) -> None:
+    client = _client(tmp_path, StdioPoolSettings(min_size=1, max_size=1, max_calls=2))
+
+    pids = [await _pid(client) for _ in range(3)]
+
+    assert pids[0] == pids[1] != pids[2]
+
+
+@pytest.mark.asyncio
+async def test_crashed_process_is_replaced(tmp_path: Path) -> None:
+    settings = StdioPoolSettings(min_size=1, max_size=2, max_concurrency=2)
+    client = _client(tmp_path, settings)
+    pid = await _pid(client)
+
+    with pytest.raises(MCPClientError):
+        await client.call_tool("crash", {})
+
+    new_pid = await _pid(client)
+
+    assert new_pid != pid
+    (processes,) = [p for cmd, p in stdio_pool_stats().items() if str(tmp_path) in cmd]
+    assert [(p.pid, p.state) for p in processes] == [(new_pid, PooledProcessState.READY)]
@@ -0,0 +1,94 @@
+"""Unit tests for tool inventories refreshed by list_changed notifications."""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.mcp_client.client import MCPClient
+from hopeit_agents.mcp_client.models import MCPClientConfig, Transport
+from hopeit_agents.mcp_client.tool_inventory import (
+    ToolInventory,
+    close_tool_inventories,
+    tool_inventory,
+)
+
+# Server adding a tool, and notifying sessions that listed tools, after the first list
+SERVER = """
+import asyncio
+
+import anyio
+from mcp import types
+from mcp.server.lowlevel.server import NotificationOptions, Server
+from mcp.server.stdio import stdio_server
+
+server = Server("inventory-test")
+tools = [types.Tool(name="first", inputSchema={"type": "object"})]
+sessions = []
+
+
+async def add_tool():
+    await asyncio.sleep(0.2)
+    tools.append(types.Tool(name="second", inputSchema={"type": "object"}))
+    for session in sessions:
+        await session.send_tool_list_changed()
+
+
+@server.list_tools()
+async def list_tools():
+    if not sessions:
+        asyncio.get_running_loop().create_task(add_tool())
+    sessions.append(server.request_context.session)
+    return tools
+
+
+async def main():
+    async with stdio_server() as (read, write):
+        options = server.create_initialization_options(NotificationOptions(tools_changed=True))
+        await server.run(read, write, options)
+
+
+anyio.run(main)
+"""
+
+
+@pytest.mark.asyncio
+async def test_tools_refreshed_on_list_changed(tmp_path: Path) -> None:
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    config = MCPClientConfig(
+        command=sys.executable,
+        args=[str(script)],
+        transport=Transport.STDIO,
+        tool_cache_seconds=60.0,
+        subscribe_tool_changes=True,
+    )
+    client = MCPClient(config)
+    inventory = tool_inventory(client._server_key(), config.tool_cache_seconds)
+
+    try:
+        assert [tool.name for tool in await client.list_tools()] == ["first"]
+        async with asyncio.timeout(10.0):
+            while len(await MCPClient(config).list_tools()) < 2:
+                await asyncio.sleep(0.05)
+        assert inventory.subscribed
+        assert [tool.name for tool in await MCPClient(config).list_tools()] == ["first", "second"]
+    finally:
+        await close_tool_inventories()
+    assert not inventory.subscribed
+
+
+@pytest.mark.asyncio
+async def test_subscription_failures_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    def open_session(handler):  # type: ignore[no-untyped-def]
+        raise ConnectionError("refused")
+
+    inventory = ToolInventory(ttl_seconds=60.0, name="failing-server")
+    with caplog.at_level(logging.WARNING, logger="hopeit_agents.mcp_client.tool_inventory"):
+        inventory.subscribe(open_session, lambda tool: tool)  # type: ignore[arg-type,return-value]
+        await asyncio.sleep(0.05)
+        await inventory.close()
+    assert "Tool subscription to failing-server failed" in caplog.text
+    assert "refused" in caplog.text
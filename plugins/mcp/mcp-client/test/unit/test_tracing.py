@@ -0,0 +1,94 @@
+"""Unit tests for tracing spans."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.mcp_client.tracing import (
+    JsonlSpanExporter,
+    SpanRecord,
+    current_span,
+    set_span_exporter,
+    span,
+)
+
+
+class ListExporter:
+    def __init__(self) -> None:
+        self.records: list[SpanRecord] = []
+
+    def export(self, record: SpanRecord) -> None:
+        self.records.append(record)
+
+
+def test_span_without_exporter_is_noop() -> None:
+    with span("root", attr="value") as root:
+        root.set_attribute("other", 1)
+        with span("child") as child:
+            assert child is root
+    assert not root.recording
+    assert not root.attributes
+    assert not current_span().recording
+
+
+@pytest.mark.asyncio
+async def test_spans_record_parents_across_tasks() -> None:
+    exporter = ListExporter()
+
+    async def work(i: int) -> None:
+        with span("task", index=i):
+            await asyncio.sleep(0)
+
+    with span("root", exporter=exporter, skipped=None) as root:
+        await asyncio.gather(work(0), work(1))
+        root.set_attribute("tasks", 2)
+
+    tasks, root_record = exporter.records[:2], exporter.records[2]
+    assert root_record.name == "root"
+    assert root_record.parent_span_id is None
+    assert root_record.attributes == {"tasks": 2}
+    assert root_record.status_code == "OK"
+    assert root_record.end_time_unix_nano >= root_record.start_time_unix_nano
+    assert sorted(r.attributes["index"] for r in tasks) == [0, 1]
+    for record in tasks:
+        assert record.trace_id == root_record.trace_id
+        assert record.parent_span_id == root_record.span_id
+    assert not current_span().recording
+
+
+def test_span_records_errors_to_jsonl_file(tmp_path: Path) -> None:
+    exporter = JsonlSpanExporter(tmp_path / "spans.jsonl")
+    set_span_exporter(exporter)
+    try:
+        with pytest.raises(ValueError):
+            with span("root"):
+                with span("child"):
+                    raise ValueError("boom")
+    finally:
+        set_span_exporter(None)
+
+    child, root = exporter.read()
+    assert child.name == "child"
+    assert child.parent_span_id == root.span_id
+    assert child.status_code == root.status_code == "ERROR"
+    assert child.status_message == "boom"
+    assert child.attributes == {"exception.type": "ValueError"}
+
+
+def test_jsonl_exporter_writes_spans_in_background(tmp_path: Path) -> None:
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = JsonlSpanExporter(path)
+    for i in range(100):
+        with span(f"span-{i}", exporter=exporter):
+            pass
+
+    exporter.flush()
+    assert len(path.read_text().splitlines()) == 100
+
+    exporter.close()
+    with span("after-close", exporter=exporter):
+        pass
+    records = exporter.read()
+    assert [r.name for r in records] == [f"span-{i}" for i in range(100)] + ["after-close"]
+    exporter.close()
@@ -0,0 +1,91 @@
+"""Content-addressed local store for large tool results sent as blob handles.
+
+Clients opt in by sending, in the `tools/call` request `_meta`, the size in bytes above
+which results are returned as blob handles. Results larger than that are written once to
+the store, named by the SHA-256 of their JSON content, and the tool call returns a
+`resource_link` content block to the blob instead of the inline result. The link `_meta`
+includes the blob digest, so clients on the same host, configured with the store
+directory, can read, or memory-map, the file directly. Other clients read it with
+`resources/read`.
+
+The store directory is set with the `HOPEIT_AGENTS_BLOB_DIR` environment variable, by
+default `hopeit-agents-blobs` in the system temporary directory. Blobs are removed
+`HOPEIT_AGENTS_BLOB_TTL_SECONDS` after they were last stored, one hour by default.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from time import monotonic, time
+
+from hopeit_agents.mcp_client.models import blob_path
+
+__all__ = [
+    "BLOB_URI_PREFIX",
+    "BlobStore",
+    "blob_store",
+]
+
+BLOB_URI_PREFIX = "hopeit-blob://sha256/"
+
+_PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class BlobStore:
+    """Blobs stored as files in `root`, named by the SHA-256 digest of their content."""
+
+    def __init__(self, root: Path, ttl_seconds: float) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self._pruned = monotonic()
+
+    def put(self, data: bytes) -> tuple[str, Path]:
+        """Store `data`, if not stored already, returning its digest and path."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            path.touch()  # Keep it for another `ttl_seconds`
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp, path)  # Readers never see partially written blobs
+        if monotonic() - self._pruned > _PRUNE_INTERVAL_SECONDS:
+            self.prune()
+        return digest, path
+
+    def read(self, digest: str) -> bytes:
+        """Return the content of blob `digest`, raising `FileNotFoundError` if missing."""
+        return self.path(digest).read_bytes()
+
+    def path(self, digest: str) -> Path:
+        """Return the path of blob `digest`."""
+        return blob_path(self.root, digest)
+
+    def prune(self) -> None:
+        """Remove blobs not stored in the last `ttl_seconds`."""
+        self._pruned = monotonic()
+        expired = time() - self.ttl_seconds
+        for path in self.root.glob("??/*"):
+            try:
+                if path.stat().st_mtime < expired:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_store: BlobStore | None = None
+
+
+def blob_store() -> BlobStore:
+    """Return the process-wide blob store, configured from environment variables."""
+    global _store
+    if _store is None:
+        root = os.environ.get("HOPEIT_AGENTS_BLOB_DIR") or os.path.join(
+            tempfile.gettempdir(), "hopeit-agents-blobs"
+        )
+        ttl = float(os.environ.get("HOPEIT_AGENTS_BLOB_TTL_SECONDS", "3600"))
+        _store = BlobStore(Path(root), ttl)
+    return _store
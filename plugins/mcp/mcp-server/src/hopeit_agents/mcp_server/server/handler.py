@@ -1,8 +1,10 @@
 """Register hopeit events as MCP tools and dispatch incoming calls."""
 
+import asyncio
 import logging
 import uuid
 from collections.abc import Awaitable, Callable
+from dataclasses import replace
 from datetime import UTC, datetime
 from functools import partial
 from typing import Any
@@ -20,12 +22,16 @@ from hopeit.server.names import snakecase
 from hopeit.server.steps import find_datatype_handler
 
 from hopeit_agents.mcp_server.tools import api
+from hopeit_agents.mcp_server.tools.progress import ProgressReporter, track_progress
 
 logger: EngineLoggerWrapper = logging.getLogger(__name__)  # type: ignore
 extra = extra_logger()
 
 
-CallableHandler = Callable[[dict[str, Any], dict[str, str] | None], Awaitable[dict[str, Any]]]
+CallableHandler = Callable[
+    [dict[str, Any], dict[str, str] | None, datetime | None, ProgressReporter | None],
+    Awaitable[dict[str, Any]],
+]
 
 
 class Server:
@@ -37,6 +43,7 @@ class Server:
 
 
 _server = Server()
+_listeners: list[Callable[[], None]] = []
 auth_info_default: dict[str, str] = {}
 
 
@@ -53,6 +60,18 @@ def reset() -> None:
     """
     _server.tools.clear()
     _server.handlers.clear()
+    _tools_changed()
+
+
+def on_tools_changed(listener: Callable[[], None]) -> None:
+    """Call `listener` each time registered tools change."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _tools_changed() -> None:
+    for listener in _listeners:
+        listener()
 
 
 def register_tool(
@@ -89,6 +108,15 @@ def register_tool(
         raise RuntimeError(f"Tool name {tool_name} duplicated at runtime.")
     _server.tools.append(tool)
     _server.handlers[tool_name] = handler
+    _tools_changed()
+
+
+def unregister_tool(tool_name: str) -> None:
+    """Remove the tool registered as `tool_name`, if any."""
+    if _server.handlers.pop(tool_name, None) is None:
+        return
+    _server.tools[:] = [tool for tool in _server.tools if tool.name != tool_name]
+    _tools_changed()
 
 
 def tool_list() -> list[mcp.types.Tool]:
@@ -101,12 +129,20 @@ async def invoke_tool(
     # auth_types: list[AuthType],
     payload_raw: dict[str, Any],
     headers: dict[str, str] | None,
+    *,
+    deadline: datetime | None = None,
+    progress: ProgressReporter | None = None,
 ) -> dict[str, Any]:
-    """Execute the handler associated with `tool_name` using the provided payload."""
+    """Execute the handler associated with `tool_name` using the provided payload.
+
+    When the caller provides a `deadline`, the event runs with its `response_timeout`
+    limited to the remaining time and is cancelled once the deadline is reached.
+    Progress reported by the event is sent to the caller using `progress`, if provided.
+    """
     handler = _server.handlers.get(tool_name)
     if handler is None:
         raise ValueError(f"Invalid tool name: '{tool_name}'.")
-    return await handler(payload_raw, headers)
+    return await handler(payload_raw, headers, deadline, progress)
 
 
 async def _handle_tool_invocation(
@@ -117,19 +153,29 @@ async def _handle_tool_invocation(
     # auth_types: list[AuthType],
     payload_raw: dict[str, Any],
     headers: dict[str, str] | None,
+    deadline: datetime | None = None,
+    progress: ProgressReporter | None = None,
 ) -> dict[str, Any]:
     """Execute a tool call from MCP by invoking the underlying hopeit event."""
     context = None
     try:
         event_settings = get_event_settings(app_engine.settings, event_name)
+        timeout = _remaining_seconds(deadline, event_settings.response_timeout)
+        if timeout is not None:
+            event_settings = replace(event_settings, response_timeout=timeout)
         context = _request_start(app_engine, impl, event_name, event_settings, headers)
+        if progress is not None:
+            track_progress(context, progress)
         # _validate_authorization(app_engine.app_config, context, auth_types, request)
         payload = Payload.from_obj(payload_raw, datatype)
-        result = await _request_execute(
-            impl,
-            event_name,
-            context,
-            payload,
+        result = await asyncio.wait_for(
+            _request_execute(
+                impl,
+                event_name,
+                context,
+                payload,
+            ),
+            timeout=timeout,
         )
         return Payload.to_obj(result)  # type: ignore[return-value]
     except Exception as e:  # pylint: disable=broad-except
@@ -137,6 +183,16 @@ async def _handle_tool_invocation(
         raise
 
 
+def _remaining_seconds(deadline: datetime | None, response_timeout: float) -> float | None:
+    """Return the time left until the caller deadline, capped to the event response timeout."""
+    if deadline is None:
+        return None
+    remaining = (deadline - datetime.now(tz=UTC)).total_seconds()
+    if remaining <= 0.0:
+        raise TimeoutError(f"Deadline exceeded before executing tool: {deadline.isoformat()}")
+    return min(remaining, response_timeout)
+
+
 def _request_start(
     app_engine: AppEngine,
     plugin: AppEngine,
@@ -3,8 +3,10 @@
 import asyncio
 import gc
 import logging
-from collections.abc import AsyncGenerator
+import weakref
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
 from contextlib import asynccontextmanager
+from datetime import UTC, datetime
 from typing import Any
 
 import uvicorn
@@ -13,16 +15,27 @@ from hopeit.server import runtime
 from hopeit.server.config import ServerConfig, parse_server_config_json
 from hopeit.server.logger import EngineLoggerWrapper, engine_logger, extra_logger
 from mcp import types
-from mcp.server.lowlevel.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.lowlevel.server import NotificationOptions, Server
+from mcp.server.session import ServerSession
 from mcp.server.stdio import stdio_server
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from pydantic import AnyUrl
 from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
 from starlette.routing import Mount, Route
 
+from hopeit_agents.mcp_client import codec
+from hopeit_agents.mcp_client.models import (
+    BLOB_META_KEY,
+    BLOB_THRESHOLD_META_KEY,
+    DEADLINE_META_KEY,
+)
 from hopeit_agents.mcp_server.server import handler
+from hopeit_agents.mcp_server.server.blobs import BLOB_URI_PREFIX, blob_store
 from hopeit_agents.mcp_server.tools import api as tools_api
+from hopeit_agents.mcp_server.tools.progress import PARTIAL_META_KEY, ProgressReporter
 
 logger: EngineLoggerWrapper = logging.getLogger(__name__)  # type: ignore
 extra = extra_logger()
@@ -32,10 +45,85 @@ InitOptions = Any
 
 HTTP_ENDPOINT = "/mcp"
 
-mcp_server = Server(
+
+class _ToolsServer(Server):
+    """MCP server advertising `notifications/tools/list_changed` support.
+
+    Sessions that listed tools are notified when registered tools change. Tool results
+    returned as blob handles omit their structured content, after it is validated.
+    """
+
+    def __init__(self, name: str, instructions: str) -> None:
+        super().__init__(name=name, instructions=instructions)
+        self.tool_sessions: weakref.WeakSet[ServerSession] = weakref.WeakSet()
+        self._notify_tasks: set[asyncio.Task[None]] = set()
+        self._notify_loop: asyncio.AbstractEventLoop | None = None
+
+    def create_initialization_options(
+        self,
+        notification_options: NotificationOptions | None = None,
+        experimental_capabilities: dict[str, dict[str, Any]] | None = None,
+    ) -> InitOptions:
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(tools_changed=True),
+            experimental_capabilities,
+        )
+
+    def tools_changed(self) -> None:
+        """Send `list_changed` notifications to sessions that listed tools.
+
+        Changes until the notifications are sent, e.g. registering several tools in the
+        same event loop iteration, are sent as a single notification to each session.
+        """
+        if not self.tool_sessions:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # Tools registered without a running server
+            return
+        if self._notify_loop is loop:
+            return  # Already scheduled
+        self._notify_loop = loop
+        task = loop.create_task(self._notify_sessions())
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    async def _notify_sessions(self) -> None:
+        self._notify_loop = None
+        await asyncio.gather(*(self._notify(session) for session in list(self.tool_sessions)))
+
+    async def _notify(self, session: ServerSession) -> None:
+        try:
+            await session.send_tool_list_changed()
+        except Exception:  # pylint: disable=broad-except
+            self.tool_sessions.discard(session)  # Closed session
+
+    def call_tool(
+        self, *, validate_input: bool = True
+    ) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        register = super().call_tool(validate_input=validate_input)
+
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            register(func)
+            validated = self.request_handlers[types.CallToolRequest]
+
+            async def call_tool_handler(req: Any) -> types.ServerResult:
+                result = await validated(req)
+                if isinstance(result.root, types.CallToolResult) and _is_blob(result.root):
+                    result.root.structuredContent = None
+                return result
+
+            self.request_handlers[types.CallToolRequest] = call_tool_handler
+            return func
+
+        return decorator
+
+
+mcp_server = _ToolsServer(
     name="hopeit-agents-mcp-server",
     instructions="Expose hopeit agents tool plugins as MCP tools.",
 )
+handler.on_tools_changed(mcp_server.tools_changed)
 
 
 def run_app(
@@ -90,14 +178,134 @@ def run_app(
 
 @mcp_server.list_tools()
 async def list_tools() -> list[types.Tool]:
-    """Return the MCP tool definitions currently registered with the server."""
+    """Return the MCP tool definitions currently registered with the server.
+
+    The requesting session is notified when registered tools change.
+    """
+    mcp_server.tool_sessions.add(mcp_server.request_context.session)
     return handler.tool_list()
 
 
 @mcp_server.call_tool()
-async def call_tool(name: str, arguments: dict[str, Any] | None) -> dict[str, Any]:
-    """Invoke a registered tool by name, forwarding the optional arguments payload."""
-    return await handler.invoke_tool(name, arguments or {}, headers={})
+async def call_tool(
+    name: str, arguments: dict[str, Any] | None
+) -> tuple[list[types.ContentBlock], dict[str, Any]]:
+    """Invoke a registered tool by name, forwarding the optional arguments payload.
+
+    Returns the structured result together with its JSON text content. When the request
+    includes a `progressToken`, progress reported by the tool is sent to the caller.
+    """
+    result = await handler.invoke_tool(
+        name,
+        arguments or {},
+        headers={},
+        deadline=_request_deadline(),
+        progress=_progress_reporter(),
+    )
+    data = _json_bytes(result)
+    threshold = _blob_threshold()
+    if threshold is not None and len(data) > threshold:
+        return [await _blob_link(data)], result
+    return [types.TextContent(type="text", text=data.decode())], result
+
+
+@mcp_server.read_resource()
+async def read_resource(uri: AnyUrl) -> Iterable[ReadResourceContents]:
+    """Return the content of a blob returned by a tool call as a blob handle."""
+    value = str(uri)
+    if not value.startswith(BLOB_URI_PREFIX):
+        raise ValueError(f"Unknown resource: {value}")
+    data = await asyncio.to_thread(blob_store().read, value.removeprefix(BLOB_URI_PREFIX))
+    return [ReadResourceContents(content=data, mime_type="application/json")]
+
+
+async def _blob_link(data: bytes) -> types.ResourceLink:
+    """Store `data` as a blob, returning a link to it."""
+    digest, _ = await asyncio.to_thread(blob_store().put, data)
+    return types.ResourceLink(
+        type="resource_link",
+        name=f"blob-{digest[:12]}",
+        uri=AnyUrl(BLOB_URI_PREFIX + digest),
+        mimeType="application/json",
+        size=len(data),
+        _meta={BLOB_META_KEY: {"sha256": digest, "size": len(data)}},
+    )
+
+
+def _is_blob(result: types.CallToolResult) -> bool:
+    """True when `result` content is a link to a blob with the result."""
+    return len(result.content) == 1 and bool(
+        isinstance(link := result.content[0], types.ResourceLink)
+        and link.meta
+        and BLOB_META_KEY in link.meta
+    )
+
+
+def _blob_threshold() -> int | None:
+    """Return the size above which the caller accepts results as blob handles, if any."""
+    meta = mcp_server.request_context.meta
+    value = None if meta is None else getattr(meta, BLOB_THRESHOLD_META_KEY, None)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _progress_reporter() -> ProgressReporter | None:
+    """Return a reporter sending progress notifications for the current request, if requested."""
+    context = mcp_server.request_context
+    token = None if context.meta is None else context.meta.progressToken
+    if token is None:
+        return None
+    session, request_id = context.session, context.request_id
+
+    async def report(
+        progress: float,
+        total: float | None,
+        message: str | None,
+        partial: dict[str, Any] | list[Any] | None,
+    ) -> None:
+        meta = (
+            None
+            if partial is None
+            else types.NotificationParams.Meta(**{PARTIAL_META_KEY: partial})
+        )
+        await session.send_notification(
+            types.ServerNotification(
+                types.ProgressNotification(
+                    params=types.ProgressNotificationParams(
+                        progressToken=token,
+                        progress=progress,
+                        total=total,
+                        message=message,
+                        _meta=meta,
+                    ),
+                )
+            ),
+            related_request_id=request_id,
+        )
+
+    return report
+
+
+def _json_bytes(result: dict[str, Any]) -> bytes:
+    """Return `result` as indented UTF-8 JSON, using the process-wide JSON codec.
+
+    Replaces the text content built by the MCP SDK with the output of the codec set
+    with `codec.set_json_codec`, by default orjson when installed, else pydantic_core.
+    """
+    return codec.dumpb(result, indent=True)
+
+
+def _request_deadline() -> datetime | None:
+    """Return the caller deadline sent in the current request `_meta`, if any."""
+    meta = mcp_server.request_context.meta
+    value = None if meta is None else getattr(meta, DEADLINE_META_KEY, None)
+    if not isinstance(value, str):
+        return None
+    try:
+        deadline = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(__name__, f"Ignoring invalid deadline in request _meta: {value}")
+        return None
+    return deadline if deadline.tzinfo else deadline.replace(tzinfo=UTC)
 
 
 def _create_http_app(
@@ -0,0 +1,61 @@
+"""Report progress and partial results of tool events to MCP clients.
+
+Events exposed as tools call `report_progress` with their `EventContext`. When the tool
+was called by an MCP client requesting progress, with a `progressToken`, a
+`notifications/progress` message is sent to the client, carrying partial structured
+output in its `_meta`. Otherwise, e.g. when the event is invoked through its HTTP API,
+reporting progress does nothing.
+"""
+
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
+from hopeit.app.context import EventContext
+from hopeit.dataobjects.payload import Payload
+
+from hopeit_agents.mcp_client.models import PARTIAL_META_KEY
+
+__all__ = [
+    "PARTIAL_META_KEY",
+    "ProgressReporter",
+    "report_progress",
+    "track_progress",
+]
+
+ProgressReporter = Callable[
+    [float, float | None, str | None, dict[str, Any] | list[Any] | None], Awaitable[None]
+]
+"""Sends progress, total, message and partial output of a tool call to its caller."""
+
+_reporters: weakref.WeakKeyDictionary[EventContext, ProgressReporter] = weakref.WeakKeyDictionary()
+
+
+def track_progress(context: EventContext, reporter: ProgressReporter) -> None:
+    """Send progress reported for the event executed with `context` using `reporter`."""
+    _reporters[context] = reporter
+
+
+async def report_progress(
+    context: EventContext,
+    progress: float,
+    *,
+    total: float | None = None,
+    message: str | None = None,
+    partial: Any = None,
+) -> None:
+    """Report progress of the tool call executing the event with `context`.
+
+    `progress` should increase on each report, `total` is optional. `partial` output,
+    a dataobject or its JSON-compatible representation, is sent to the caller with the
+    progress notification.
+    """
+    reporter = _reporters.get(context)
+    if reporter is None:
+        return
+    partial_obj: dict[str, Any] | list[Any] | None
+    if partial is None or isinstance(partial, dict | list):
+        partial_obj = partial
+    else:
+        partial_obj = cast(dict[str, Any], Payload.to_obj(partial))
+    await reporter(progress, total, message, partial_obj)
@@ -1,20 +1,25 @@
 """Integration test that exercises the MCP server over HTTP and stdio with example tools."""
 
 import asyncio
+import json
+import mmap
 from collections.abc import AsyncGenerator
 from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 
 import pytest
 import uvicorn
 from mcp import ClientSession, types
 from mcp.client.streamable_http import streamablehttp_client
 
-from hopeit_agents.mcp_client.client import MCPClient
+from hopeit_agents.mcp_client.client import MCPClient, MCPClientError
 from hopeit_agents.mcp_client.models import (
     MCPClientConfig,
     ToolExecutionStatus,
     Transport,
 )
+from hopeit_agents.mcp_server.server import blobs as blobs_module
 from hopeit_agents.mcp_server.server import handler as handler_module
 from hopeit_agents.mcp_server.server import mcp as mcp_server
 
@@ -129,6 +134,71 @@ async def test_mcp_server_serves_example_tools(
     assert value == 123
 
 
+async def test_mcp_server_applies_forwarded_deadline(
+    mcp_http_endpoint: tuple[str, int],
+) -> None:
+    """Tool calls carrying a deadline succeed before it and fail fast after it."""
+    host, port = mcp_http_endpoint
+    client = MCPClient(
+        config=MCPClientConfig(transport=Transport.HTTP, host=host, port=port),
+    )
+
+    result = await client.call_tool(
+        tool_name="tool-sum-two-numbers",
+        payload={"a": 1, "b": 2},
+        deadline=datetime.now(UTC) + timedelta(seconds=10),
+    )
+    assert result.status == ToolExecutionStatus.SUCCESS
+    assert result.structured_content == {"result": 3}
+
+    with pytest.raises(MCPClientError):
+        await client.call_tool(
+            tool_name="tool-sum-two-numbers",
+            payload={"a": 1, "b": 2},
+            deadline=datetime.now(UTC) - timedelta(seconds=1),
+        )
+
+
+async def test_mcp_server_returns_large_results_as_blobs(
+    mcp_http_endpoint: tuple[str, int],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Results above the client blob threshold are returned as handles and loaded lazily."""
+    blob_dir = tmp_path / "blobs"
+    monkeypatch.setattr(blobs_module, "_store", blobs_module.BlobStore(blob_dir, 3600.0))
+    host, port = mcp_http_endpoint
+    client = MCPClient(
+        config=MCPClientConfig(
+            transport=Transport.HTTP,
+            host=host,
+            port=port,
+            blob_threshold_bytes=1,
+            blob_dir=str(blob_dir),
+        ),
+    )
+
+    result = await client.call_tool("tool-sum-two-numbers", {"a": 1, "b": 2})
+
+    assert result.status == ToolExecutionStatus.SUCCESS
+    assert result.structured_content is None
+    assert result.blob is not None
+    loaded = await client.load_blob(result)
+    assert loaded.structured_content == {"result": 3}
+    async with client.open_blob(result.blob) as data:
+        assert isinstance(data, mmap.mmap)
+
+    # Read from the server when the blob file is not in the client blob directory
+    remote_client = MCPClient(
+        config=MCPClientConfig(
+            transport=Transport.HTTP, host=host, port=port, blob_dir=str(tmp_path / "other")
+        ),
+    )
+    async with remote_client.open_blob(result.blob) as data:
+        assert isinstance(data, bytes)
+        assert json.loads(data) == {"result": 3}
+
+
 async def test_mcp_server_returns_method_not_found_for_unknown_tool(
     mcp_http_endpoint: tuple[str, int],
 ) -> None:
@@ -0,0 +1,44 @@
+"""Unit tests for the content-addressed blob store."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from hopeit_agents.mcp_server.server.blobs import BlobStore
+
+
+def test_blobs_are_stored_once_by_digest(tmp_path: Path) -> None:
+    """Blobs are named by their SHA-256 digest and stored once."""
+    store = BlobStore(tmp_path, ttl_seconds=3600.0)
+
+    digest, path = store.put(b'{"result": 3}')
+    again, same_path = store.put(b'{"result": 3}')
+
+    assert digest == again == hashlib.sha256(b'{"result": 3}').hexdigest()
+    assert path == same_path == tmp_path / digest[:2] / digest
+    assert store.read(digest) == b'{"result": 3}'
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [digest]
+
+
+def test_invalid_digests_are_rejected(tmp_path: Path) -> None:
+    """Digests not made of 64 hex characters do not resolve to paths."""
+    store = BlobStore(tmp_path, ttl_seconds=3600.0)
+
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+
+
+def test_expired_blobs_are_pruned(tmp_path: Path) -> None:
+    """Blobs not stored within the TTL are removed."""
+    store = BlobStore(tmp_path, ttl_seconds=60.0)
+    old, old_path = store.put(b"old")
+    new, _ = store.put(b"new")
+    os.utime(old_path, (0, 0))
+
+    store.prune()
+
+    with pytest.raises(FileNotFoundError):
+        store.read(old)
+    assert store.read(new) == b"new"
@@ -0,0 +1,41 @@
+"""Unit tests for progress reported by tool events."""
+
+from typing import Any
+
+import pytest
+from hopeit.dataobjects import dataclass, dataobject
+from hopeit.testing.apps import config, create_test_context
+
+from hopeit_agents.mcp_server.tools.progress import report_progress, track_progress
+
+
+@dataobject
+@dataclass
+class PartialResult:
+    items: list[int]
+
+
+@pytest.mark.asyncio
+async def test_report_progress_sends_partial_output() -> None:
+    """Progress is sent through the tracked reporter, converting dataobjects."""
+    app_config = config("examples/plugins/example-tool/config/plugin-config.json")
+    context = create_test_context(app_config, "tool.sum_two_numbers")
+    reported: list[tuple[float, float | None, str | None, Any]] = []
+
+    async def reporter(
+        progress: float,
+        total: float | None,
+        message: str | None,
+        partial: dict[str, Any] | list[Any] | None,
+    ) -> None:
+        reported.append((progress, total, message, partial))
+
+    await report_progress(context, 0.5)  # Not tracked, e.g. invoked through HTTP
+    track_progress(context, reporter)
+    await report_progress(context, 1, total=2, message="half", partial=PartialResult(items=[1]))
+    await report_progress(context, 2, partial={"items": [1, 2]})
+
+    assert reported == [
+        (1, 2, "half", {"items": [1]}),
+        (2, None, None, {"items": [1, 2]}),
+    ]
@@ -0,0 +1,68 @@
+"""Unit tests for `notifications/tools/list_changed` support in the MCP server."""
+
+import asyncio
+
+import pytest
+from mcp import types
+
+from hopeit_agents.mcp_server.server import handler
+from hopeit_agents.mcp_server.server import mcp as mcp_module
+
+
+def test_server_advertises_tools_list_changed() -> None:
+    """Initialization options advertise tool list change notifications."""
+    options = mcp_module.mcp_server.create_initialization_options()
+
+    assert options.capabilities.tools is not None
+    assert options.capabilities.tools.listChanged is True
+
+
+def test_listeners_called_when_tools_change() -> None:
+    """Listeners are called when tools are unregistered or reset."""
+    calls: list[str] = []
+
+    def listener() -> None:
+        calls.append("changed")
+
+    async def tool_handler(*_: object) -> dict[str, object]:
+        return {}
+
+    handler.on_tools_changed(listener)
+    try:
+        handler._server.tools.append(types.Tool(name="tool-a", inputSchema={"type": "object"}))
+        handler._server.handlers["tool-a"] = tool_handler
+
+        handler.unregister_tool("tool-a")
+        handler.unregister_tool("tool-a")
+        assert handler.tool_list() == []
+        assert calls == ["changed"]
+
+        handler.reset()
+        assert calls == ["changed", "changed"]
+    finally:
+        handler._listeners.remove(listener)
+
+
+@pytest.mark.asyncio
+async def test_tool_changes_are_notified_once_per_iteration() -> None:
+    """Changes made before notifications are sent are coalesced per session."""
+    sent: list[str] = []
+
+    class Session:
+        async def send_tool_list_changed(self) -> None:
+            sent.append("changed")
+
+    server = mcp_module._ToolsServer(name="test", instructions="")
+    session = Session()
+    server.tool_sessions.add(session)  # type: ignore[arg-type]
+
+    for _ in range(3):
+        server.tools_changed()
+    assert len(server._notify_tasks) == 1
+    await asyncio.gather(*server._notify_tasks)
+    assert sent == ["changed"]
+
+    server.tools_changed()
+    await asyncio.gather(*server._notify_tasks)
+    assert sent == ["changed", "changed"]
+    assert not server._notify_tasks